@@ -6,6 +6,16 @@ from . import server
 
 
 def validate_args(args):
+    if not args.allow and not args.config:
+        raise ValueError("At least one --allow path or a --config file is required")
+    if args.config and not os.path.isfile(args.config):
+        raise ValueError(f"Config file does not exist: {args.config}")
+    if args.index_dir and os.path.exists(args.index_dir) and not os.path.isdir(args.index_dir):
+        raise ValueError(f"Index path is not a directory: {args.index_dir}")
+    if args.cache_dir and os.path.exists(args.cache_dir) and not os.path.isdir(args.cache_dir):
+        raise ValueError(f"Cache path is not a directory: {args.cache_dir}")
+    if args.cache_size_mb <= 0:
+        raise ValueError("--cache-size-mb must be positive")
     if len(args.allow) != len(set(args.allow)):
         raise ValueError("Duplicate paths found in --allow")
     if len(args.deny) != len(set(args.deny)):
@@ -26,7 +36,6 @@ def main():
     parser.add_argument(
         '--allow',
         action='append',
-        required=True,
         default=[],
         help='Allowed paths (can specify multiple by repeating flag)')
     parser.add_argument(
@@ -34,12 +43,37 @@ def main():
         action='append',
         default=[],
         help='Denied paths (can specify multiple by repeating flag)')
+    parser.add_argument(
+        '--config',
+        help='JSON file with additional "allow" and "deny" lists, reloaded when it changes')
+    parser.add_argument(
+        '--index-dir',
+        help='Directory for the optional trigram indexes that speed up repeated searches')
+    parser.add_argument(
+        '--cache-dir',
+        help='Directory for the optional disk cache of rendered PDF pages')
+    parser.add_argument(
+        '--cache-size-mb',
+        type=int,
+        default=512,
+        help='Size limit of the render cache in MB, least recently used pages are evicted beyond it')
+    parser.add_argument(
+        '--no-fsync',
+        action='store_true',
+        help='Do not flush written files to disk before replacing, faster but not durable on power loss')
     args = parser.parse_args()
 
     validate_args(args)
     config = Config()
     config.allow = args.allow
     config.deny = args.deny
+    config.index_dir = args.index_dir
+    config.cache_dir = args.cache_dir
+    config.cache_max_size = args.cache_size_mb * 2**20
+    config.fsync = not args.no_fsync
+    if args.config:
+        config.config_file = args.config
+        config.load_file()
 
     asyncio.run(server.main())
 
@@ -0,0 +1,71 @@
+import logging
+
+from mcp.types import TextContent
+
+from file_system_windows_python.handlers.handler import Handler
+from file_system_windows_python.tools.tools import Tools
+from file_system_windows_python.util.file_type_cache import FileTypeCache
+from file_system_windows_python.util.image_cache import ImageCache
+from file_system_windows_python.util.line_index import LineIndexCache
+from file_system_windows_python.util.logging import log_execution
+from file_system_windows_python.util.pdf_index import PdfIndexCache
+from file_system_windows_python.util.render_cache import RenderCache
+from file_system_windows_python.util.response_budget import ResponseBudget
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class CacheStatusHandler(Handler):
+    """
+    Handler for reporting the state of the caches.
+
+    This handler reports the size and the hit, miss and eviction counts of the render cache
+    of PDF pages, and the hit and miss counts of the in-memory caches.
+    """
+
+    @log_execution(Tools.CACHE_STATUS)
+    async def execute(self, arguments: None, budget: ResponseBudget | None = None) -> list[TextContent]:
+        """
+        Execute the handler to report the state of the caches.
+
+        Args:
+            arguments None: No arguments are expected.
+            budget (ResponseBudget | None): Unused, the output is small.
+
+        Returns:
+            list[TextContent]: A list of TextContent objects, one per cache.
+        """
+        render_cache = RenderCache()
+        if render_cache.enabled:
+            stats = render_cache.stats()
+            render_text = (f"Render cache: {stats.entries} pages, {stats.size / 2**20:.1f} of "
+                           f"{stats.max_size / 2**20:.0f} MiB, {stats.hits} hits, {stats.misses} misses, "
+                           f"{stats.evictions} evictions")
+        else:
+            render_text = "Render cache is disabled, start the server with --cache-dir"
+
+        file_type_cache = FileTypeCache()
+        line_index_cache = LineIndexCache()
+        pdf_index_cache = PdfIndexCache()
+        image_cache = ImageCache()
+        return [
+            TextContent(type="text", text=render_text),
+            TextContent(
+                type="text",
+                text=f"File type cache: {file_type_cache.hits} hits, {file_type_cache.misses} misses",
+            ),
+            TextContent(
+                type="text",
+                text=f"Line index cache: {line_index_cache.hits} hits, {line_index_cache.misses} misses",
+            ),
+            TextContent(
+                type="text",
+                text=f"PDF index cache: {pdf_index_cache.hits} hits, {pdf_index_cache.misses} misses",
+            ),
+            TextContent(
+                type="text",
+                text=f"Image cache: {len(image_cache)} images, {image_cache.size / 2**20:.1f} MiB, "
+                     f"{image_cache.hits} hits, {image_cache.misses} misses",
+            ),
+        ]
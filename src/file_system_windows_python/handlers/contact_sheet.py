@@ -0,0 +1,166 @@
+import asyncio
+import base64
+import hashlib
+import logging
+from typing import List, Union
+
+from mcp.types import ImageContent, TextContent
+
+from file_system_windows_python.handlers.handler import Handler
+from file_system_windows_python.schemas.contact_sheet_arguments import ContactSheetArguments
+from file_system_windows_python.tools.tools import Tools
+from file_system_windows_python.util import image_worker
+from file_system_windows_python.util.cursor import decode_cursor, encode_cursor
+from file_system_windows_python.util.directory_listing import DirectoryListing, ListingQuery
+from file_system_windows_python.util.logging import log_execution
+from file_system_windows_python.util.path_validator import PathValidator
+from file_system_windows_python.util.pdf_worker import file_stamp
+from file_system_windows_python.util.response_budget import ResponseBudget
+from file_system_windows_python.util.result_guard import ResultGuard
+from file_system_windows_python.util.validated_path import ValidatedPath
+from file_system_windows_python.util.worker_pool import WorkerPool
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class ContactSheetHandler(Handler):
+    """
+    Handler for showing many images at once.
+
+    This handler validates the images of a directory, or a list of image files, decodes
+    thumbnails of them in parallel on the process pool and arranges them in labelled grids.
+    Up to `MAX_SHEETS` sheets are returned as long as they fit into the response budget,
+    with a cursor continuing at the first image that was not shown.
+    """
+    IMAGE_EXTENSIONS = ('bmp', 'gif', 'jpeg', 'jpg', 'png', 'tif', 'tiff', 'webp')
+    MAX_ROWS = 6  # Rows of thumbnails per sheet
+    MAX_SHEETS = 4  # Sheets per response
+    OUTPUT_MARGIN = 1024  # Bytes kept free for the cursor
+
+    @log_execution(Tools.CONTACT_SHEET)
+    async def execute(
+            self,
+            arguments: dict,
+            budget: ResponseBudget | None = None) -> List[Union[ImageContent, TextContent]]:
+        """
+        Execute the handler to show images as contact sheets.
+
+        Args:
+            arguments (dict): A dictionary of arguments, see `ContactSheetArguments`.
+            budget (ResponseBudget | None): The byte budget of the response.
+
+        Returns:
+            List[Union[ImageContent, TextContent]]: Each sheet followed by the list of its images,
+                then the skipped files and the cursor, if any.
+
+        Raises:
+            ValueError: If the arguments are invalid or the cursor belongs to other images.
+            PathValidationError: If the directory does not exist or is not allowed.
+        """
+        args = ContactSheetArguments(**arguments)
+        budget = budget or ResponseBudget()
+        budget.take(ContactSheetHandler.OUTPUT_MARGIN)
+
+        if args.path is not None:
+            directory = await PathValidator.validate_directory_path(args.path)
+            query = ListingQuery(extensions=ContactSheetHandler.IMAGE_EXTENSIONS, glob=args.glob)
+            snapshot = await asyncio.to_thread(
+                DirectoryListing().get_snapshot, directory.path, directory.stat.st_mtime_ns)
+            candidates = [str(directory.path / entry.name) for entry in snapshot.view(query)]
+            source = str(directory.path)
+        else:
+            candidates = args.paths
+            source = hashlib.sha256('\n'.join(candidates).encode('utf-8')).hexdigest()
+        start = ContactSheetHandler.parse_cursor(args.cursor, source) if args.cursor else 0
+        if not candidates:
+            return [TextContent(type="text", text="No images found")]
+
+        per_sheet = args.columns * ContactSheetHandler.MAX_ROWS
+        window = range(start, min(start + per_sheet * ContactSheetHandler.MAX_SHEETS, len(candidates)))
+        validated = await asyncio.gather(
+            *(PathValidator.validate_file_path(candidates[index]) for index in window), return_exceptions=True)
+
+        images: list[tuple[int, ValidatedPath]] = []
+        skipped = []
+        for index, result in zip(window, validated):
+            if isinstance(result, ValidatedPath) and result.file_type.startswith('image/'):
+                images.append((index, result))
+            elif isinstance(result, ValidatedPath):
+                skipped.append(f"{candidates[index]}: {result.file_type} is not an image")
+            else:
+                skipped.append(f"{candidates[index]}: {str(result)}")
+
+        pool = WorkerPool()
+        thumbnails = await asyncio.gather(
+            *(pool.submit(image_worker.make_thumbnail, str(file.path), file_stamp(file.stat), args.thumbnail_size)
+              for _, file in images),
+            return_exceptions=True)
+
+        sheets = [list(range(offset, min(offset + per_sheet, len(images))))
+                  for offset in range(0, len(images), per_sheet)]
+        max_bytes = budget.remaining * 3 // 4 // max(len(sheets), 1)  # Images are measured by their base64 length
+        encoded = await asyncio.gather(*(
+            pool.submit(
+                image_worker.compose_sheet,
+                [None if isinstance(thumbnails[i], BaseException) else thumbnails[i][:2] for i in sheet],
+                [f"{images[i][0] + 1}. {images[i][1].path.name}" for i in sheet],
+                args.columns,
+                args.thumbnail_size,
+                max_bytes)
+            for sheet in sheets))
+
+        results: List[Union[ImageContent, TextContent]] = []
+        next_index = window.stop if window.stop < len(candidates) else None
+        for sheet_number, (sheet, (data, size)) in enumerate(zip(sheets, encoded), start=1):
+            lines = [f"Sheet {sheet_number} ({size[0]}x{size[1]}):"]
+            for i in sheet:
+                index, file = images[i]
+                if isinstance(thumbnails[i], BaseException):
+                    lines.append(f"{index + 1}. {file.path} (unreadable: {str(thumbnails[i])})")
+                else:
+                    width, height = thumbnails[i][2]
+                    lines.append(f"{index + 1}. {file.path} ({width}x{height})")
+            contents = [
+                ImageContent(type="image", data=base64.b64encode(data).decode('utf-8'), mimeType="image/webp"),
+                TextContent(type="text", text="\n".join(lines)),
+            ]
+            if not budget.take(ResultGuard.measure_size(contents)):
+                next_index = images[sheet[0]][0]
+                break
+            results.extend(contents)
+
+        if next_index == start:
+            return [TextContent(type="text", text="The contact sheet is too large for a response, "
+                                                  "use a smaller thumbnail_size or fewer columns")]
+
+        if skipped:
+            results.append(TextContent(type="text", text="Skipped:\n" + "\n".join(skipped)))
+        if next_index is not None:
+            cursor = encode_cursor({'source': source, 'index': next_index})
+            results.append(TextContent(
+                type="text",
+                text=f"{next_index - start} of {len(candidates) - start} remaining images shown\nNext cursor: {cursor}"
+            ))
+        return results
+
+    @staticmethod
+    def parse_cursor(cursor: str, source: str) -> int:
+        """
+        Extract the index of the next image from a contact-sheet cursor.
+
+        Args:
+            cursor (str): The cursor returned by a previous call.
+            source (str): The directory, or the hash of the list of files, being shown.
+
+        Returns:
+            int: The index of the first image to show.
+
+        Raises:
+            ValueError: If the cursor is malformed or was issued for other images.
+        """
+        state = decode_cursor(cursor)
+        index = state.get('index')
+        if state.get('source') != source or not isinstance(index, int):
+            raise ValueError("Cursor does not belong to these images")
+        return index
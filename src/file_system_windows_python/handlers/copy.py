@@ -0,0 +1,65 @@
+import asyncio
+import logging
+import stat
+import time
+
+from mcp.types import TextContent
+
+from file_system_windows_python.handlers.handler import Handler
+from file_system_windows_python.schemas.copy_arguments import CopyArguments
+from file_system_windows_python.tools.tools import Tools
+from file_system_windows_python.util.cache_invalidation import invalidate_path
+from file_system_windows_python.util.file_copy import copy_file
+from file_system_windows_python.util.logging import log_execution
+from file_system_windows_python.util.path_locks import PathLocks
+from file_system_windows_python.util.path_validator import PathValidator
+from file_system_windows_python.util.response_budget import ResponseBudget
+from file_system_windows_python.util.tree_copy import check_destination, copy_tree
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class CopyHandler(Handler):
+    """
+    Handler for copying a file or a directory tree.
+
+    Both ends are checked against the allowed and denied paths, but not against the file
+    types the server reads, since the content never passes through the response. The
+    kernel copies the data where the platform allows it, see `copy_data`, and directory
+    trees are copied several files at a time.
+    """
+
+    @log_execution(Tools.COPY)
+    async def execute(self, arguments: dict, budget: ResponseBudget | None = None) -> list[TextContent]:
+        """
+        Execute the handler to copy a file or directory.
+
+        Args:
+            arguments (dict): A dictionary of arguments, see `CopyArguments`.
+            budget (ResponseBudget | None): Unused, the output is small.
+
+        Returns:
+            list[TextContent]: A list containing a TextContent object describing the copy.
+
+        Raises:
+            ValueError: If the destination exists without overwrite, or a directory is copied without recursive.
+            PathValidationError: If either path is not allowed or the source does not exist.
+        """
+        args = CopyArguments(**arguments)
+        source = await PathValidator.validate_source_path(args.source)
+        target = await PathValidator.validate_target_path(args.destination)
+        check_destination(source, target, args.overwrite)
+
+        start = time.perf_counter()
+        if stat.S_ISDIR(source.stat.st_mode):
+            if not args.recursive:
+                raise ValueError(f"{source.path} is a directory, pass recursive to copy it with its content")
+            report = await copy_tree(source.path, target)
+            text = f"Copied {source.path} to {target} in {time.perf_counter() - start:.2f}s: {report.summary()}"
+        else:
+            async with PathLocks().hold(reads=(source.path,), writes=(target,)):
+                size = await asyncio.to_thread(copy_file, source.path, target)
+                invalidate_path(target)
+            text = f"Copied {source.path} to {target} ({size} bytes) in {time.perf_counter() - start:.2f}s"
+        return [TextContent(type="text", text=text)]
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import os
+import shutil
+
+from mcp.types import TextContent
+
+from file_system_windows_python.handlers.handler import Handler
+from file_system_windows_python.schemas.edit_file_arguments import EditFileArguments
+from file_system_windows_python.tools.tools import Tools
+from file_system_windows_python.util import patch
+from file_system_windows_python.util.atomic_writer import replace_file, temp_path_for
+from file_system_windows_python.util.cache_invalidation import invalidate_path
+from file_system_windows_python.util.config import Config
+from file_system_windows_python.util.etag import content_etag, new_hasher
+from file_system_windows_python.util.line_index import LineIndexCache
+from file_system_windows_python.util.logging import log_execution
+from file_system_windows_python.util.path_locks import PathLocks
+from file_system_windows_python.util.path_validator import PathValidator
+from file_system_windows_python.util.response_budget import ResponseBudget
+from file_system_windows_python.util.validated_path import ValidatedPath
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class EditFileHandler(Handler):
+    """
+    Handler for editing part of a text file.
+
+    This handler applies search/replace blocks or the hunks of a unified diff to the current
+    content of a file. The file is mapped into memory, the edits are located in it and the
+    result is streamed to a temporary file next to it, copying the unchanged parts in
+    chunks, which then replaces the file under its write lock in `PathLocks`. An optional
+    ETag precondition rejects the edit if the file changed since the caller last saw it.
+    """
+
+    @log_execution(Tools.EDIT_FILE)
+    async def execute(self, arguments: dict, budget: ResponseBudget | None = None) -> list[TextContent]:
+        """
+        Execute the handler to edit a file.
+
+        Args:
+            arguments (dict): A dictionary of arguments, see `EditFileArguments`.
+            budget (ResponseBudget | None): Unused, the output is small.
+
+        Returns:
+            list[TextContent]: A list containing a TextContent object with the changed lines and the new ETag.
+
+        Raises:
+            ValueError: If the ETag does not match, an edit cannot be located or edits overlap.
+            PathValidationError: If the path does not exist, is not a file or is not allowed.
+        """
+        args = EditFileArguments(**arguments)
+        file = await PathValidator.validate_file_path(args.path, open_file=True)
+        if not file.file_type.startswith('text/'):
+            file.close()
+            return [TextContent(type="text", text=f"Only text files can be edited, not {file.file_type}!")]
+
+        try:
+            async with PathLocks().write(file.path):
+                edit_count, removed, added, etag = await asyncio.to_thread(EditFileHandler.apply, file, args)
+                invalidate_path(file.path)
+        finally:
+            file.close()
+
+        return [
+            TextContent(
+                type="text",
+                text=f"Applied {edit_count} edits to {file.path} ({removed} lines replaced by {added}), ETag: {etag}"
+            )
+        ]
+
+    @staticmethod
+    def apply(file: ValidatedPath, args: EditFileArguments) -> tuple[int, int, int, str]:
+        """
+        Apply the edits to a file and replace it.
+
+        The file is closed before it is replaced, which Windows requires. The edit is
+        abandoned if the file changed on disk while the edits were applied.
+
+        This is a blocking call, run it in a thread from async code.
+
+        Args:
+            file (ValidatedPath): The validated text file, opened for reading.
+            args (EditFileArguments): The edits and the ETag precondition.
+
+        Returns:
+            tuple[int, int, int, str]: The number of edits, the lines replaced and their replacement, and the new ETag.
+
+        Raises:
+            ValueError: If the ETag does not match, an edit cannot be located or edits overlap.
+        """
+        temp_path = temp_path_for(file.path)
+        try:
+            with file:
+                if file.size == 0:
+                    raise ValueError(f"File {file.path} is empty, use write-file")
+                with file.map() as data:
+                    if args.if_match is not None and (current_etag := content_etag(data)) != args.if_match:
+                        raise ValueError(f"File {file.path} changed, its ETag is now {current_etag}; read it again")
+                    newline = patch.detect_newline(data)
+                    if args.edits is not None:
+                        blocks = [(edit.search, edit.replace) for edit in args.edits]
+                        replacements = patch.locate_blocks(data, blocks, newline)
+                    else:
+                        hunks = patch.parse_unified_diff(args.diff)
+                        replacements = patch.locate_hunks(
+                            data, hunks, newline, LineIndexCache().get_or_build(file.path, file.stat, data))
+
+                    removed = sum(EditFileHandler.line_count(data[r.start:r.end]) for r in replacements)
+                    added = sum(EditFileHandler.line_count(r.data) for r in replacements)
+                    hasher = new_hasher()
+                    with open(temp_path, 'wb') as out:
+                        patch.splice(data, replacements, out, hasher)
+                        if Config().fsync:
+                            out.flush()
+                            os.fsync(out.fileno())
+
+            shutil.copymode(file.path, temp_path)
+            current = os.stat(file.path)
+            if (current.st_ino, current.st_size, current.st_mtime_ns) != \
+                    (file.stat.st_ino, file.stat.st_size, file.stat.st_mtime_ns):
+                raise ValueError(f"File {file.path} was changed by another program during the edit, try again")
+            replace_file(temp_path, file.path)
+            logger.debug(f"Applied {len(replacements)} edits to {file.path}")
+            return len(replacements), removed, added, hasher.hexdigest()
+        finally:
+            if temp_path.exists():
+                os.remove(temp_path)
+
+    @staticmethod
+    def line_count(data: bytes) -> int:
+        """Count the lines of a byte string, including a last line without a line break."""
+        return data.count(b'\n') + (0 if not data or data.endswith(b'\n') else 1)
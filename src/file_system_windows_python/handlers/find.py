@@ -0,0 +1,142 @@
+import fnmatch
+import logging
+import re
+from typing import List
+
+from mcp.types import TextContent
+
+from file_system_windows_python.handlers.handler import Handler
+from file_system_windows_python.schemas.find_arguments import FindArguments
+from file_system_windows_python.tools.tools import Tools
+from file_system_windows_python.util.cursor import decode_cursor, encode_cursor
+from file_system_windows_python.util.logging import log_execution
+from file_system_windows_python.util.path_validator import PathValidator
+from file_system_windows_python.util.response_budget import ResponseBudget
+from file_system_windows_python.util.tree_walker import TreeWalker, WalkEntry
+from file_system_windows_python.util.validated_path import ValidatedPath
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class FindHandler(Handler):
+    """
+    Handler for recursively finding files and directories.
+
+    This handler walks the tree below an allowed directory with parallel scandir workers,
+    skipping denied subtrees, and returns the matching relative paths until the response
+    budget is used up. A cursor in the response continues the search.
+    """
+    OUTPUT_MARGIN = 1024  # Bytes kept free for the header and the cursor
+
+    @log_execution(Tools.FIND)
+    async def execute(self, arguments: dict, budget: ResponseBudget | None = None) -> List[TextContent]:
+        """
+        Execute the handler to find entries below a directory.
+
+        Args:
+            arguments (dict): A dictionary of arguments, see `FindArguments`.
+            budget (ResponseBudget | None): The byte budget of the response.
+
+        Returns:
+            List[TextContent]: A list with one TextContent object listing the matches.
+
+        Raises:
+            ValueError: If an argument is invalid or the cursor does not belong to the path.
+            PathValidationError: If the path does not exist, is not a directory or is not allowed.
+        """
+        args = FindArguments(**arguments)
+        directory = await PathValidator.validate_directory_path(args.path)
+
+        start_after = FindHandler.parse_cursor(args.cursor, directory) if args.cursor else None
+        try:
+            pattern = re.compile(args.regex) if args.regex else None
+        except re.error as e:
+            raise ValueError(f"Invalid regex: {str(e)}")
+
+        with_stat = any(value is not None for value in (
+            args.min_size, args.max_size, args.modified_after, args.modified_before))
+        walker = TreeWalker(directory.path, args.max_depth, with_stat=with_stat, start_after=start_after)
+
+        budget = budget or ResponseBudget()
+        budget.take(FindHandler.OUTPUT_MARGIN)
+        lines = []
+        previous = start_after
+        next_cursor = None
+        async for entry in walker.walk():
+            if FindHandler.matches(entry, args, pattern):
+                line = entry.relative_path + ('/' if entry.is_dir else '')
+                at_limit = args.limit is not None and len(lines) >= args.limit
+                if at_limit or not budget.take(len(line.encode('utf-8')) + 1):
+                    next_cursor = encode_cursor({'path': str(directory.path), 'after': list(previous or ())})
+                    break
+                lines.append(line)
+            previous = entry.parts
+
+        header = (f"Found {len(lines)} matches below {directory.path} "
+                  f"({walker.directories_scanned} directories scanned, "
+                  f"{walker.directories_pruned} denied directories skipped)")
+        output = [header, *lines]
+        if next_cursor:
+            output.append(f"Next cursor: {next_cursor}")
+
+        return [TextContent(type="text", text="\n".join(output))]
+
+    @staticmethod
+    def parse_cursor(cursor: str, directory: ValidatedPath) -> tuple[str, ...] | None:
+        """
+        Extract the resume point from a find cursor.
+
+        Args:
+            cursor (str): The cursor returned by a previous call.
+            directory (ValidatedPath): The directory being searched.
+
+        Returns:
+            tuple[str, ...] | None: The relative parts of the entry to resume after.
+
+        Raises:
+            ValueError: If the cursor is malformed or was issued for another directory.
+        """
+        state = decode_cursor(cursor)
+        after = state.get('after')
+        if state.get('path') != str(directory.path) or not isinstance(after, list):
+            raise ValueError(f"Cursor does not belong to {directory.path}")
+        return tuple(after) or None
+
+    @staticmethod
+    def matches(entry: WalkEntry, args: FindArguments, pattern: re.Pattern | None) -> bool:
+        """
+        Check an entry against the find predicates.
+
+        Args:
+            entry (WalkEntry): The entry to check.
+            args (FindArguments): The find arguments.
+            pattern (re.Pattern | None): The compiled regex, if any.
+
+        Returns:
+            bool: True if the entry matches all predicates.
+        """
+        if args.type == 'file' and entry.is_dir or args.type == 'directory' and not entry.is_dir:
+            return False
+        if args.glob:
+            target = entry.relative_path if '/' in args.glob else entry.parts[-1]
+            if not fnmatch.fnmatchcase(target.lower(), args.glob.lower()):
+                return False
+        if pattern is not None and not pattern.search(entry.relative_path):
+            return False
+        if args.min_size is not None or args.max_size is not None:
+            if entry.size is None:
+                return False
+            if args.min_size is not None and entry.size < args.min_size:
+                return False
+            if args.max_size is not None and entry.size > args.max_size:
+                return False
+        if args.modified_after is not None or args.modified_before is not None:
+            if entry.mtime_ns is None:
+                return False
+            mtime = entry.mtime_ns / 1e9
+            if args.modified_after is not None and mtime <= args.modified_after.timestamp():
+                return False
+            if args.modified_before is not None and mtime >= args.modified_before.timestamp():
+                return False
+        return True
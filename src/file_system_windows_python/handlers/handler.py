@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 
 from mcp.types import *
 
+from file_system_windows_python.util.response_budget import ResponseBudget
+
 
 class Handler(ABC):
     """
@@ -12,12 +14,19 @@ class Handler(ABC):
     """
 
     @abstractmethod
-    async def execute(self, arguments: dict | None) -> list[TextContent | ImageContent | EmbeddedResource]:
+    async def execute(
+            self,
+            arguments: dict | None,
+            budget: ResponseBudget | None = None) -> list[TextContent | ImageContent | EmbeddedResource]:
         """
         Abstract method to be implemented by subclasses.
 
+        Handlers that can produce large output spend the budget while producing it and
+        stop with a continuation cursor once it is used up.
+
         Args:
             arguments (dict | None): A dictionary of arguments or None.
+            budget (ResponseBudget | None): The byte budget of the response, a full one if omitted.
 
         Returns:
             list[TextContent | ImageContent | EmbeddedResource]: A list of content objects.
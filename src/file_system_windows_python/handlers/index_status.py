@@ -0,0 +1,54 @@
+import logging
+
+from mcp.types import TextContent
+
+from file_system_windows_python.handlers.handler import Handler
+from file_system_windows_python.tools.tools import Tools
+from file_system_windows_python.util.logging import log_execution
+from file_system_windows_python.util.response_budget import ResponseBudget
+from file_system_windows_python.util.trigram_index import SearchIndex
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class IndexStatusHandler(Handler):
+    """
+    Handler for reporting the state of the search indexes.
+
+    This handler describes the trigram index of each allowed directory: whether it is
+    ready, how many files it covers, its size on disk, how long the last build took and
+    how long ago it was refreshed.
+    """
+
+    @log_execution(Tools.INDEX_STATUS)
+    async def execute(self, arguments: None, budget: ResponseBudget | None = None) -> list[TextContent]:
+        """
+        Execute the handler to report the state of the search indexes.
+
+        Args:
+            arguments None: No arguments are expected.
+            budget (ResponseBudget | None): Unused, the output is small.
+
+        Returns:
+            list[TextContent]: A list of TextContent objects, one per index.
+        """
+        search_index = SearchIndex()
+        if not search_index.enabled:
+            return [TextContent(type="text", text="Search index is disabled, start the server with --index-dir")]
+
+        text_content_list = []
+        for index in search_index.indexes:
+            status = index.status()
+            build_time = '-' if status.build_time is None else f"{status.build_time:.1f} s"
+            staleness = 'never' if status.staleness is None else f"{status.staleness:.0f} s ago"
+            text_content_list.append(
+                TextContent(
+                    type="text",
+                    text=f"Index of {status.root}: {status.state}, {status.files} files, "
+                         f"{status.size / 2**20:.1f} MiB, last build took {build_time}, "
+                         f"refreshed {staleness}, {status.pending} pending writes",
+                )
+            )
+
+        return text_content_list
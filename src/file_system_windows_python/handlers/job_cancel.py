@@ -0,0 +1,44 @@
+import logging
+
+from mcp.types import TextContent
+
+from file_system_windows_python.handlers.handler import Handler
+from file_system_windows_python.schemas.job_cancel_arguments import JobCancelArguments
+from file_system_windows_python.tools.tools import Tools
+from file_system_windows_python.util.jobs import JobManager
+from file_system_windows_python.util.logging import log_execution
+from file_system_windows_python.util.response_budget import ResponseBudget
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class JobCancelHandler(Handler):
+    """
+    Handler for cancelling a background job.
+
+    The blocking work of the job stops at its next cancellation check, and files it was
+    writing are left as they were before, since every write replaces its target at once.
+    """
+
+    @log_execution(Tools.JOB_CANCEL)
+    async def execute(self, arguments: dict, budget: ResponseBudget | None = None) -> list[TextContent]:
+        """
+        Execute the handler to cancel a job.
+
+        Args:
+            arguments (dict): A dictionary of arguments, see `JobCancelArguments`.
+            budget (ResponseBudget | None): Unused, the output is small.
+
+        Returns:
+            list[TextContent]: A list containing a TextContent object describing the job.
+
+        Raises:
+            ValueError: If there is no job with the ID.
+        """
+        args = JobCancelArguments(**arguments)
+        job = JobManager().get(args.id)
+        if job.status != 'running':
+            return [TextContent(type="text", text=job.describe())]
+        JobManager().cancel(args.id)
+        return [TextContent(type="text", text=f"Cancelled job {job.id} ({job.tool})")]
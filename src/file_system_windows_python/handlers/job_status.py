@@ -0,0 +1,67 @@
+import logging
+
+from mcp.types import TextContent, ImageContent, EmbeddedResource
+
+from file_system_windows_python.handlers.handler import Handler
+from file_system_windows_python.schemas.job_status_arguments import JobStatusArguments
+from file_system_windows_python.tools.tools import Tools
+from file_system_windows_python.util.jobs import JobManager
+from file_system_windows_python.util.logging import log_execution
+from file_system_windows_python.util.response_budget import ResponseBudget
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class JobStatusHandler(Handler):
+    """
+    Handler for polling background jobs.
+
+    Without an ID it lists the known jobs. For a running job it returns its progress and
+    the partial results reported since the last poll; for a finished job, its result.
+    """
+
+    @log_execution(Tools.JOB_STATUS)
+    async def execute(
+            self,
+            arguments: dict | None,
+            budget: ResponseBudget | None = None) -> list[TextContent | ImageContent | EmbeddedResource]:
+        """
+        Execute the handler to report on one or all jobs.
+
+        Args:
+            arguments (dict | None): A dictionary of arguments, see `JobStatusArguments`.
+            budget (ResponseBudget | None): The byte budget of the response, spent on partial results.
+
+        Returns:
+            list[TextContent | ImageContent | EmbeddedResource]: The status line of the job, followed by
+                its partial results and the value of since for the next poll, or the result of the
+                finished job.
+
+        Raises:
+            ValueError: If there is no job with the ID.
+        """
+        args = JobStatusArguments(**(arguments or {}))
+        budget = budget or ResponseBudget()
+        manager = JobManager()
+
+        if args.id is None:
+            jobs = manager.jobs
+            if not jobs:
+                return [TextContent(type="text", text="No jobs")]
+            return [TextContent(type="text", text="\n".join(job.describe() for job in jobs))]
+
+        job = manager.get(args.id)
+        if job.status != 'running':
+            return job.result
+
+        status = TextContent(type="text", text=job.describe())
+        budget.add(status)
+        contents: list[TextContent | ImageContent | EmbeddedResource] = [status]
+        position = args.since
+        partial = job.progress.partial
+        while position < len(partial) and budget.add(partial[position]):
+            contents.append(partial[position])
+            position += 1
+        contents.append(TextContent(type="text", text=f"Next since: {position}"))
+        return contents
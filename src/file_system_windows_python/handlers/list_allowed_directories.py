@@ -6,6 +6,7 @@ from file_system_windows_python.handlers.handler import Handler
 from file_system_windows_python.tools.tools import Tools
 from file_system_windows_python.util.config import Config
 from file_system_windows_python.util.logging import log_execution
+from file_system_windows_python.util.response_budget import ResponseBudget
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -20,12 +21,13 @@ class ListAllowedDirectoriesHandler(Handler):
     """
 
     @log_execution(Tools.LIST_ALLOWED_DIRECTORIES)
-    async def execute(self, arguments: None) -> list[TextContent]:
+    async def execute(self, arguments: None, budget: ResponseBudget | None = None) -> list[TextContent]:
         """
         Execute the handler to list allowed directories.
 
         Args:
             arguments None: No arguments are expected.
+            budget (ResponseBudget | None): Unused, the output is small.
 
         Returns:
             list[TextContent]: A list of TextContent objects representing the allowed directories.
@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from pathlib import Path
+from datetime import datetime
 from typing import List
 
 from mcp.types import TextContent
@@ -7,8 +8,12 @@ from mcp.types import TextContent
 from file_system_windows_python.handlers.handler import Handler
 from file_system_windows_python.schemas.ls_arguments import LsArguments
 from file_system_windows_python.tools.tools import Tools
+from file_system_windows_python.util.cursor import decode_cursor, encode_cursor
+from file_system_windows_python.util.directory_listing import DirectoryEntry, DirectoryListing, ListingQuery
 from file_system_windows_python.util.logging import log_execution
 from file_system_windows_python.util.path_validator import PathValidator
+from file_system_windows_python.util.response_budget import ResponseBudget
+from file_system_windows_python.util.validated_path import ValidatedPath
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -21,9 +26,12 @@ class LsHandler(Handler):
     This handler retrieves the contents of a specified directory and returns it
     as a list of TextContent objects, with pagination support.
     """
+    PAGE_SIZE = 50
+    OUTPUT_MARGIN = 1024  # Bytes kept free for the header and the cursor
+    DETAILS_SIZE = 48  # Upper bound of the bytes a table row adds to the name
 
     @log_execution(Tools.LS)
-    async def execute(self, arguments: dict) -> List[TextContent]:
+    async def execute(self, arguments: dict, budget: ResponseBudget | None = None) -> List[TextContent]:
         """
         Execute the handler to list directory contents.
 
@@ -31,64 +39,144 @@ class LsHandler(Handler):
             arguments dict: A dictionary of arguments, including:
                 - path (str): The path of the directory to list.
                 - page (int, optional): The page number for pagination. Defaults to 1.
+                - cursor (str, optional): A cursor returned by a previous call, takes precedence over page.
+                - details (bool, optional): Whether to return a table with type, size and modification time.
+                - sort_by (str, optional): Sort by 'name', 'size' or 'mtime'. Defaults to 'name'.
+                - descending (bool, optional): Whether to reverse the sort order.
+                - extensions (list[str], optional): Only list files with one of these extensions.
+                - glob (str, optional): Only list entries whose name matches this glob.
+                - min_size (int, optional): Only list files of at least this many bytes.
+                - max_size (int, optional): Only list files of at most this many bytes.
+            budget (ResponseBudget | None): The byte budget of the response, a page stops early when it is used up.
 
         Returns:
             List[TextContent]: A list of TextContent objects representing the directory contents.
 
         Raises:
-            ValueError: If the path argument is missing.
-            FileNotFoundError: If the specified directory does not exist.
-            NotADirectoryError: If the specified path is not a directory.
+            ValueError: If the path argument is missing or the cursor does not belong to the path and query.
+            PathValidationError: If the path does not exist, is not a directory or is not allowed.
         """
         args = LsArguments(**arguments)
-        path = args.path
-        await PathValidator.validate_directory_path(path)
+        directory = await PathValidator.validate_directory_path(args.path)
+
+        query = ListingQuery(
+            sort_by=args.sort_by,
+            descending=args.descending,
+            extensions=tuple(sorted({ext.lower().lstrip('.') for ext in args.extensions or []})),
+            glob=args.glob,
+            min_size=args.min_size,
+            max_size=args.max_size,
+        )
+
+        if args.cursor:
+            offset = LsHandler.parse_cursor(args.cursor, directory, query)
+        else:
+            offset = (args.page - 1) * LsHandler.PAGE_SIZE
+
+        items, total_items = await asyncio.to_thread(
+            LsHandler.list_directory, directory, offset, query, args.details)
+        budget = budget or ResponseBudget()
+        budget.take(LsHandler.OUTPUT_MARGIN)
+        fitting = 0
+        for item in items:
+            if not budget.take(len(item.name.encode('utf-8')) + (LsHandler.DETAILS_SIZE if args.details else 2)):
+                break
+            fitting += 1
+        items = items[:fitting]
+
+        next_cursor = None
+        if offset + len(items) < total_items:
+            next_cursor = encode_cursor({
+                'path': str(directory.path),
+                'mtime': directory.stat.st_mtime_ns,
+                'offset': offset + len(items),
+                'query': query.fingerprint(),
+            })
 
-        page = args.page
+        page = offset // LsHandler.PAGE_SIZE + 1
+        if args.details:
+            return await LsHandler.create_output_table(items, total_items, page, next_cursor)
+        text_content_list = await LsHandler.create_output(items, total_items, page, next_cursor)
 
-        dir_path = Path(path).resolve(strict=True)
+        return text_content_list
 
-        if not dir_path.exists():
-            raise FileNotFoundError(f"Directory {path} does not exist")
-        if not dir_path.is_dir():
-            raise NotADirectoryError(f"{path} is not a directory")
+    @staticmethod
+    def parse_cursor(cursor: str, directory: ValidatedPath, query: ListingQuery) -> int:
+        """
+        Extract the entry offset from an ls cursor.
 
-        items = []
-        for item in dir_path.iterdir():
-            items.append({
-                'name': item.name,
-                'is_dir': item.is_dir(),
-            })
+        Args:
+            cursor (str): The cursor returned by a previous call.
+            directory (ValidatedPath): The directory being listed.
+            query (ListingQuery): The sort order and filters of the current call.
 
-        items.sort(key=lambda _item: (not _item['is_dir'], _item['name'].lower()))
+        Returns:
+            int: The offset of the first entry to return.
 
-        total_items = len(items)
-        start_idx = (page - 1) * 50
-        end_idx = start_idx + 50
+        Raises:
+            ValueError: If the cursor is malformed or was issued for another directory or query.
+        """
+        state = decode_cursor(cursor)
+        if state.get('path') != str(directory.path) or not isinstance(state.get('offset'), int):
+            raise ValueError(f"Cursor does not belong to {directory.path}")
+        if state.get('query') != query.fingerprint():
+            raise ValueError("Cursor was issued for a different sort order or filter")
+        if state.get('mtime') != directory.stat.st_mtime_ns:
+            logger.debug(f"Directory {directory.path} changed since the cursor was issued")
+        return max(state['offset'], 0)
 
-        page_items = items[start_idx:end_idx]
+    @staticmethod
+    def list_directory(
+            directory: ValidatedPath,
+            offset: int,
+            query: ListingQuery,
+            details: bool = False) -> tuple[List[DirectoryEntry], int]:
+        """
+        Collect one page of entries of a validated directory.
 
-        text_content_list = await LsHandler.create_output(page_items, total_items, page)
+        The first page of a directory without a cached snapshot is selected with a bounded
+        top-k pass. Any other page is served from a sorted snapshot, taken once per directory
+        mtime.
 
-        return text_content_list
+        This is a blocking call, run it in a thread from async code.
+
+        Args:
+            directory (ValidatedPath): The directory to list.
+            offset (int): The offset of the first entry of the page.
+            query (ListingQuery): The sort order and filters.
+            details (bool): Whether the entries must carry sizes and modification times.
+
+        Returns:
+            tuple[List[DirectoryEntry], int]: The entries of the page and the number of matching entries.
+        """
+        listing = DirectoryListing()
+        mtime_ns = directory.stat.st_mtime_ns
+        with_stat = details or query.needs_stat
+        if offset == 0 and listing.get_cached_snapshot(directory.path, mtime_ns, with_stat) is None:
+            return listing.first_entries(directory.path, LsHandler.PAGE_SIZE, query, with_stat)
+
+        entries = listing.get_snapshot(directory.path, mtime_ns, with_stat).view(query)
+        return entries[offset:offset + LsHandler.PAGE_SIZE], len(entries)
 
     @staticmethod
     async def create_output(
-            items: List[dict],
+            items: List[DirectoryEntry],
             total_items: int,
-            page: int) -> List[TextContent]:
+            page: int,
+            next_cursor: str | None = None) -> List[TextContent]:
         """
         Create the output list of TextContent objects.
 
         Args:
-            items (List[dict]): The list of directory items for the current page.
+            items (List[DirectoryEntry]): The list of directory items for the current page.
             total_items (int): The total number of items in the directory.
             page (int): The current page number.
+            next_cursor (str | None): The cursor of the next page, None on the last page.
 
         Returns:
             List[TextContent]: A list of TextContent objects representing the directory contents.
         """
-        total_pages = (total_items + 50 - 1) // 50
+        total_pages = (total_items + LsHandler.PAGE_SIZE - 1) // LsHandler.PAGE_SIZE
 
         text_content_list = [TextContent(
             type="text",
@@ -96,7 +184,7 @@ class LsHandler(Handler):
         )]
 
         for item in items:
-            name = item['name'] + ('/' if item['is_dir'] else '')
+            name = item.name + ('/' if item.is_dir else '')
             text_content_list.append(
                 TextContent(
                     type="text",
@@ -104,4 +192,45 @@ class LsHandler(Handler):
                 )
             )
 
+        if next_cursor:
+            text_content_list.append(
+                TextContent(
+                    type="text",
+                    text=f"Next cursor: {next_cursor}",
+                )
+            )
+
         return text_content_list
+
+    @staticmethod
+    async def create_output_table(
+            items: List[DirectoryEntry],
+            total_items: int,
+            page: int,
+            next_cursor: str | None = None) -> List[TextContent]:
+        """
+        Create a single TextContent holding the page as a tab-separated table.
+
+        Args:
+            items (List[DirectoryEntry]): The list of directory items for the current page.
+            total_items (int): The total number of matching items in the directory.
+            page (int): The current page number.
+            next_cursor (str | None): The cursor of the next page, None on the last page.
+
+        Returns:
+            List[TextContent]: A list with one TextContent object holding the table.
+        """
+        total_pages = (total_items + LsHandler.PAGE_SIZE - 1) // LsHandler.PAGE_SIZE
+
+        lines = [f"Total items: {total_items} (Page {page} of {total_pages})", "type\tsize\tmodified\tname"]
+        for item in items:
+            size = '-' if item.size is None else str(item.size)
+            modified = '-'
+            if item.mtime_ns is not None:
+                modified = datetime.fromtimestamp(item.mtime_ns / 1e9).strftime('%Y-%m-%d %H:%M:%S')
+            name = item.name + ('/' if item.is_dir else '')
+            lines.append(f"{'d' if item.is_dir else 'f'}\t{size}\t{modified}\t{name}")
+        if next_cursor:
+            lines.append(f"Next cursor: {next_cursor}")
+
+        return [TextContent(type="text", text="\n".join(lines))]
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import os
+import shutil
+import stat
+import time
+
+from mcp.types import TextContent
+
+from file_system_windows_python.handlers.handler import Handler
+from file_system_windows_python.schemas.move_arguments import MoveArguments
+from file_system_windows_python.tools.tools import Tools
+from file_system_windows_python.util.cache_invalidation import invalidate_path
+from file_system_windows_python.util.file_copy import copy_file
+from file_system_windows_python.util.logging import log_execution
+from file_system_windows_python.util.path_locks import PathLocks
+from file_system_windows_python.util.path_policy import PathPolicy
+from file_system_windows_python.util.path_validator import PathValidator
+from file_system_windows_python.util.response_budget import ResponseBudget
+from file_system_windows_python.util.tree_copy import check_destination, copy_tree
+from file_system_windows_python.util.trigram_index import SearchIndex
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class MoveHandler(Handler):
+    """
+    Handler for moving or renaming a file or a directory tree.
+
+    Both ends are checked against the allowed and denied paths. Within one volume the
+    move is a single rename, however large the tree. Across volumes the source is copied
+    like `copy` does and only removed once everything below it was copied. A symbolic
+    link or junction is moved itself, not the path it points to, and only within one volume.
+    """
+
+    @log_execution(Tools.MOVE)
+    async def execute(self, arguments: dict, budget: ResponseBudget | None = None) -> list[TextContent]:
+        """
+        Execute the handler to move a file or directory.
+
+        Args:
+            arguments (dict): A dictionary of arguments, see `MoveArguments`.
+            budget (ResponseBudget | None): Unused, the output is small.
+
+        Returns:
+            list[TextContent]: A list containing a TextContent object describing the move.
+
+        Raises:
+            ValueError: If the destination exists and may not be replaced, the source contains a denied
+                directory, or the source is a link and the destination on another volume.
+            PathValidationError: If either path is not allowed or the source does not exist.
+        """
+        args = MoveArguments(**arguments)
+        source = await PathValidator.validate_source_path(args.source, allow_link=True)
+        target = await PathValidator.validate_target_path(args.destination)
+        check_destination(source, target, args.overwrite)
+
+        is_link = PathValidator.is_link(source.stat)
+        is_dir = stat.S_ISDIR(source.stat.st_mode) and not is_link
+        if is_dir:
+            if denied := PathPolicy().index.denied_below(source.path):
+                raise ValueError(f"{source.path} contains the denied directory {denied[0]} and cannot be moved")
+            if os.path.lexists(target):
+                raise ValueError(f"Destination {target} exists, a directory can only be moved to a new path")
+
+        start = time.perf_counter()
+        same_volume = source.stat.st_dev == (await asyncio.to_thread(os.stat, target.parent)).st_dev
+        if is_link and not same_volume:
+            raise ValueError(f"{source.path} is a link, which can only be moved within one volume")
+        async with PathLocks().hold(writes=(source.path, target)):
+            if same_volume:
+                await asyncio.to_thread(os.replace, source.path, target)
+                text = f"Moved {source.path} to {target}"
+            elif is_dir:
+                report = await copy_tree(source.path, target)
+                if not report.complete:
+                    return [TextContent(
+                        type="text",
+                        text=f"Copied {source.path} to {target} but kept the source, not everything was "
+                             f"copied: {report.summary()}"
+                    )]
+                await asyncio.to_thread(shutil.rmtree, source.path)
+                text = f"Moved {source.path} to {target} across volumes: {report.summary()}"
+            else:
+                size = await asyncio.to_thread(copy_file, source.path, target)
+                await asyncio.to_thread(os.remove, source.path)
+                text = f"Moved {source.path} to {target} across volumes ({size} bytes)"
+            invalidate_path(source.path)
+            invalidate_path(target)
+            if is_dir and same_volume:
+                # The renamed files were never written one by one like copy_tree does
+                await SearchIndex().notify_tree(target)
+
+        return [TextContent(type="text", text=f"{text} in {time.perf_counter() - start:.2f}s")]
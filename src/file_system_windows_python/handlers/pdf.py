@@ -0,0 +1,132 @@
+import logging
+from typing import List
+
+from mcp.types import TextContent
+
+from file_system_windows_python.handlers.handler import Handler
+from file_system_windows_python.handlers.read_file import ReadFileHandler
+from file_system_windows_python.schemas.pdf_arguments import PdfArguments
+from file_system_windows_python.tools.tools import Tools
+from file_system_windows_python.util.logging import log_execution
+from file_system_windows_python.util.path_locks import PathLocks
+from file_system_windows_python.util.path_validator import PathValidator
+from file_system_windows_python.util.pdf_index import PdfIndex, PdfIndexCache
+from file_system_windows_python.util.response_budget import ResponseBudget
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class PdfHandler(Handler):
+    """
+    Handler for working with large PDFs as text.
+
+    This handler answers from the PdfIndex of the document, which is built once per file
+    version: it lists the outline, reads page ranges as text and searches for a phrase,
+    returning the pages it occurs on. Output stops at the response budget, with a cursor
+    to continue.
+    """
+    OUTPUT_MARGIN = 1024  # Bytes kept free for the cursor
+    MAX_HEADER_PAGES = 100  # Pages listed in the header of a search
+
+    @log_execution(Tools.PDF)
+    async def execute(self, arguments: dict, budget: ResponseBudget | None = None) -> List[TextContent]:
+        """
+        Execute the handler to list the outline, read pages or search a PDF.
+
+        Args:
+            arguments (dict): A dictionary of arguments, see `PdfArguments`.
+            budget (ResponseBudget | None): The byte budget of the response.
+
+        Returns:
+            List[TextContent]: A list with one TextContent object, a header followed by the outline
+                entries, pages or matches.
+
+        Raises:
+            ValueError: If the arguments are invalid, a page does not exist or the cursor does not belong to the file.
+            PathValidationError: If the path does not exist, is not a file or is not allowed.
+        """
+        args = PdfArguments(**arguments)
+        budget = budget or ResponseBudget()
+        budget.take(PdfHandler.OUTPUT_MARGIN)
+
+        file = await PathValidator.validate_file_path(args.path)
+        if file.file_type != 'application/pdf':
+            return [TextContent(type="text", text=f"File type {file.file_type} is not a PDF!")]
+
+        position = 0
+        if args.cursor:
+            state = ReadFileHandler.parse_cursor(args.cursor, file)
+            if state.get('action') != args.action:
+                raise ValueError(f"Cursor does not belong to the {args.action} action")
+            args.start_page, args.end_page, args.query = state.get('selection', [None, None, None])
+            position = state.get('index', 0)
+
+        async with PathLocks().read(file.path):
+            index = await PdfIndexCache().get_or_build(file.path, file.stat)
+        header, blocks = PdfHandler.blocks(index, args)
+
+        budget.take(len(header.encode('utf-8')))
+        lines = [header]
+        next_index = None
+        for block_index in range(position, len(blocks)):
+            if not budget.take(len(blocks[block_index].encode('utf-8')) + 1):
+                next_index = block_index
+                break
+            lines.append(blocks[block_index])
+
+        if next_index == position:
+            # A single page larger than the whole budget is cut rather than blocking the output.
+            lines.append(blocks[position].encode('utf-8')[:budget.remaining].decode('utf-8', errors='ignore'))
+            lines.append("[Entry cut at the response limit]")
+            budget.take(budget.remaining)
+            next_index = position + 1 if position + 1 < len(blocks) else None
+
+        if next_index is not None:
+            cursor = ReadFileHandler.make_cursor(
+                file, action=args.action, selection=[args.start_page, args.end_page, args.query], index=next_index)
+            lines.append(f"{next_index - position} of {len(blocks) - position} remaining entries shown\n"
+                         f"Next cursor: {cursor}")
+        return [TextContent(type="text", text="\n".join(lines))]
+
+    @staticmethod
+    def blocks(index: PdfIndex, args: PdfArguments) -> tuple[str, list[str]]:
+        """
+        Create the header and the output blocks of an action.
+
+        Args:
+            index (PdfIndex): The index of the document.
+            args (PdfArguments): The arguments, with the selection restored from a cursor.
+
+        Returns:
+            tuple[str, list[str]]: The header and one block per outline entry, page or match.
+
+        Raises:
+            ValueError: If a selected page does not exist or the query contains no words.
+        """
+        if args.action == 'outline':
+            entries = [
+                f"{'  ' * (entry.level - 1)}{entry.title}" + (f" (page {entry.page})" if entry.page > 0 else "")
+                for entry in index.outline
+            ]
+            if not entries:
+                return f"The PDF has {index.page_count} pages and no outline", []
+            return f"Outline of the PDF ({index.page_count} pages):", entries
+
+        if args.action == 'text':
+            pages = ReadFileHandler.select_pages(index.page_count, args.start_page, args.end_page, None)
+            if not pages:
+                return "The PDF has no pages", []
+            blocks = [
+                f'<page number="{page + 1}">\n{index.page_text(page)}</page>'
+                for page in pages
+            ]
+            return f"Text of pages {pages[0] + 1} to {pages[-1] + 1} of {index.page_count}:", blocks
+
+        matches = index.search(args.query)
+        pages = sorted({match.page for match in matches})
+        header = f'Found "{args.query}" {len(matches)} times on {len(pages)} of {index.page_count} pages'
+        if pages:
+            shown = ', '.join(map(str, pages[:PdfHandler.MAX_HEADER_PAGES]))
+            header += f": {shown}" + (", ..." if len(pages) > PdfHandler.MAX_HEADER_PAGES else "")
+        return header, [f"page {match.page}: {match.snippet}" for match in matches]
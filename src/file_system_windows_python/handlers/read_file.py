@@ -1,20 +1,33 @@
 import asyncio
 import base64
-import io
+import codecs
+import locale
 import logging
-from pathlib import Path
-from typing import List, Union
+from typing import AsyncIterator, List, Union
 
-import aiofiles
-import fitz
-from PIL import Image
 from mcp.types import TextContent, ImageContent
 
 from file_system_windows_python.handlers.handler import Handler
-from file_system_windows_python.schemas.path_schema_base import PathSchemaBase
+from file_system_windows_python.schemas.read_file_arguments import ReadFileArguments
 from file_system_windows_python.tools.tools import Tools
+from file_system_windows_python.util import image_worker
+from file_system_windows_python.util.cancellation import OperationCancelled
+from file_system_windows_python.util.cursor import decode_cursor, encode_cursor
+from file_system_windows_python.util.etag import content_etag
+from file_system_windows_python.util.image_cache import ImageCache, TransformedImage
 from file_system_windows_python.util.logging import log_execution
-from file_system_windows_python.util.path_validator import PathValidator
+from file_system_windows_python.util.line_index import LineIndexCache
+from file_system_windows_python.util.path_locks import PathLocks
+from file_system_windows_python.util.path_validator import PathValidationError, PathValidator
+from file_system_windows_python.util.pdf_engine import PdfEngine, RenderedPage
+from file_system_windows_python.util.pdf_index import PdfIndex, PdfIndexCache
+from file_system_windows_python.util.pdf_worker import RenderSettings, file_stamp
+from file_system_windows_python.util.progress import report_partial, report_progress
+from file_system_windows_python.util.render_planner import RenderPlanner
+from file_system_windows_python.util.response_budget import ResponseBudget
+from file_system_windows_python.util.result_guard import ResultGuard
+from file_system_windows_python.util.validated_path import ValidatedPath
+from file_system_windows_python.util.worker_pool import WorkerPool
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -25,214 +38,626 @@ class ReadFileHandler(Handler):
     Handler for reading files.
 
     This handler reads the contents of a specified file and returns it as a list of TextContent or ImageContent objects.
+    Parts of text files can be read by byte range, line range, or as the first or last lines.
+    Text and PDF output stops when the response budget is used up, with a cursor to continue.
+    Images are scaled down to fit the response and can be cropped to a region.
     """
+    OUTPUT_MARGIN = 1024  # Bytes kept free for the range description and the cursor
+    MAX_IMAGE_DIMENSION = 1568  # Longest side of a returned image in pixels
 
     @log_execution(Tools.READ_FILE)
-    async def execute(self, arguments: dict) -> List[TextContent | ImageContent]:
+    async def execute(
+            self,
+            arguments: dict,
+            budget: ResponseBudget | None = None) -> List[TextContent | ImageContent]:
         """
         Execute the handler to read a file.
 
         Args:
             arguments (dict): A dictionary of arguments, including:
                 - path (str): The path of the file to read.
+                - offset (int, optional): The first byte of a byte range of a text file.
+                - length (int, optional): The number of bytes of a byte range.
+                - start_line (int, optional): The first line of a line range of a text file, 1-based.
+                - end_line (int, optional): The last line of a line range, inclusive.
+                - head (int, optional): The number of lines to read from the start of a text file.
+                - tail (int, optional): The number of lines to read from the end of a text file.
+                - pages (list[int], optional): The 1-based pages of a PDF to read, in this order.
+                - start_page (int, optional): The first page of a PDF page range, 1-based.
+                - end_page (int, optional): The last page of a PDF page range, inclusive.
+                - max_dimension (int, optional): The longest side of a returned image in pixels.
+                - crop (list[int], optional): The region (left, top, width, height) of an image to return.
+                - cursor (str, optional): A cursor returned by a previous call to continue a cut text or PDF.
+            budget (ResponseBudget | None): The byte budget of the response, text and PDF pages stop when it is used up.
 
         Returns:
             List[TextContent | ImageContent]: A list of content objects representing the file contents.
 
         Raises:
-            ValueError: If the path argument is missing.
+            ValueError: If the path argument is missing or several ranges are given.
             Exception: If an error occurs while reading the file.
         """
-        args = PathSchemaBase(**arguments)
+        args = ReadFileArguments(**arguments)
         path = args.path
 
-        await PathValidator.validate_file_path(path)
-        file_path = await PathValidator.resolve_absolute_path(path)
+        budget = budget or ResponseBudget()
+        budget.take(ReadFileHandler.OUTPUT_MARGIN)
+
+        file = await PathValidator.validate_file_path(path, open_file=True)
+        async with PathLocks().read(file.path):
+            with file:
+                state = ReadFileHandler.parse_cursor(args.cursor, file) if args.cursor else None
+                try:
+                    file_type = file.file_type
+                    if args.shapes_image and not file_type.startswith('image/'):
+                        return [TextContent(type="text", text=f"crop and max_dimension only apply to images, not {file_type}!")]
+                    if file_type.startswith('image/') and not args.is_ranged and not args.selects_pages:
+                        return await self.create_output_image(file, args, budget)
+                    if file_type == 'application/pdf':
+                        if args.is_ranged and not args.cursor:
+                            return [TextContent(type="text", text="Select PDF pages with pages, start_page or end_page!")]
+                        return await self.create_output_pdf_as_images(file, args, budget, state)
+                    if args.selects_pages:
+                        return [TextContent(type="text", text=f"Pages can only be selected in PDFs, not {file_type}!")]
+                    if file_type.startswith('text/') and (args.is_ranged or file.size > budget.remaining):
+                        return await asyncio.to_thread(self.create_output_text_range, file, args, budget, state)
+                    if args.is_ranged:
+                        return [TextContent(type="text", text=f"Ranges can only be read from text files, not {file_type}!")]
+                    content = await asyncio.to_thread(file.read)
+
+                    if file_type.startswith('text/'):
+                        try:
+                            output = await self.create_output_text(content)
+                        except UnicodeDecodeError:
+                            return [TextContent(type="text", text=f"File type {file_type} could not be decoded as text!")]
+                        output.append(TextContent(type="text", text=f"ETag: {content_etag(content)}"))
+                        size = ResultGuard.measure_size(output)
+                        if size > budget.remaining:
+                            # Decoding in the locale encoding can make the text larger than the file
+                            return await asyncio.to_thread(self.create_output_text_range, file, args, budget, state)
+                        budget.take(size)
+                        return output
+                    else:
+                        return [TextContent(type="text", text=f"File type {file_type} is not allowed!")]
+                except OperationCancelled:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error reading file: {str(e)}")
+                    return [TextContent(type="text", text=f"Error reading file: {str(e)}")]
 
-        try:
-            try:
-                return await self.create_output_text(file_path)
-            except UnicodeDecodeError:
-                file_type = await PathValidator.get_file_type(file_path)
-                if file_type.startswith('image/'):
-                    return await self.create_output_image(file_path, file_type)
-                elif file_type == 'application/pdf':
-                    return await self.create_output_pdf_as_images(file_path)
-                else:
-                    return [TextContent(type="text", text=f"File type {file_type} is not allowed!")]
-        except Exception as e:
-            logger.error(f"Error reading file: {str(e)}")
-            return [TextContent(type="text", text=f"Error reading file: {str(e)}")]
+    @staticmethod
+    def make_cursor(file: ValidatedPath, **position) -> str:
+        """
+        Create a cursor continuing a read at the given position.
+
+        Args:
+            file (ValidatedPath): The file being read.
+            **position: The position to resume at, e.g. offset and end for text or page for PDFs.
+
+        Returns:
+            str: The opaque cursor.
+        """
+        return encode_cursor({'path': str(file.path), 'mtime': file.stat.st_mtime_ns, **position})
 
     @staticmethod
-    async def create_output_text(file_path: Path) -> List[TextContent]:
+    def parse_cursor(cursor: str, file: ValidatedPath) -> dict:
+        """
+        Extract the resume position from a read-file cursor.
+
+        Args:
+            cursor (str): The cursor returned by a previous call.
+            file (ValidatedPath): The file being read.
+
+        Returns:
+            dict: The position to resume at.
+
+        Raises:
+            ValueError: If the cursor is malformed, belongs to another file or the file changed since.
+        """
+        state = decode_cursor(cursor)
+        if state.get('path') != str(file.path):
+            raise ValueError(f"Cursor does not belong to {file.path}")
+        if state.get('mtime') != file.stat.st_mtime_ns:
+            raise ValueError(f"File {file.path} changed since the cursor was issued, read it again without a cursor")
+        return state
+
+    @staticmethod
+    async def create_output_text(content: bytes) -> List[TextContent]:
         """
         Create the output list of TextContent objects for a text file.
 
         Args:
-            file_path (Path): The path of the text file.
+            content (bytes): The raw content of the text file.
 
         Returns:
             List[TextContent]: A list of TextContent objects representing the file contents.
+
+        Raises:
+            UnicodeDecodeError: If the content is neither UTF-8 nor in the locale encoding.
         """
-        async with aiofiles.open(file_path, 'r') as f:
-            content = await f.read()
-        if not content:
+        text = ReadFileHandler.decode_text(content)
+        if not text:
             return [TextContent(type="text", text="File is empty")]
-        return [TextContent(type="text", text=f"<fileContent>{content}</fileContent>")]
+        return [TextContent(type="text", text=f"<fileContent>{text}</fileContent>")]
 
     @staticmethod
-    async def create_output_image(file_path: Path, file_type: str) -> List[ImageContent]:
+    def create_output_text_range(
+            file: ValidatedPath,
+            args: ReadFileArguments,
+            budget: ResponseBudget,
+            state: dict | None = None) -> List[TextContent]:
         """
-        Create the output list of ImageContent objects for an image file.
+        Create the output list of TextContent objects for part of a text file.
+
+        The file is mapped into memory, so only the selected part is read. Line ranges are
+        located with the cached line index of the file, the first and last lines by scanning
+        from the respective end. A selection larger than the remaining budget is cut at a line
+        break and followed by a cursor that continues at the exact byte where it was cut.
+
+        This is a blocking call, run it in a thread from async code.
 
         Args:
-            file_path (Path): The path of the image file.
-            file_type (str): The MIME type of the image file.
+            file (ValidatedPath): The validated text file.
+            args (ReadFileArguments): The arguments selecting the range.
+            budget (ResponseBudget): The byte budget of the response.
+            state (dict | None): The position decoded from a cursor, if any.
 
         Returns:
-            List[ImageContent]: A list of ImageContent objects representing the file contents.
+            List[TextContent]: A description of the range, the content of the range and the
+                cursor if the range was cut.
         """
-        async with aiofiles.open(file_path, 'rb') as f:
-            content = await f.read()
-        return [ImageContent(
-            type="image",
-            data=base64.b64encode(content).decode('utf-8'),
-            mimeType=file_type
-        )]
+        if file.size == 0:
+            return [TextContent(type="text", text="File is empty")]
+
+        limit = budget.remaining
+        index = None
+        with file.map() as data:
+            size = len(data)
+            first_line = None
+            if state is not None:
+                start, end = min(state.get('offset', 0), size), min(state.get('end', size), size)
+                first_line = state.get('line')
+            elif args.head is not None:
+                start, end = 0, ReadFileHandler._skip_lines_forward(data, 0, args.head)
+                first_line = 1
+            elif args.tail is not None:
+                start, end = ReadFileHandler._skip_lines_backward(data, size, args.tail), size
+            elif args.start_line is not None or args.end_line is not None:
+                index = LineIndexCache().get_or_build(file.path, file.stat, data)
+                start = index.line_offset(data, args.start_line or 1)
+                end = size if args.end_line is None else index.line_offset(data, args.end_line + 1)
+                first_line = args.start_line or 1
+            elif args.offset is not None or args.length is not None:
+                start = min(args.offset or 0, size)
+                end = size if args.length is None else min(start + args.length, size)
+            else:
+                start, end = 0, size
+                first_line = 1
+
+            if end <= start:
+                return [TextContent(type="text", text=f"Range is past the end of the file ({size} bytes)")]
+
+            cut_start, cut_end = start, end
+            keep = limit
+            while True:
+                if cut_end - cut_start > keep:
+                    if args.tail is not None:
+                        cut_start = ReadFileHandler._align_forward(data, end - keep, end)
+                    else:
+                        cut_end = ReadFileHandler._align_backward(data, start, start + keep)
+                text = ReadFileHandler._decode_range(data, cut_start, cut_end)
+                if len(text.encode('utf-8')) <= limit:
+                    break
+                keep //= 2
+            breaks = data[cut_start:cut_end].count(b'\n')
+            lines = breaks + (0 if data[cut_end - 1:cut_end] == b'\n' else 1)
+            truncated = (cut_start, cut_end) != (start, end)
+
+            if args.head is not None and state is None:
+                description = f"First {lines} lines"
+            elif args.tail is not None:
+                description = f"Last {lines} lines"
+            elif first_line is not None:
+                description = f"Lines {first_line}-{first_line + lines - 1}"
+                if index is not None:
+                    description += f" of {index.total_lines(data)}"
+            else:
+                description = f"Bytes {cut_start}-{cut_end - 1} of {size}"
+        budget.take(len(text.encode('utf-8')))
+
+        output = [
+            TextContent(type="text", text=description + (" (truncated to fit the response)" if truncated else "")),
+            TextContent(type="text", text=f"<fileContent>{text}</fileContent>"),
+        ]
+        if truncated and args.tail is None:
+            position = {'offset': cut_end, 'end': end}
+            if first_line is not None:
+                position['line'] = first_line + breaks
+            output.append(TextContent(type="text", text=f"Next cursor: {ReadFileHandler.make_cursor(file, **position)}"))
+        return output
 
     @staticmethod
-    async def create_output_pdf_as_images(file_path: Path) -> List[Union[ImageContent, TextContent]]:
+    def _skip_lines_forward(data, position: int, count: int) -> int:
+        """Return the offset after `count` line breaks from `position`, or the end of the buffer."""
+        for _ in range(count):
+            position = data.find(b'\n', position) + 1
+            if position == 0:
+                return len(data)
+        return position
+
+    @staticmethod
+    def _skip_lines_backward(data, position: int, count: int) -> int:
+        """Return the start of the `count`-th line before `position`, ignoring a final line break."""
+        if data[position - 1:position] == b'\n':
+            position -= 1
+        for _ in range(count):
+            position = data.rfind(b'\n', 0, position)
+            if position == -1:
+                return 0
+        return position + 1
+
+    @staticmethod
+    def _align_backward(data, start: int, end: int) -> int:
         """
-        Create the output list of ImageContent and TextContent objects for a PDF file.
+        Move the end of a range back to just after its last line break.
+
+        A range without a line break, i.e. part of a single long line, is cut at the last
+        character boundary instead, so the cursor continues with the rest of the line.
+        """
+        newline = data.rfind(b'\n', start, end)
+        if newline != -1:
+            return newline + 1
+        return ReadFileHandler._character_boundary(data, start, end, -1)
+
+    @staticmethod
+    def _align_forward(data, start: int, end: int) -> int:
+        """Move the start of a range forward to just after its first line break, or else to a character boundary."""
+        newline = data.find(b'\n', start, end)
+        if newline != -1 and newline + 1 < end:
+            return newline + 1
+        return ReadFileHandler._character_boundary(data, start, end, 1)
+
+    @staticmethod
+    def _character_boundary(data, start: int, end: int, step: int) -> int:
+        """
+        Find the nearest position between `start` and `end` that splits neither a UTF-8 character nor a CRLF.
 
         Args:
-            file_path (Path): The path of the PDF file.
+            data: The buffer.
+            start (int): The start of the range.
+            end (int): The end of the range.
+            step (int): -1 to search back from `end`, 1 to search forward from `start`.
 
         Returns:
-            List[Union[ImageContent, TextContent]]: A list of content objects representing the PDF contents.
+            int: The position, or the original one if there is none within a few bytes.
         """
-        results = []
-        text_only = False
-
-        with fitz.open(str(file_path)) as pdf:
-            page_count = len(pdf)
-
-            if page_count > 100:
-                text_only = True
-                results.append(TextContent(
-                    type="text",
-                    text="PDF contains more than 100 pages, only text is returned."
-                ))
-
-            extracted_texts = []
-            tasks = []
-            for page_num in range(page_count):
-                page = pdf[page_num]
-                tasks.append(
-                    ReadFileHandler.process_page(
-                        page,
-                        text_only,
-                        extracted_texts,
-                        results
-                    )
-                )
-
-            await asyncio.gather(*tasks)
+        position = end if step < 0 else start
+        candidate = position
+        for _ in range(4):
+            if candidate <= 0 or candidate >= len(data):
+                return candidate
+            split_character = data[candidate] & 0xC0 == 0x80
+            split_line_break = data[candidate - 1:candidate + 1] == b'\r\n'
+            if not split_character and not split_line_break:
+                return candidate
+            candidate += step
+            if not start < candidate < end:
+                break
+        return position
 
-            if text_only:
-                results.append(TextContent(
-                    type="text",
-                    text=f"<extractedText>{''.join(extracted_texts)}</extractedText>"
-                ))
+    @staticmethod
+    def _decode_range(data, start: int, end: int) -> str:
+        """
+        Decode part of a buffer.
+
+        A range of a UTF-8 file is decoded as UTF-8 even where it starts or ends inside a
+        character, the split characters are replaced. Only ranges that are not UTF-8 apart
+        from their edges fall back to the locale encoding. Null bytes are rejected like in
+        `decode_text`.
+        """
+        content = bytes(data[start:end])
+        if b'\x00' in content:
+            raise PathValidationError("File contains null bytes! Null bytes aren't currently supported.")
+        lead = 0
+        while lead < 3 and lead < len(content) and content[lead] & 0xC0 == 0x80:
+            lead += 1
+        try:
+            codecs.getincrementaldecoder('utf-8')().decode(content[lead:], final=False)
+        except UnicodeDecodeError:
+            try:
+                return ReadFileHandler.decode_text(content)
+            except UnicodeDecodeError:
+                pass
+        return content.decode('utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+
+    @staticmethod
+    def decode_text(content: bytes) -> str:
+        """
+        Decode raw file content the way a text mode read would.
+
+        UTF-8 is tried first, then the locale encoding. Line endings are normalized to '\\n'.
+        Classification only samples the ends of a file, so null bytes are rejected here, in
+        every byte that is returned.
+
+        Args:
+            content (bytes): The raw content.
+
+        Returns:
+            str: The decoded text.
+
+        Raises:
+            UnicodeDecodeError: If the content is neither UTF-8 nor in the locale encoding.
+            PathValidationError: If the content contains null bytes.
+        """
+        if b'\x00' in content:
+            raise PathValidationError("File contains null bytes! Null bytes aren't currently supported.")
+        try:
+            text = content.decode('utf-8')
+        except UnicodeDecodeError:
+            text = content.decode(locale.getpreferredencoding(False))
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+    @staticmethod
+    async def create_output_image(
+            file: ValidatedPath,
+            args: ReadFileArguments,
+            budget: ResponseBudget) -> List[Union[ImageContent, TextContent]]:
+        """
+        Create the output list of ImageContent and TextContent objects for an image file.
+
+        Images that fit into the maximum dimension and the budget are returned as they are.
+        Larger images, and crop regions, are scaled and encoded again on the process pool.
+        Results are cached by file identity in the ImageCache.
+
+        Args:
+            file (ValidatedPath): The validated image file.
+            args (ReadFileArguments): The arguments, including max_dimension and crop.
+            budget (ResponseBudget): The byte budget of the response.
+
+        Returns:
+            List[Union[ImageContent, TextContent]]: The image, followed by a note with the original size if it was changed.
 
+        Raises:
+            ValueError: If the crop region lies outside the image or the image does not fit the budget.
+        """
+        max_dimension = args.max_dimension or ReadFileHandler.MAX_IMAGE_DIMENSION
+        max_bytes = budget.remaining * 3 // 4  # Images are measured by their base64 length
+        crop = tuple(args.crop) if args.crop is not None else None
+
+        cache = ImageCache()
+        key = cache.make_key(file.stat, max_dimension, max_bytes, crop)
+        image = cache.get(key)
+        if image is None:
+            image = TransformedImage(*await WorkerPool().submit(
+                image_worker.transform_image, str(file.path), file_stamp(file.stat), max_dimension, max_bytes, crop))
+            cache.put(key, image)
+
+        results: List[Union[ImageContent, TextContent]] = [ImageContent(
+            type="image",
+            data=base64.b64encode(image.data).decode('utf-8'),
+            mimeType=image.mime_type
+        )]
+        budget.add(results[0])
+        if image.size != image.original_size or crop is not None:
+            region = f" of the region {crop[2]}x{crop[3]} at {crop[0]},{crop[1]}" if crop is not None else ""
+            results.append(TextContent(
+                type="text",
+                text=f"Image of {image.original_size[0]}x{image.original_size[1]} pixels returned as "
+                     f"{image.size[0]}x{image.size[1]}{region}; pass crop to see a region in more detail"
+            ))
         return results
 
     @staticmethod
-    async def process_page(
-            page,
-            text_only: bool,
-            extracted_texts: List[str],
-            results: List[Union[ImageContent, TextContent]]):
+    async def create_output_pdf_as_images(
+            file: ValidatedPath,
+            args: ReadFileArguments,
+            budget: ResponseBudget,
+            state: dict | None = None) -> List[Union[ImageContent, TextContent]]:
         """
-        Process a single page of a PDF file.
+        Create the output list of ImageContent and TextContent objects for a PDF file.
+
+        The RenderPlanner picks the render settings from the remaining budget, then the
+        selected pages are rendered on the process pool by the PdfEngine and added in order
+        until the next page does not fit into the budget. The output then ends with a cursor
+        continuing at that page. A first page that does not fit on its own is rendered
+        smaller or returned as text only. Selections of more than 100 pages are returned as
+        text from the PdfIndex of the document.
 
         Args:
-            page: The PDF page to process.
-            text_only (bool): Whether to extract text only.
-            extracted_texts (List[str]): A list to store extracted texts.
-            results (List[Union[ImageContent, TextContent]]): A list to store content objects.
+            file (ValidatedPath): The validated PDF file.
+            args (ReadFileArguments): The arguments, including the page selection.
+            budget (ResponseBudget): The byte budget of the response.
+            state (dict | None): The position decoded from a cursor, if any.
 
         Returns:
-            None
+            List[Union[ImageContent, TextContent]]: A list of content objects representing the PDF contents.
+
+        Raises:
+            ValueError: If a selected page does not exist.
         """
-        text = page.get_text()
+        engine = PdfEngine()
+        page_count = await engine.page_count(file.path, file.stat)
+        if state is not None:
+            selection = state.get('selection', [None, None, None])
+            position = state.get('index', 0)
+        else:
+            selection = [args.start_page, args.end_page, args.pages]
+            position = 0
+        pages = ReadFileHandler.select_pages(page_count, *selection)
 
+        results = []
+        extracted_texts = []
+        text_only = len(pages) > 100
+        if text_only:
+            notice = TextContent(
+                type="text",
+                text="PDF contains more than 100 pages, only text is returned. "
+                     "Use the pdf tool to list its outline, read page ranges or search it."
+            )
+            budget.add(notice)
+            results.append(notice)
+
+        settings = RenderSettings()
+        if not text_only:
+            settings = await RenderPlanner().plan(file.path, file.stat, pages[position:], budget.remaining)
+
+        next_index = None
+        index = position
+        text_fallbacks = []
         if text_only:
-            extracted_texts.append(text)
+            pdf_index = await PdfIndexCache().get_or_build(file.path, file.stat)
+            rendered_pages = ReadFileHandler.indexed_pages(pdf_index, pages[position:])
         else:
-            optimal_zoom = await ReadFileHandler._calculate_zoom(page)
-            webp_bytes = await ReadFileHandler._convert_page_to_webp(page, optimal_zoom)
+            rendered_pages = engine.render(file.path, file.stat, pages[position:], settings=settings)
+        async for rendered in rendered_pages:
+            page_contents = ReadFileHandler.page_contents(rendered)
+            if not budget.take(ResultGuard.measure_size(page_contents)):
+                if index > position:
+                    next_index = index
+                    break
+                # The first page does not fit a response on its own, so it is retried with the
+                # smallest profile and falls back to its text if that is still too large.
+                page_contents = await ReadFileHandler.fit_oversized_page(file, rendered, settings, budget)
+                if page_contents is None:
+                    next_index = index
+                    break
+                if len(page_contents) == 1:
+                    text_fallbacks.append(rendered.number + 1)
+            index += 1
+            report_progress(index - position, len(pages) - position, f"Page {rendered.number + 1}")
+            if text_only:
+                extracted_texts.append(rendered.text)
+            else:
+                results.extend(page_contents)
+                report_partial(page_contents)
 
-            results.append(ImageContent(
-                type="image",
-                data=base64.b64encode(webp_bytes).decode('utf-8'),
-                mimeType="image/webp"
+        if next_index == position:
+            # A single page whose text alone exceeds the budget is skipped rather than blocking the read.
+            results.append(TextContent(type="text", text=f"Page {pages[position] + 1} is too large for a response"))
+            next_index = position + 1 if position + 1 < len(pages) else None
+
+        if text_fallbacks:
+            results.append(TextContent(
+                type="text",
+                text=f"Page {text_fallbacks[0]} is too large as an image and was returned as text only"
+            ))
+        if text_only:
+            results.append(TextContent(
+                type="text",
+                text=f"<extractedText>{''.join(extracted_texts)}</extractedText>"
             ))
+        if next_index is not None:
+            cursor = ReadFileHandler.make_cursor(file, selection=selection, index=next_index)
             results.append(TextContent(
                 type="text",
-                text=f"<extractedText>{text}</extractedText>"
+                text=f"{next_index - position} of {len(pages) - position} remaining selected pages shown "
+                     f"(the PDF has {page_count} pages)\nNext cursor: {cursor}"
             ))
 
+        return results
+
     @staticmethod
-    async def _convert_page_to_webp(page, optimal_zoom: float):
+    async def indexed_pages(index: PdfIndex, pages: list[int]) -> AsyncIterator[RenderedPage]:
         """
-        Convert a PDF page to a WebP image.
+        Yield the text of pages from the PDF index, in the same form as the PdfEngine.
 
         Args:
-            page: The PDF page to convert.
-            optimal_zoom (float): The zoom level for the conversion.
+            index (PdfIndex): The index of the document.
+            pages (list[int]): The 0-based page numbers, in output order.
 
-        Returns:
-            bytes: The WebP image data.
+        Yields:
+            RenderedPage: The pages without an image.
         """
-        def _convert():
-            pix = page.get_pixmap(matrix=fitz.Matrix(optimal_zoom, optimal_zoom))
-            mode = "RGBA" if pix.alpha else "RGB"
-            img = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
-            output_buffer = io.BytesIO()
-            img.save(output_buffer, format="WEBP", quality=80, method=6)
-            return output_buffer.getvalue()
+        for page_number in pages:
+            yield RenderedPage(page_number, None, index.page_text(page_number))
+
+    @staticmethod
+    async def fit_oversized_page(
+            file: ValidatedPath,
+            rendered: RenderedPage,
+            settings: RenderSettings,
+            budget: ResponseBudget) -> List[Union[ImageContent, TextContent]] | None:
+        """
+        Fit a page that is too large for the budget with the planned settings.
+
+        The page is rendered again with the smallest render profile, unless it was planned
+        with that one already, and only its text is returned if the image still does not fit.
+
+        Args:
+            file (ValidatedPath): The validated PDF file.
+            rendered (RenderedPage): The page rendered with the planned settings.
+            settings (RenderSettings): The settings the page was rendered with.
+            budget (ResponseBudget): The byte budget of the response.
 
-        return await asyncio.to_thread(_convert)
+        Returns:
+            List[Union[ImageContent, TextContent]] | None: The content objects of the page, already
+                accounted for in the budget, or None if not even the text fits.
+        """
+        smallest = RenderPlanner.PROFILES[-1]
+        if settings != smallest:
+            async for smaller in PdfEngine().render(file.path, file.stat, [rendered.number], settings=smallest):
+                page_contents = ReadFileHandler.page_contents(smaller)
+                if budget.take(ResultGuard.measure_size(page_contents)):
+                    return page_contents
+
+        page_contents = [TextContent(type="text", text=f"<extractedText>{rendered.text}</extractedText>")]
+        if budget.take(ResultGuard.measure_size(page_contents)):
+            return page_contents
+        return None
 
     @staticmethod
-    async def _calculate_zoom(page) -> float:
+    def select_pages(
+            page_count: int,
+            start_page: int | None,
+            end_page: int | None,
+            pages: list[int] | None) -> list[int]:
         """
-        Calculate the optimal zoom level for converting a PDF page to an image.
+        Resolve the page selection of a read into 0-based page numbers.
 
         Args:
-            page: The PDF page to convert.
+            page_count (int): The number of pages of the PDF.
+            start_page (int | None): The first page of a page range, 1-based.
+            end_page (int | None): The last page of a page range, inclusive.
+            pages (list[int] | None): A list of 1-based pages, in output order.
 
         Returns:
-            float: The optimal zoom level.
+            list[int]: The 0-based page numbers, all pages if nothing was selected.
+
+        Raises:
+            ValueError: If a selected page does not exist.
         """
-        rect = page.rect
-        orig_width = rect.width
-        orig_height = rect.height
+        if pages:
+            selected = [page - 1 for page in pages]
+        else:
+            selected = list(range((start_page or 1) - 1, min(end_page or page_count, page_count)))
+        invalid = [page + 1 for page in selected if not 0 <= page < page_count]
+        if invalid or (start_page is not None and start_page > page_count):
+            raise ValueError(f"Page {(invalid or [start_page])[0]} does not exist, the PDF has {page_count} pages")
+        return selected
 
-        low = 1
-        high = 10
-        limit = 2 ** 10 + 2 ** 7
+    @staticmethod
+    def page_contents(rendered: RenderedPage) -> List[Union[ImageContent, TextContent]]:
+        """
+        Create the content objects of a rendered page.
 
-        while low < high:
-            mid = (low + high) / 2
-            new_width = orig_width * mid
-            new_height = orig_height * mid
+        Args:
+            rendered (RenderedPage): The page rendered by the PdfEngine.
 
-            if new_width >= limit or new_height >= limit:
-                high = mid
-            else:
-                low = mid + 0.1
+        Returns:
+            List[Union[ImageContent, TextContent]]: The page image followed by its text, or only
+                the raw text of the page if it was not rendered.
+        """
+        if rendered.image is None:
+            return [TextContent(type="text", text=rendered.text)]
 
-        return low
+        return [
+            ImageContent(
+                type="image",
+                data=base64.b64encode(rendered.image).decode('utf-8'),
+                mimeType="image/webp"
+            ),
+            TextContent(
+                type="text",
+                text=f"<extractedText>{rendered.text}</extractedText>"
+            ),
+        ]
@@ -0,0 +1,216 @@
+import asyncio
+import fnmatch
+import logging
+from typing import List
+
+from mcp.types import TextContent
+
+from file_system_windows_python.handlers.find import FindHandler
+from file_system_windows_python.handlers.handler import Handler
+from file_system_windows_python.handlers.read_file import ReadFileHandler
+from file_system_windows_python.schemas.read_file_arguments import ReadFileArguments
+from file_system_windows_python.schemas.read_many_arguments import ReadManyArguments
+from file_system_windows_python.tools.tools import Tools
+from file_system_windows_python.util.cursor import encode_cursor
+from file_system_windows_python.util.logging import log_execution
+from file_system_windows_python.util.path_locks import PathLocks
+from file_system_windows_python.util.path_validator import PathValidationError, PathValidator
+from file_system_windows_python.util.response_budget import ResponseBudget
+from file_system_windows_python.util.result_guard import ResultGuard
+from file_system_windows_python.util.tree_walker import TreeWalker
+from file_system_windows_python.util.validated_path import ValidatedPath
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class ReadManyHandler(Handler):
+    """
+    Handler for reading many text files in one call.
+
+    This handler validates and reads the files concurrently, with at most
+    `MAX_CONCURRENT_READS` files open at a time, and shares one response budget between
+    them. Files are validated without keeping them open, and each is opened only for its
+    read, with a check that it is still the validated file. Files smaller than their share
+    leave the rest to the larger ones; a file larger than its share is cut at a line break
+    and followed by a read-file cursor continuing it.
+    """
+    MAX_CONCURRENT_READS = 16
+    OUTPUT_MARGIN = 1024  # Bytes kept free for the skipped files and the cursor
+    FILE_OVERHEAD = 512  # Bytes reserved per file for its header, tags and cursor
+
+    @log_execution(Tools.READ_MANY)
+    async def execute(self, arguments: dict, budget: ResponseBudget | None = None) -> List[TextContent]:
+        """
+        Execute the handler to read many files.
+
+        Args:
+            arguments (dict): A dictionary of arguments, see `ReadManyArguments`.
+            budget (ResponseBudget | None): The byte budget of the response, shared by all files.
+
+        Returns:
+            List[TextContent]: A header and the content of each file, then the skipped files and the cursor, if any.
+
+        Raises:
+            ValueError: If the arguments are invalid or the cursor does not belong to the directory.
+            PathValidationError: If the directory does not exist or is not allowed.
+        """
+        args = ReadManyArguments(**arguments)
+        budget = budget or ResponseBudget()
+        budget.take(ReadManyHandler.OUTPUT_MARGIN)
+
+        next_cursor = None
+        if args.path is not None:
+            directory = await PathValidator.validate_directory_path(args.path)
+            start_after = FindHandler.parse_cursor(args.cursor, directory) if args.cursor else None
+            paths, resume_after = await ReadManyHandler.glob_files(directory, args, start_after)
+            if resume_after is not None:
+                next_cursor = encode_cursor({'path': str(directory.path), 'after': list(resume_after)})
+        else:
+            paths = args.paths
+        if not paths:
+            return [TextContent(type="text", text="No files found")]
+
+        semaphore = asyncio.Semaphore(ReadManyHandler.MAX_CONCURRENT_READS)
+
+        async def validate(path: str) -> ValidatedPath:
+            async with semaphore:
+                return await PathValidator.validate_file_path(path)
+
+        validated = await asyncio.gather(*(validate(path) for path in paths), return_exceptions=True)
+        files = []
+        skipped = []
+        for path, result in zip(paths, validated):
+            if not isinstance(result, ValidatedPath):
+                skipped.append(f"{path}: {str(result)}")
+            elif not result.file_type.startswith('text/'):
+                skipped.append(f"{result.path}: {result.file_type}, use read-file")
+            else:
+                files.append(result)
+
+        try:
+            shares = ReadManyHandler.allocate(
+                [file.size + ReadManyHandler.FILE_OVERHEAD for file in files], budget.remaining)
+
+            async def read(file: ValidatedPath, share: int) -> List[TextContent]:
+                async with semaphore, PathLocks().read(file.path):
+                    try:
+                        await PathValidator.open_validated(file)
+                        return await asyncio.to_thread(ReadManyHandler.read_file, file, share)
+                    except (OSError, PathValidationError) as e:
+                        return [TextContent(type="text", text=f"File: {file.path}"),
+                                TextContent(type="text", text=f"Could not read the file: {str(e)}")]
+                    finally:
+                        file.close()
+
+            contents = await asyncio.gather(*(read(file, share) for file, share in zip(files, shares)))
+        finally:
+            for file in files:
+                file.close()
+
+        truncated = sum(1 for file_contents in contents if file_contents[-1].text.startswith("Next cursor: "))
+        header = f"Read {len(files)} files" + (f", {truncated} truncated to fit the response" if truncated else "")
+        output = [TextContent(type="text", text=header)]
+        for file, file_contents in zip(files, contents):
+            if not budget.take(ResultGuard.measure_size(file_contents)):
+                cursor = ReadFileHandler.make_cursor(file, offset=0, end=file.size, line=1)
+                file_contents = [file_contents[0], TextContent(type="text", text="No room left in the response"),
+                                 TextContent(type="text", text=f"Next cursor: {cursor}")]
+                budget.take(ResultGuard.measure_size(file_contents))
+            output.extend(file_contents)
+        if skipped:
+            output.append(TextContent(type="text", text="Skipped:\n" + "\n".join(skipped)))
+        if next_cursor is not None:
+            output.append(TextContent(
+                type="text",
+                text=f"More files match, next cursor: {next_cursor}"
+            ))
+        return output
+
+    @staticmethod
+    async def glob_files(
+            directory: ValidatedPath,
+            args: ReadManyArguments,
+            start_after: tuple[str, ...] | None) -> tuple[list[str], tuple[str, ...] | None]:
+        """
+        Collect the files below a directory whose names match the glob, in walk order.
+
+        Args:
+            directory (ValidatedPath): The directory.
+            args (ReadManyArguments): The arguments with the glob, depth and file limit.
+            start_after (tuple[str, ...] | None): Relative parts of the file to resume after.
+
+        Returns:
+            tuple[list[str], tuple[str, ...] | None]: The paths of the files, and the relative parts
+                of the last one if more files match.
+        """
+        paths = []
+        last_parts = None
+        walker = TreeWalker(directory.path, args.max_depth, start_after=start_after)
+        files = walker.walk()
+        try:
+            async for entry in files:
+                if entry.is_dir or (args.glob and not fnmatch.fnmatchcase(entry.parts[-1].lower(), args.glob.lower())):
+                    continue
+                if len(paths) == args.max_files:
+                    return paths, last_parts
+                paths.append(str(entry.path))
+                last_parts = entry.parts
+        finally:
+            await files.aclose()
+        return paths, None
+
+    @staticmethod
+    def allocate(sizes: list[int], total: int) -> list[int]:
+        """
+        Split a budget between files, giving each at most its size.
+
+        Files are served from the smallest up, each taking at most an equal share of what
+        is left, so the bytes small files do not need go to the larger ones.
+
+        Args:
+            sizes (list[int]): The number of bytes each file needs.
+            total (int): The bytes to split.
+
+        Returns:
+            list[int]: The share of each file, in the order given.
+        """
+        shares = [0] * len(sizes)
+        remaining = total
+        order = sorted(range(len(sizes)), key=sizes.__getitem__)
+        for served, index in enumerate(order):
+            shares[index] = min(sizes[index], remaining // (len(sizes) - served))
+            remaining -= shares[index]
+        return shares
+
+    @staticmethod
+    def read_file(file: ValidatedPath, share: int) -> List[TextContent]:
+        """
+        Read one file within its share of the budget.
+
+        This is a blocking call, run it in a thread from async code.
+
+        Args:
+            file (ValidatedPath): The validated text file.
+            share (int): The bytes the file may use, including its overhead.
+
+        Returns:
+            List[TextContent]: The path of the file, its content and a read-file cursor if it was cut.
+        """
+        header = TextContent(type="text", text=f"File: {file.path}")
+        limit = share - ReadManyHandler.FILE_OVERHEAD
+        try:
+            if file.size <= limit:
+                text = ReadFileHandler.decode_text(file.read())
+                content = f"<fileContent>{text}</fileContent>" if text else "File is empty"
+                # Decoding in the locale encoding can make the text larger than the file
+                if len(content.encode('utf-8')) <= limit:
+                    return [header, TextContent(type="text", text=content)]
+            if limit <= 0:
+                cursor = ReadFileHandler.make_cursor(file, offset=0, end=file.size, line=1)
+                return [header, TextContent(type="text", text="No room left in the response"),
+                        TextContent(type="text", text=f"Next cursor: {cursor}")]
+            return [header, *ReadFileHandler.create_output_text_range(
+                file, ReadFileArguments(path=str(file.path)), ResponseBudget(limit))]
+        except UnicodeDecodeError:
+            return [header, TextContent(type="text", text=f"File type {file.file_type} could not be decoded as text!")]
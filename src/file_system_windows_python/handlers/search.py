@@ -0,0 +1,294 @@
+import asyncio
+import fnmatch
+import logging
+import re
+from collections import deque
+from typing import AsyncIterator, List
+
+from mcp.types import TextContent
+
+from file_system_windows_python.handlers.find import FindHandler
+from file_system_windows_python.handlers.handler import Handler
+from file_system_windows_python.schemas.search_arguments import SearchArguments
+from file_system_windows_python.tools.tools import Tools
+from file_system_windows_python.util.cursor import encode_cursor
+from file_system_windows_python.util.logging import log_execution
+from file_system_windows_python.util.path_policy import PathPolicy
+from file_system_windows_python.util.path_validator import PathValidator
+from file_system_windows_python.util.progress import report_partial, report_progress
+from file_system_windows_python.util.response_budget import ResponseBudget
+from file_system_windows_python.util.search_worker import FileMatches, compile_pattern, search_files
+from file_system_windows_python.util.tree_walker import TreeWalker, WalkEntry, component_key
+from file_system_windows_python.util.trigram_index import SearchIndex, TrigramIndex, query_trigrams
+from file_system_windows_python.util.validated_path import ValidatedPath
+from file_system_windows_python.util.worker_pool import WorkerPool
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class SearchHandler(Handler):
+    """
+    Handler for searching file contents.
+
+    This handler walks the tree below an allowed directory, or asks the trigram index for
+    candidate files when one is ready, and searches the files in batches on the shared
+    process pool. Results are collected in walk order and stop at the response
+    budget, with a cursor to continue after the last file that was fully reported.
+    The matches of each batch are reported as partial results as soon as they are collected.
+    """
+    BATCH_SIZE = 32
+    OUTPUT_MARGIN = 1024  # Bytes kept free for the header and the cursor
+
+    @log_execution(Tools.SEARCH)
+    async def execute(self, arguments: dict, budget: ResponseBudget | None = None) -> List[TextContent]:
+        """
+        Execute the handler to search the files below a directory.
+
+        Args:
+            arguments (dict): A dictionary of arguments, see `SearchArguments`.
+            budget (ResponseBudget | None): The byte budget of the response.
+
+        Returns:
+            List[TextContent]: A list with one TextContent object listing the matches.
+
+        Raises:
+            ValueError: If the pattern is invalid or the cursor does not belong to the path.
+            PathValidationError: If the path does not exist, is not a directory or is not allowed.
+        """
+        args = SearchArguments(**arguments)
+        directory = await PathValidator.validate_directory_path(args.path)
+
+        try:
+            compile_pattern(args.pattern, args.literal, args.ignore_case)
+        except re.error as e:
+            raise ValueError(f"Invalid regex: {str(e)}")
+        start_after = FindHandler.parse_cursor(args.cursor, directory) if args.cursor else None
+
+        index = SearchIndex().index_for(directory.path)
+        trigrams = query_trigrams(args.pattern, args.literal) if index is not None else None
+        if trigrams is not None:
+            files = SearchHandler.indexed_files(index, trigrams, directory, args, start_after)
+        else:
+            files = SearchHandler.walked_files(directory, args, start_after)
+
+        pool = WorkerPool()
+        pending: deque[tuple[list[WalkEntry], asyncio.Future]] = deque()
+        budget = budget or ResponseBudget()
+        budget.take(SearchHandler.OUTPUT_MARGIN)
+        collector = _SearchCollector(budget.remaining, start_after)
+
+        def submit(batch: list[WalkEntry]) -> None:
+            future = pool.submit(
+                search_files,
+                [str(entry.path) for entry in batch],
+                args.pattern,
+                args.literal,
+                args.ignore_case,
+                args.context,
+                args.max_matches_per_file)
+            pending.append((batch, future))
+
+        try:
+            batch = []
+            async for entry in files:
+                batch.append(entry)
+                if len(batch) >= SearchHandler.BATCH_SIZE:
+                    submit(batch)
+                    batch = []
+                while len(pending) >= pool.workers * 2 and not collector.full:
+                    done_batch, future = pending.popleft()
+                    collector.add(done_batch, await future)
+                if collector.full:
+                    break
+            if batch and not collector.full:
+                submit(batch)
+            while pending and not collector.full:
+                done_batch, future = pending.popleft()
+                collector.add(done_batch, await future)
+        finally:
+            await files.aclose()
+            for _, future in pending:
+                future.cancel()
+
+        budget.take(collector.used)
+        header = (f"Found {collector.match_count} matching lines in {collector.file_count} files "
+                  f"below {directory.path} ({collector.files_searched} files searched")
+        if trigrams is not None:
+            header += f", using the index refreshed {index.status().staleness:.0f} s ago"
+        output = [header + ")", *collector.lines]
+        if collector.full:
+            next_cursor = encode_cursor({'path': str(directory.path), 'after': list(collector.resume_after or ())})
+            output.append(f"Next cursor: {next_cursor}")
+
+        return [TextContent(type="text", text="\n".join(output))]
+
+    @staticmethod
+    async def walked_files(
+            directory: ValidatedPath,
+            args: SearchArguments,
+            start_after: tuple[str, ...] | None) -> AsyncIterator[WalkEntry]:
+        """
+        Yield the files to search by walking the directory.
+
+        Args:
+            directory (ValidatedPath): The directory being searched.
+            args (SearchArguments): The search arguments.
+            start_after (tuple[str, ...] | None): Relative parts of the file to resume after.
+
+        Yields:
+            WalkEntry: The files matching the glob, in walk order, without links.
+        """
+        walker = TreeWalker(directory.path, args.max_depth, start_after=start_after)
+        async for entry in walker.walk():
+            if not entry.is_dir and not entry.is_link and SearchHandler.matches_glob(entry, args):
+                yield entry
+
+    @staticmethod
+    async def indexed_files(
+            index: TrigramIndex,
+            trigrams: set[int],
+            directory: ValidatedPath,
+            args: SearchArguments,
+            start_after: tuple[str, ...] | None) -> AsyncIterator[WalkEntry]:
+        """
+        Yield the files to search from the candidates of the trigram index.
+
+        The candidates come in the same order as a walk, so cursors work with both sources.
+        Candidates that became denied since they were indexed are left out.
+
+        Args:
+            index (TrigramIndex): A ready index covering the directory.
+            trigrams (set[int]): The trigrams a match requires.
+            directory (ValidatedPath): The directory being searched.
+            args (SearchArguments): The search arguments.
+            start_after (tuple[str, ...] | None): Relative parts of the file to resume after.
+
+        Yields:
+            WalkEntry: The candidate files matching the glob, in walk order.
+        """
+        prefix = directory.path.relative_to(index.root).parts
+        candidates = await asyncio.to_thread(index.candidates, trigrams, prefix)
+        skip_key = tuple(component_key(part) for part in start_after) if start_after else None
+        policy = PathPolicy().index
+        for parts in candidates:
+            entry = WalkEntry(index.root.joinpath(*parts), parts[len(prefix):], False)
+            if args.max_depth is not None and entry.depth > args.max_depth:
+                continue
+            if skip_key is not None and tuple(component_key(part) for part in entry.parts) <= skip_key:
+                continue
+            if SearchHandler.matches_glob(entry, args) and policy.check(entry.path).is_allowed:
+                yield entry
+
+    @staticmethod
+    def matches_glob(entry: WalkEntry, args: SearchArguments) -> bool:
+        """
+        Check the name of a file against the glob of the search.
+
+        Args:
+            entry (WalkEntry): The file.
+            args (SearchArguments): The search arguments.
+
+        Returns:
+            bool: True if there is no glob or the name matches it.
+        """
+        return not args.glob or fnmatch.fnmatchcase(entry.parts[-1].lower(), args.glob.lower())
+
+    @staticmethod
+    def format_matches(relative_path: str, file_matches: FileMatches) -> list[str]:
+        """
+        Format the matches of one file in grep style.
+
+        Matching lines are written as 'path:line:text', context lines as 'path-line-text',
+        and groups with context are separated by '--'.
+
+        Args:
+            relative_path (str): The path of the file relative to the search root.
+            file_matches (FileMatches): The matches of the file.
+
+        Returns:
+            list[str]: The output lines.
+        """
+        lines = []
+        for match in file_matches.matches:
+            if (match.before or match.after) and lines:
+                lines.append('--')
+            first = match.line_number - len(match.before)
+            for offset, text in enumerate(match.before):
+                lines.append(f"{relative_path}-{first + offset}-{text}")
+            lines.append(f"{relative_path}:{match.line_number}:{match.line}")
+            for offset, text in enumerate(match.after, start=1):
+                lines.append(f"{relative_path}-{match.line_number + offset}-{text}")
+        if file_matches.truncated:
+            lines.append(f"{relative_path}: more matches not shown")
+        return lines
+
+
+class _SearchCollector:
+    """Collects formatted matches in walk order until the byte budget is used up."""
+
+    def __init__(self, budget: int, start_after: tuple[str, ...] | None):
+        self.budget = budget
+        self.used = 0
+        self.lines: list[str] = []
+        self.full = False
+        self.resume_after = start_after
+        self.match_count = 0
+        self.file_count = 0
+        self.files_searched = 0
+
+    def add(self, batch: list[WalkEntry], results: list[FileMatches]) -> None:
+        """
+        Add the results of a searched batch, stopping before the first file that does not fit.
+
+        A file that does not fit even on its own is cut off so the response is never empty.
+
+        Args:
+            batch (list[WalkEntry]): The files of the batch, in walk order.
+            results (list[FileMatches]): The matches of the batch.
+        """
+        reported = len(self.lines)
+        self._add(batch, results)
+        if len(self.lines) > reported:
+            report_partial([TextContent(type="text", text="\n".join(self.lines[reported:]))])
+        report_progress(
+            self.files_searched,
+            message=f"{self.match_count} matching lines in {self.file_count} of {self.files_searched} files searched"
+        )
+
+    def _add(self, batch: list[WalkEntry], results: list[FileMatches]) -> None:
+        """Add the results of a batch, see `add`."""
+        by_path = {file_matches.path: file_matches for file_matches in results}
+        for entry in batch:
+            if self.full:
+                return
+            file_matches = by_path.get(str(entry.path))
+            if file_matches is not None:
+                lines = SearchHandler.format_matches(entry.relative_path, file_matches)
+                size = sum(len(line.encode('utf-8')) + 1 for line in lines)
+                match_count = len(file_matches.matches)
+                if self.used + size > self.budget:
+                    self.full = True
+                    if self.lines:
+                        return
+                    lines = self._cut(lines)
+                    size = self.budget
+                    prefix = f"{entry.relative_path}:"
+                    match_count = sum(1 for line in lines if line.startswith(prefix) and line[len(prefix):][:1].isdigit())
+                self.lines.extend(lines)
+                self.used += size
+                self.match_count += match_count
+                self.file_count += 1
+            self.files_searched += 1
+            self.resume_after = entry.parts
+
+    def _cut(self, lines: list[str]) -> list[str]:
+        """Keep as many leading lines as fit into the budget."""
+        kept = []
+        used = 0
+        for line in lines:
+            used += len(line.encode('utf-8')) + 1
+            if used > self.budget:
+                break
+            kept.append(line)
+        return kept
@@ -1,13 +1,16 @@
 import logging
+import os
 
-import aiofiles
 from mcp.types import TextContent
 
 from file_system_windows_python.handlers.handler import Handler
 from file_system_windows_python.schemas.write_file_arguments import WriteFileArguments
 from file_system_windows_python.tools.tools import Tools
+from file_system_windows_python.util.atomic_writer import AtomicWriter
 from file_system_windows_python.util.logging import log_execution
 from file_system_windows_python.util.path_validator import PathValidator
+from file_system_windows_python.util.patch import to_bytes
+from file_system_windows_python.util.response_budget import ResponseBudget
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -17,11 +20,13 @@ class WriteFileHandler(Handler):
     """
     Handler for writing content to a file.
 
-    This handler writes the provided content to the specified file path.
+    This handler writes the provided content to the specified file path as UTF-8 with the
+    line breaks of the platform. The content goes to a temporary file that replaces the
+    file, see `AtomicWriter`, so readers never see it half written.
     """
 
     @log_execution(Tools.WRITE_FILE)
-    async def execute(self, arguments: dict) -> list[TextContent]:
+    async def execute(self, arguments: dict, budget: ResponseBudget | None = None) -> list[TextContent]:
         """
         Execute the handler to write content to a file.
 
@@ -29,9 +34,10 @@ class WriteFileHandler(Handler):
             arguments (dict): A dictionary of arguments, including:
                 - path (str): The path of the file to write to.
                 - content (str): The content to write to the file.
+            budget (ResponseBudget | None): Unused, the output is small.
 
         Returns:
-            list[TextContent]: A list containing a TextContent object with a success message.
+            list[TextContent]: A list containing a TextContent object with a success message and the new ETag.
 
         Raises:
             ValueError: If the path or content argument is missing.
@@ -40,17 +46,16 @@ class WriteFileHandler(Handler):
         path = args.path
         content = args.content
 
-        await PathValidator.validate_file_path(path)
-        file_path = await PathValidator.resolve_absolute_path(path)
+        file = await PathValidator.validate_file_path(path)
+        file_path = file.path
 
         logger.debug(f"Writing content to {file_path}")
-        async with aiofiles.open(file_path, 'w') as f:
-            await f.write(content)
+        result = await AtomicWriter().write(file_path, to_bytes(content, os.linesep.encode()))
         logger.debug(f"Wrote content to {file_path}")
 
-        return [
-            TextContent(
-                type="text",
-                text=f"Successfully wrote {len(content)} characters to {path}"
-            )
-        ]
+        if result.superseded:
+            text = (f"Content for {path} was superseded by a later write to the same file before it "
+                    f"reached disk, ETag: {result.etag}")
+        else:
+            text = f"Successfully wrote {len(content)} characters to {path}, ETag: {result.etag}"
+        return [TextContent(type="text", text=text)]
@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field, model_validator
+
+
+class ContactSheetArguments(BaseModel):
+    """
+    Arguments for the 'contact-sheet' command.
+
+    Either a directory, whose images are shown in name order, or a list of image files.
+
+    Attributes:
+        path (str | None): The directory whose images to show.
+        paths (list[str] | None): The image files to show, in this order.
+        glob (str | None): A case-insensitive glob the file names in the directory must match.
+        columns (int): The number of thumbnails per row.
+        thumbnail_size (int): The longest side of a thumbnail in pixels.
+        cursor (str | None): A cursor returned by a previous call to continue with the next images.
+    """
+    path: str | None = Field(default=None, min_length=1)
+    paths: list[str] | None = Field(default=None, min_length=1, max_length=1000)
+    glob: str | None = Field(default=None, min_length=1)
+    columns: int = Field(default=4, ge=1, le=8)
+    thumbnail_size: int = Field(default=256, ge=64, le=512)
+    cursor: str | None = None
+
+    @model_validator(mode='after')
+    def check_source(self) -> 'ContactSheetArguments':
+        """Require exactly one of a directory or a list of files."""
+        if (self.path is None) == (self.paths is None):
+            raise ValueError("Pass either path (a directory) or paths (a list of image files)")
+        if self.glob is not None and self.path is None:
+            raise ValueError("glob can only be used with a directory")
+        return self
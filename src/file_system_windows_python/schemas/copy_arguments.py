@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+
+
+class CopyArguments(BaseModel):
+    """
+    Arguments for the 'copy' command.
+
+    Attributes:
+        source (str): The file or directory to copy.
+        destination (str): The path of the copy, its parent directory must exist.
+        recursive (bool): Whether a directory is copied with everything below it, required for directories.
+        overwrite (bool): Whether an existing file is replaced or an existing directory merged into.
+    """
+    source: str = Field(min_length=1)
+    destination: str = Field(min_length=1)
+    recursive: bool = False
+    overwrite: bool = False
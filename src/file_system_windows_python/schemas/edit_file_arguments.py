@@ -0,0 +1,39 @@
+from pydantic import BaseModel, Field, model_validator
+
+from file_system_windows_python.schemas.path_schema_base import PathSchemaBase
+
+
+class SearchReplaceBlock(BaseModel):
+    """
+    A search/replace edit.
+
+    Attributes:
+        search (str): The exact text to replace, it must occur once in the file.
+        replace (str): The text to put in its place.
+    """
+    search: str = Field(min_length=1)
+    replace: str
+
+
+class EditFileArguments(PathSchemaBase):
+    """
+    Arguments for the 'edit-file' command.
+
+    The edits are given either as search/replace blocks or as a unified diff, and are all
+    applied to the current content of the file or not at all.
+
+    Attributes:
+        edits (list[SearchReplaceBlock] | None): The search/replace blocks.
+        diff (str | None): A unified diff of the file.
+        if_match (str | None): The ETag the file must still have, the edit fails if it changed.
+    """
+    edits: list[SearchReplaceBlock] | None = Field(default=None, min_length=1)
+    diff: str | None = Field(default=None, min_length=1)
+    if_match: str | None = Field(default=None, min_length=1)
+
+    @model_validator(mode='after')
+    def check_single_format(self) -> 'EditFileArguments':
+        """Require exactly one of edits or diff."""
+        if (self.edits is None) == (self.diff is None):
+            raise ValueError("Pass either edits (search/replace blocks) or diff (a unified diff)")
+        return self
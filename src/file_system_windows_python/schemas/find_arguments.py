@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import Field
+
+from file_system_windows_python.schemas.path_schema_base import PathSchemaBase
+
+
+class FindArguments(PathSchemaBase):
+    """
+    Arguments for the 'find' command.
+
+    Attributes:
+        glob (str | None): A case-insensitive glob matched against the entry name, or against the
+            relative path if it contains a '/'.
+        regex (str | None): A regular expression searched for in the relative path.
+        type (str): Only return 'file' or 'directory' entries, default is 'any'.
+        max_depth (int | None): The deepest level to search, 1 for direct children only.
+        min_size (int | None): Only return files of at least this many bytes.
+        max_size (int | None): Only return files of at most this many bytes.
+        modified_after (datetime | None): Only return entries modified after this time.
+        modified_before (datetime | None): Only return entries modified before this time.
+        limit (int | None): The maximum number of results to return.
+        cursor (str | None): A cursor returned by a previous call to continue the search.
+    """
+    glob: str | None = Field(default=None, min_length=1)
+    regex: str | None = Field(default=None, min_length=1)
+    type: Literal['file', 'directory', 'any'] = 'any'
+    max_depth: int | None = Field(default=None, ge=1)
+    min_size: int | None = Field(default=None, ge=0)
+    max_size: int | None = Field(default=None, ge=0)
+    modified_after: datetime | None = None
+    modified_before: datetime | None = None
+    limit: int | None = Field(default=None, ge=1)
+    cursor: str | None = None
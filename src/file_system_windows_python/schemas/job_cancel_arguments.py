@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+
+
+class JobCancelArguments(BaseModel):
+    """
+    Arguments for the 'job-cancel' command.
+
+    Attributes:
+        id (str): The ID of the job.
+    """
+    id: str = Field(min_length=1)
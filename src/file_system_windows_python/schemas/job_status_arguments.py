@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+
+
+class JobStatusArguments(BaseModel):
+    """
+    Arguments for the 'job-status' command.
+
+    Attributes:
+        id (str | None): The ID of the job, None to list all jobs.
+        since (int): The number of partial results already received, only later ones are returned.
+    """
+    id: str | None = Field(default=None, min_length=1)
+    since: int = Field(default=0, ge=0)
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 
 from file_system_windows_python.schemas.path_schema_base import PathSchemaBase
@@ -9,5 +11,21 @@ class LsArguments(PathSchemaBase):
 
     Attributes:
         page (int): The page number for pagination, default is 1.
+        cursor (str | None): A cursor returned by a previous call, takes precedence over page.
+        details (bool): Whether to include size, modification time and type in a tabular listing.
+        sort_by (str): Sort by 'name', 'size' or 'mtime', default is 'name'.
+        descending (bool): Whether to reverse the sort order.
+        extensions (list[str] | None): Only list files with one of these extensions.
+        glob (str | None): Only list entries whose name matches this case-insensitive glob.
+        min_size (int | None): Only list files of at least this many bytes.
+        max_size (int | None): Only list files of at most this many bytes.
     """
     page: int = Field(default=1, ge=1)
+    cursor: str | None = None
+    details: bool = False
+    sort_by: Literal['name', 'size', 'mtime'] = 'name'
+    descending: bool = False
+    extensions: list[str] | None = None
+    glob: str | None = Field(default=None, min_length=1)
+    min_size: int | None = Field(default=None, ge=0)
+    max_size: int | None = Field(default=None, ge=0)
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+
+
+class MoveArguments(BaseModel):
+    """
+    Arguments for the 'move' command.
+
+    Attributes:
+        source (str): The file or directory to move, a directory is moved with everything below it.
+        destination (str): The new path, its parent directory must exist.
+        overwrite (bool): Whether an existing file at the destination is replaced.
+    """
+    source: str = Field(min_length=1)
+    destination: str = Field(min_length=1)
+    overwrite: bool = False
@@ -0,0 +1,36 @@
+from typing import Literal
+
+from pydantic import Field, model_validator
+
+from file_system_windows_python.schemas.path_schema_base import PathSchemaBase
+
+
+class PdfArguments(PathSchemaBase):
+    """
+    Arguments for the 'pdf' command.
+
+    Attributes:
+        action (str): 'outline' to list the outline, 'text' to read pages as text or 'search' to find a phrase.
+        start_page (int | None): The first page to read as text, 1-based.
+        end_page (int | None): The last page to read as text, inclusive, to the last page if omitted.
+        query (str | None): The phrase to search for.
+        cursor (str | None): A cursor returned by a previous call to continue the output.
+    """
+    action: Literal['outline', 'text', 'search']
+    start_page: int | None = Field(default=None, ge=1)
+    end_page: int | None = Field(default=None, ge=1)
+    query: str | None = Field(default=None, min_length=1)
+    cursor: str | None = None
+
+    @model_validator(mode='after')
+    def check_action_arguments(self) -> 'PdfArguments':
+        """Reject arguments that do not belong to the action."""
+        if self.action == 'search' and self.query is None and self.cursor is None:
+            raise ValueError("The search action needs a query")
+        if self.action != 'search' and self.query is not None:
+            raise ValueError("query can only be used with the search action")
+        if self.action != 'text' and (self.start_page is not None or self.end_page is not None):
+            raise ValueError("start_page and end_page can only be used with the text action")
+        if self.start_page is not None and self.end_page is not None and self.end_page < self.start_page:
+            raise ValueError("end_page must not be before start_page")
+        return self
@@ -0,0 +1,78 @@
+from pydantic import Field, model_validator
+
+from file_system_windows_python.schemas.path_schema_base import PathSchemaBase
+
+
+class ReadFileArguments(PathSchemaBase):
+    """
+    Arguments for the 'read-file' command.
+
+    At most one way of selecting part of a text file may be used: a byte range, a line
+    range, the first or last lines, or a cursor continuing a previous read that was cut.
+    PDF pages are selected with either a page list or a page range. Images are scaled down to
+    max_dimension and can be cropped to a region first. Without any of them the whole file is
+    read, as far as it fits into the response.
+
+    Attributes:
+        offset (int | None): The first byte of a byte range.
+        length (int | None): The number of bytes of a byte range, to the end of the file if omitted.
+        start_line (int | None): The first line of a line range, 1-based.
+        end_line (int | None): The last line of a line range, inclusive, to the end of the file if omitted.
+        head (int | None): The number of lines to read from the start of the file.
+        tail (int | None): The number of lines to read from the end of the file.
+        pages (list[int] | None): The 1-based pages of a PDF to read, in this order.
+        start_page (int | None): The first page of a PDF page range, 1-based.
+        end_page (int | None): The last page of a PDF page range, inclusive, to the last page if omitted.
+        max_dimension (int | None): The longest side of a returned image in pixels.
+        crop (list[int] | None): The region (left, top, width, height) of an image to return, in pixels.
+        cursor (str | None): A cursor returned by a previous call, for text files and PDFs.
+    """
+    offset: int | None = Field(default=None, ge=0)
+    length: int | None = Field(default=None, ge=1)
+    start_line: int | None = Field(default=None, ge=1)
+    end_line: int | None = Field(default=None, ge=1)
+    head: int | None = Field(default=None, ge=1)
+    tail: int | None = Field(default=None, ge=1)
+    pages: list[int] | None = Field(default=None, min_length=1)
+    start_page: int | None = Field(default=None, ge=1)
+    end_page: int | None = Field(default=None, ge=1)
+    max_dimension: int | None = Field(default=None, ge=64, le=8192)
+    crop: list[int] | None = Field(default=None, min_length=4, max_length=4)
+    cursor: str | None = None
+
+    @model_validator(mode='after')
+    def check_single_range(self) -> 'ReadFileArguments':
+        """Reject arguments that combine several ways of selecting part of the file."""
+        modes = [
+            self.offset is not None or self.length is not None,
+            self.start_line is not None or self.end_line is not None,
+            self.head is not None,
+            self.tail is not None,
+            self.cursor is not None,
+            self.selects_pages,
+        ]
+        if sum(modes) > 1:
+            raise ValueError("Use only one of offset/length, start_line/end_line, head, tail, cursor or a page selection")
+        if self.pages is not None and (self.start_page is not None or self.end_page is not None):
+            raise ValueError("Use either pages or start_page/end_page")
+        if self.start_page is not None and self.end_page is not None and self.end_page < self.start_page:
+            raise ValueError("end_page must not be before start_page")
+        if self.start_line is not None and self.end_line is not None and self.end_line < self.start_line:
+            raise ValueError("end_line must not be before start_line")
+        return self
+
+    @property
+    def selects_pages(self) -> bool:
+        """Whether PDF pages are selected."""
+        return any(value is not None for value in (self.pages, self.start_page, self.end_page))
+
+    @property
+    def shapes_image(self) -> bool:
+        """Whether an image is cropped or given a size."""
+        return self.crop is not None or self.max_dimension is not None
+
+    @property
+    def is_ranged(self) -> bool:
+        """Whether only part of a text file is selected, or a cut read is continued."""
+        return any(value is not None for value in (
+            self.offset, self.length, self.start_line, self.end_line, self.head, self.tail, self.cursor))
@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field, model_validator
+
+
+class ReadManyArguments(BaseModel):
+    """
+    Arguments for the 'read-many' command.
+
+    Either a list of files, or a directory whose files below it are read in walk order.
+
+    Attributes:
+        paths (list[str] | None): The files to read, in this order.
+        path (str | None): The directory to read files from.
+        glob (str | None): A case-insensitive glob the file names below the directory must match.
+        max_depth (int | None): The deepest level below the directory, 1 for direct children only.
+        max_files (int): The maximum number of files read from the directory.
+        cursor (str | None): A cursor returned by a previous call to continue with the next files of the directory.
+    """
+    paths: list[str] | None = Field(default=None, min_length=1, max_length=200)
+    path: str | None = Field(default=None, min_length=1)
+    glob: str | None = Field(default=None, min_length=1)
+    max_depth: int | None = Field(default=None, ge=1)
+    max_files: int = Field(default=50, ge=1, le=200)
+    cursor: str | None = None
+
+    @model_validator(mode='after')
+    def check_source(self) -> 'ReadManyArguments':
+        """Require exactly one of a list of files or a directory."""
+        if (self.path is None) == (self.paths is None):
+            raise ValueError("Pass either paths (a list of files) or path (a directory, usually with a glob)")
+        if self.path is None and any(value is not None for value in (self.glob, self.max_depth, self.cursor)):
+            raise ValueError("glob, max_depth and cursor can only be used with a directory")
+        return self
@@ -0,0 +1,27 @@
+from pydantic import Field
+
+from file_system_windows_python.schemas.path_schema_base import PathSchemaBase
+
+
+class SearchArguments(PathSchemaBase):
+    """
+    Arguments for the 'search' command.
+
+    Attributes:
+        pattern (str): The regex, or the literal text if literal is set, to search for.
+        literal (bool): Whether the pattern is literal text instead of a regex.
+        ignore_case (bool): Whether to match case-insensitively.
+        glob (str | None): A case-insensitive glob the file names must match.
+        max_depth (int | None): The deepest level to search, 1 for direct children only.
+        context (int): The number of context lines before and after each match, default is 0.
+        max_matches_per_file (int): The maximum number of matching lines reported per file.
+        cursor (str | None): A cursor returned by a previous call to continue the search.
+    """
+    pattern: str = Field(min_length=1)
+    literal: bool = False
+    ignore_case: bool = False
+    glob: str | None = Field(default=None, min_length=1)
+    max_depth: int | None = Field(default=None, ge=1)
+    context: int = Field(default=0, ge=0, le=10)
+    max_matches_per_file: int = Field(default=50, ge=1)
+    cursor: str | None = None
@@ -1,5 +1,6 @@
 import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from sys import stdout
 from typing import Any
 
@@ -8,8 +9,13 @@ from mcp import types
 from mcp.server import Server
 from mcp.types import Tool, TextContent, ImageContent, EmbeddedResource
 
+from file_system_windows_python.tools.util.dispatcher import Dispatcher
 from file_system_windows_python.tools.util.tool_registry import ToolRegistry
+from file_system_windows_python.util.config import Config
+from file_system_windows_python.util.file_classifier import FileClassifier
+from file_system_windows_python.util.path_policy import PathPolicy
 from file_system_windows_python.util.result_guard import ResultGuard
+from file_system_windows_python.util.trigram_index import SearchIndex
 
 stdout.reconfigure(encoding='utf-8')
 logging.basicConfig(level=logging.DEBUG)
@@ -17,11 +23,15 @@ logger = logging.getLogger(__name__)
 logging.getLogger('PIL').setLevel(logging.INFO)
 
 server = Server("file-system-windows-python")
+THREAD_POOL_SIZE = 64  # Threads for blocking work, enough that tools at their concurrency limits leave some free
 
 
 async def initialize_singletons():
     """Initialize core application components"""
     ToolRegistry()
+    FileClassifier().start()
+    PathPolicy().compile()
+    SearchIndex().start()
 
 
 @server.list_tools()
@@ -40,18 +50,20 @@ async def handle_call_tool(
     """
     Handle tool execution requests.
     Tools can modify server state and notify clients of changes.
+    Calls run concurrently, within the limits of their tool, see `Dispatcher`.
+    Clients that pass a progress token get progress notifications while they wait.
     """
     logger.debug(f"Calling tool: {name}")
-    handler = ToolRegistry().get_handler(name)
-    if not handler:
-        raise ValueError(f"Unknown tool: {name}")
-
-    try:
-        async with asyncio.timeout(5):
-            result = await handler.execute(arguments)
-    except asyncio.TimeoutError:
-        result = [TextContent(type="text", text=f"Handler for tool {name} timed out")]
-
+    context = server.request_context
+    progress_token = context.meta.progressToken if context.meta else None
+    notify = None
+    if progress_token is not None:
+        async def notify(progress: float, total: float | None, message: str | None) -> None:
+            await context.session.send_progress_notification(
+                progress_token, progress, total, message, related_request_id=str(context.request_id)
+            )
+
+    result = await Dispatcher().dispatch(name, arguments, notify)
     result = ResultGuard().validate_result(result, name, arguments)
 
     if isinstance(result[0], types.TextContent):
@@ -61,7 +73,12 @@ async def handle_call_tool(
 
 
 async def main() -> None:
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE))
     await initialize_singletons()
+    if Config().config_file:
+        asyncio.get_running_loop().create_task(PathPolicy().watch())
+    if SearchIndex().enabled:
+        asyncio.get_running_loop().create_task(SearchIndex().watch())
     options = server.create_initialization_options()
     async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
         await server.run(
@@ -4,3 +4,15 @@ class Tools:
     LS = "ls"
     READ_FILE = "read-file"
     WRITE_FILE = "write-file"
+    FIND = "find"
+    SEARCH = "search"
+    INDEX_STATUS = "index-status"
+    CACHE_STATUS = "cache-status"
+    PDF = "pdf"
+    CONTACT_SHEET = "contact-sheet"
+    READ_MANY = "read-many"
+    EDIT_FILE = "edit-file"
+    COPY = "copy"
+    MOVE = "move"
+    JOB_STATUS = "job-status"
+    JOB_CANCEL = "job-cancel"
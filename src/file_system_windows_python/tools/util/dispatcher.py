@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+from mcp.types import TextContent, ImageContent, EmbeddedResource
+
+from file_system_windows_python.tools.util.tool_registry import ToolRegistry
+from file_system_windows_python.util import cancellation
+from file_system_windows_python.util import progress as progress_context
+from file_system_windows_python.util.cancellation import CancelToken, OperationCancelled
+from file_system_windows_python.util.jobs import JobManager
+from file_system_windows_python.util.progress import Notify, Progress
+from file_system_windows_python.util.response_budget import ResponseBudget
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class Dispatcher:
+    """
+    Singleton that runs tool calls within the limits of their tool definitions.
+
+    Each tool has its own concurrency limit and deadline, so a burst of slow calls of one
+    tool, e.g. PDF rendering, queues behind its own limit while calls of other tools keep
+    running. Every call gets a `CancelToken`: when the call times out or is cancelled by
+    the client, the token is cancelled too, which stops the blocking work still running
+    for it in threads and worker processes at its next `check_cancelled`. Tools marked
+    `background` are not stopped at their deadline but continue as a job, see `JobManager`,
+    and report their progress to the client in the meantime.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Create a new instance of the Dispatcher class if it does not already exist.
+
+        Returns:
+            Dispatcher: The singleton instance of the Dispatcher class.
+        """
+        if not cls._instance:
+            cls._instance = super(Dispatcher, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initialize the Dispatcher instance.
+        """
+        if not hasattr(self, '_initialized'):
+            self._slots: dict[str, asyncio.Semaphore] = {}
+            self._initialized = True
+
+    async def dispatch(
+            self,
+            name: str,
+            arguments: dict[str, Any] | None,
+            notify: Notify | None = None) -> list[TextContent | ImageContent | EmbeddedResource]:
+        """
+        Run a tool call.
+
+        A call of a tool that allows background jobs and is still running at the deadline
+        continues as a job, and the response names the job instead.
+
+        Args:
+            name (str): The name of the tool.
+            arguments (dict[str, Any] | None): The arguments of the call.
+            notify (Notify | None): Sends progress notifications to the client, None if it asked for none.
+
+        Returns:
+            list[TextContent | ImageContent | EmbeddedResource]: The result of the handler, or a
+                message if the call ran out of time or continues as a job.
+
+        Raises:
+            ValueError: If the tool is unknown.
+        """
+        tool_def = ToolRegistry().get_definition(name)
+        if tool_def is None:
+            raise ValueError(f"Unknown tool: {name}")
+        slots = self._slots.setdefault(name, asyncio.Semaphore(tool_def.max_concurrent))
+
+        token = CancelToken(JobManager.JOB_TIMEOUT if tool_def.background else tool_def.timeout)
+        progress = Progress(notify)
+        start_time = time.time()
+        started = asyncio.Event()
+
+        async def run() -> list[TextContent | ImageContent | EmbeddedResource]:
+            async with slots:
+                started.set()
+                return await tool_def.handler_class().execute(arguments, ResponseBudget())
+
+        reset_token = cancellation.bind(token)
+        reset_progress = progress_context.bind(progress)
+        try:
+            call = asyncio.get_running_loop().create_task(run())
+        finally:
+            progress_context.unbind(reset_progress)
+            cancellation.unbind(reset_token)
+
+        try:
+            await asyncio.wait([call], timeout=tool_def.timeout)
+        except asyncio.CancelledError:
+            token.cancel()
+            call.cancel()
+            raise
+
+        if not call.done() and tool_def.background:
+            progress.detach()
+            job = JobManager().adopt(name, call, token, progress, start_time)
+            state = "is running" if started.is_set() else f"is waiting for one of its {tool_def.max_concurrent} slots"
+            return [TextContent(
+                type="text",
+                text=f"Tool {name} {state} after {tool_def.timeout:g}s and continues as job {job.id}. "
+                     f"Poll it with job-status, cancel it with job-cancel."
+            )]
+
+        token.cancel()
+        if call.done() and not isinstance(call.exception(), OperationCancelled):
+            return call.result()
+        call.cancel()
+        waited = "" if started.is_set() else f", waiting for one of its {tool_def.max_concurrent} slots"
+        logger.warning(f"Tool {name} timed out after {tool_def.timeout:g}s{waited}")
+        return [TextContent(type="text", text=f"Handler for tool {name} timed out after {tool_def.timeout:g}s{waited}")]
@@ -3,22 +3,37 @@ from typing import Type
 
 from mcp.types import Tool
 
+from file_system_windows_python.handlers.cache_status import CacheStatusHandler
+from file_system_windows_python.handlers.contact_sheet import ContactSheetHandler
+from file_system_windows_python.handlers.copy import CopyHandler
+from file_system_windows_python.handlers.edit_file import EditFileHandler
+from file_system_windows_python.handlers.find import FindHandler
 from file_system_windows_python.handlers.handler import Handler
+from file_system_windows_python.handlers.index_status import IndexStatusHandler
+from file_system_windows_python.handlers.job_cancel import JobCancelHandler
+from file_system_windows_python.handlers.job_status import JobStatusHandler
 from file_system_windows_python.handlers.list_allowed_directories import ListAllowedDirectoriesHandler
 from file_system_windows_python.handlers.list_denied_directories import ListDeniedDirectoriesHandler
 from file_system_windows_python.handlers.ls import LsHandler
+from file_system_windows_python.handlers.move import MoveHandler
+from file_system_windows_python.handlers.pdf import PdfHandler
 from file_system_windows_python.handlers.read_file import ReadFileHandler
+from file_system_windows_python.handlers.read_many import ReadManyHandler
+from file_system_windows_python.handlers.search import SearchHandler
 from file_system_windows_python.handlers.write_file import WriteFileHandler
 from file_system_windows_python.tools.tools import Tools
 
 
 @dataclass
 class ToolDefinition:
-    """Combines tool metadata with its handler implementation"""
+    """Combines tool metadata with its handler implementation and dispatch limits"""
     name: str
     description: str
     input_schema: dict
     handler_class: Type[Handler]
+    max_concurrent: int = 16  # Calls of the tool running at the same time, further calls wait
+    timeout: float = 10.0  # Seconds a call may take, including the wait for a slot
+    background: bool = False  # Whether a call still running at the timeout continues as a job
 
 
 class ToolRegistry:
@@ -41,6 +56,10 @@ class ToolRegistry:
             )
         return None
 
+    def get_definition(self, name: str) -> ToolDefinition | None:
+        """Get the full definition of a tool"""
+        return self._tools.get(name)
+
     def get_handler(self, name: str) -> Handler | None:
         """Get Handler instance for tool execution"""
         if tool_def := self._tools.get(name):
@@ -82,12 +101,23 @@ class ToolRegistry:
         self.register_tool(
             ToolDefinition(
                 name=Tools.LS,
-                description="List directories using an absolute path. Optionally specify a page number.",
+                description="List directories using an absolute path. Optionally specify a page number, "
+                            "or pass the cursor returned by the previous page to continue. "
+                            "Set details to get a table with type, size and modification time, "
+                            "which can be sorted by size or mtime and filtered by extension, glob or size range.",
                 input_schema={
                     "type": "object",
                     "properties": {
                         "path": {"type": "string"},
                         "page": {"type": "integer"},
+                        "cursor": {"type": "string"},
+                        "details": {"type": "boolean"},
+                        "sort_by": {"type": "string", "enum": ["name", "size", "mtime"]},
+                        "descending": {"type": "boolean"},
+                        "extensions": {"type": "array", "items": {"type": "string"}},
+                        "glob": {"type": "string"},
+                        "min_size": {"type": "integer"},
+                        "max_size": {"type": "integer"},
                     },
                     "required": ["path"],
                 },
@@ -97,21 +127,68 @@ class ToolRegistry:
         self.register_tool(
             ToolDefinition(
                 name=Tools.READ_FILE,
-                description="Reads contents of text-based, PDF and image files. Cannot read compiled/binary files. Text results are presented in `<fileContent>` tags.",
+                description="Reads contents of text-based, PDF and image files. Cannot read compiled/binary files. Text results are presented in `<fileContent>` tags. "
+                            "For large text files, read part of the file with offset/length (bytes), "
+                            "start_line/end_line (1-based, inclusive), head or tail (number of lines). "
+                            "Select PDF pages with pages (a list) or start_page/end_page (1-based, inclusive). "
+                            "Large images are scaled down to max_dimension (default 1568 pixels); "
+                            "crop [left, top, width, height] returns a region of the original image in more detail. "
+                            "Output that does not fit into one response ends with a cursor; pass it to continue.",
                 input_schema={
                     "type": "object",
                     "properties": {
                         "path": {"type": "string"},
+                        "offset": {"type": "integer"},
+                        "length": {"type": "integer"},
+                        "start_line": {"type": "integer"},
+                        "end_line": {"type": "integer"},
+                        "head": {"type": "integer"},
+                        "tail": {"type": "integer"},
+                        "pages": {"type": "array", "items": {"type": "integer"}},
+                        "start_page": {"type": "integer"},
+                        "end_page": {"type": "integer"},
+                        "max_dimension": {"type": "integer"},
+                        "crop": {"type": "array", "items": {"type": "integer"}, "minItems": 4, "maxItems": 4},
+                        "cursor": {"type": "string"},
                     },
                     "required": ["path"],
                 },
-                handler_class=ReadFileHandler
+                handler_class=ReadFileHandler,
+                max_concurrent=4,
+                timeout=60,
+                background=True
+            )
+        )
+        self.register_tool(
+            ToolDefinition(
+                name=Tools.READ_MANY,
+                description="Read many text files in one call. Pass either paths (a list of absolute paths) or "
+                            "path (a directory) with an optional glob on the file names, max_depth and max_files. "
+                            "Files are read concurrently and share one response; a file that does not fit is cut "
+                            "and followed by a cursor to continue it with read-file. Results are presented in "
+                            "`<fileContent>` tags, each after a 'File: path' line.",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "paths": {"type": "array", "items": {"type": "string"}},
+                        "path": {"type": "string"},
+                        "glob": {"type": "string"},
+                        "max_depth": {"type": "integer"},
+                        "max_files": {"type": "integer"},
+                        "cursor": {"type": "string"},
+                    },
+                },
+                handler_class=ReadManyHandler,
+                max_concurrent=4,
+                timeout=60,
+                background=True
             )
         )
         self.register_tool(
             ToolDefinition(
                 name=Tools.WRITE_FILE,
-                description="Writes content to a file at the specified absolute path. Since the content is replaced, make sure to call read-file first and include everything without placeholders.",
+                description="Writes content to a file at the specified absolute path. Since the content is replaced, make sure to call read-file first and include everything without placeholders. "
+                            "To change part of an existing file, use edit-file instead.",
                 input_schema={
                     "type": "object",
                     "properties": {
@@ -120,6 +197,245 @@ class ToolRegistry:
                     },
                     "required": ["path", "content"],
                 },
-                handler_class=WriteFileHandler
+                handler_class=WriteFileHandler,
+                max_concurrent=8,
+                timeout=30
+            )
+        )
+        self.register_tool(
+            ToolDefinition(
+                name=Tools.EDIT_FILE,
+                description="Edit part of a text file without sending the whole file. Pass either edits, a list of "
+                            "{search, replace} blocks where each search text must occur exactly once, or diff, a "
+                            "unified diff of the file. All edits apply or none. Pass the ETag returned by read-file, "
+                            "write-file or a previous edit-file as if_match to make sure the file did not change "
+                            "since, without reading it again.",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "path": {"type": "string"},
+                        "edits": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "search": {"type": "string"},
+                                    "replace": {"type": "string"},
+                                },
+                                "required": ["search", "replace"],
+                            },
+                        },
+                        "diff": {"type": "string"},
+                        "if_match": {"type": "string"},
+                    },
+                    "required": ["path"],
+                },
+                handler_class=EditFileHandler,
+                max_concurrent=8,
+                timeout=30
+            )
+        )
+        self.register_tool(
+            ToolDefinition(
+                name=Tools.COPY,
+                description="Copy a file or, with recursive, a directory tree to a new absolute path whose parent "
+                            "exists. Any file type can be copied and the content is not returned. Pass overwrite to "
+                            "replace an existing file or merge into an existing directory.",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "source": {"type": "string"},
+                        "destination": {"type": "string"},
+                        "recursive": {"type": "boolean"},
+                        "overwrite": {"type": "boolean"},
+                    },
+                    "required": ["source", "destination"],
+                },
+                handler_class=CopyHandler,
+                max_concurrent=4,
+                timeout=300,
+                background=True
+            )
+        )
+        self.register_tool(
+            ToolDefinition(
+                name=Tools.MOVE,
+                description="Move or rename a file or a directory tree to a new absolute path whose parent exists. "
+                            "Within one drive this is a single rename. Pass overwrite to replace an existing file.",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "source": {"type": "string"},
+                        "destination": {"type": "string"},
+                        "overwrite": {"type": "boolean"},
+                    },
+                    "required": ["source", "destination"],
+                },
+                handler_class=MoveHandler,
+                max_concurrent=4,
+                timeout=300,
+                background=True
+            )
+        )
+        self.register_tool(
+            ToolDefinition(
+                name=Tools.FIND,
+                description="Recursively find files and directories below an absolute directory path. "
+                            "Filter by a glob on the name (or on the relative path if it contains '/'), "
+                            "a regex on the relative path, type, depth, size range and modification time "
+                            "(ISO 8601). Returns relative paths; pass the returned cursor to continue.",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "path": {"type": "string"},
+                        "glob": {"type": "string"},
+                        "regex": {"type": "string"},
+                        "type": {"type": "string", "enum": ["file", "directory", "any"]},
+                        "max_depth": {"type": "integer"},
+                        "min_size": {"type": "integer"},
+                        "max_size": {"type": "integer"},
+                        "modified_after": {"type": "string", "format": "date-time"},
+                        "modified_before": {"type": "string", "format": "date-time"},
+                        "limit": {"type": "integer"},
+                        "cursor": {"type": "string"},
+                    },
+                    "required": ["path"],
+                },
+                handler_class=FindHandler,
+                max_concurrent=4,
+                timeout=30,
+                background=True
+            )
+        )
+        self.register_tool(
+            ToolDefinition(
+                name=Tools.SEARCH,
+                description="Search the contents of the text files below an absolute directory path for a regex, "
+                            "or for literal text if literal is set. Binary files are skipped. Returns matches as "
+                            "'path:line:text' with optional context lines; pass the returned cursor to continue.",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "path": {"type": "string"},
+                        "pattern": {"type": "string"},
+                        "literal": {"type": "boolean"},
+                        "ignore_case": {"type": "boolean"},
+                        "glob": {"type": "string"},
+                        "max_depth": {"type": "integer"},
+                        "context": {"type": "integer"},
+                        "max_matches_per_file": {"type": "integer"},
+                        "cursor": {"type": "string"},
+                    },
+                    "required": ["path", "pattern"],
+                },
+                handler_class=SearchHandler,
+                max_concurrent=4,
+                timeout=60,
+                background=True
+            )
+        )
+        self.register_tool(
+            ToolDefinition(
+                name=Tools.PDF,
+                description="Work with large PDFs as text through an index built once per document. "
+                            "action 'outline' lists the table of contents with page numbers, 'text' returns "
+                            "pages start_page to end_page (1-based, inclusive) as text, and 'search' finds a "
+                            "phrase (case-insensitive) and returns the pages it occurs on with snippets. "
+                            "Pass the returned cursor to continue.",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "path": {"type": "string"},
+                        "action": {"type": "string", "enum": ["outline", "text", "search"]},
+                        "start_page": {"type": "integer"},
+                        "end_page": {"type": "integer"},
+                        "query": {"type": "string"},
+                        "cursor": {"type": "string"},
+                    },
+                    "required": ["path", "action"],
+                },
+                handler_class=PdfHandler,
+                max_concurrent=2,
+                timeout=120,
+                background=True
+            )
+        )
+        self.register_tool(
+            ToolDefinition(
+                name=Tools.CONTACT_SHEET,
+                description="Show many images at once as contact sheets: labelled grids of numbered thumbnails. "
+                            "Pass either path (a directory, its images in name order, optionally filtered by glob) "
+                            "or paths (a list of image files). Use read-file on a single image to see it in detail. "
+                            "Pass the returned cursor to continue with the next images.",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "path": {"type": "string"},
+                        "paths": {"type": "array", "items": {"type": "string"}},
+                        "glob": {"type": "string"},
+                        "columns": {"type": "integer"},
+                        "thumbnail_size": {"type": "integer"},
+                        "cursor": {"type": "string"},
+                    },
+                },
+                handler_class=ContactSheetHandler,
+                max_concurrent=2,
+                timeout=60,
+                background=True
+            )
+        )
+        self.register_tool(
+            ToolDefinition(
+                name=Tools.JOB_STATUS,
+                description="Poll tool calls that ran past their time limit and continue as background jobs. "
+                            "Without id, lists the jobs. For a running job, returns its progress and the partial "
+                            "results after the first since ones, followed by the since to pass next; for a "
+                            "finished job, its result.",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "string"},
+                        "since": {"type": "integer"},
+                    },
+                },
+                handler_class=JobStatusHandler
+            )
+        )
+        self.register_tool(
+            ToolDefinition(
+                name=Tools.JOB_CANCEL,
+                description="Cancel a background job started by a tool call that ran past its time limit",
+                input_schema={
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "string"},
+                    },
+                    "required": ["id"],
+                },
+                handler_class=JobCancelHandler
+            )
+        )
+        self.register_tool(
+            ToolDefinition(
+                name=Tools.INDEX_STATUS,
+                description="Show the state of the search indexes: files indexed, size on disk, "
+                            "last build time and time since the last refresh",
+                input_schema={
+                    "type": "object",
+                    "properties": {},
+                },
+                handler_class=IndexStatusHandler
+            )
+        )
+        self.register_tool(
+            ToolDefinition(
+                name=Tools.CACHE_STATUS,
+                description="Show the size and the hit, miss and eviction counts of the render cache of PDF pages "
+                            "and the hit rates of the in-memory caches",
+                input_schema={
+                    "type": "object",
+                    "properties": {},
+                },
+                handler_class=CacheStatusHandler
             )
         )
@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from file_system_windows_python.util.cache_invalidation import invalidate_path
+from file_system_windows_python.util.cancellation import detached_context
+from file_system_windows_python.util.config import Config
+from file_system_windows_python.util.etag import content_etag
+from file_system_windows_python.util.path_locks import PathLocks
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+REPLACE_ATTEMPTS = 5  # Windows refuses to replace a file another handle has open without delete sharing
+REPLACE_DELAY = 0.05  # Seconds before the first retry, doubled for each further one
+
+
+def temp_path_for(path: Path) -> Path:
+    """
+    Return a temporary path next to a file, unique to the calling process and thread.
+
+    Args:
+        path (Path): The file to be replaced.
+
+    Returns:
+        Path: A hidden path in the same directory, so the replacement is a rename on the same volume.
+    """
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def replace_file(temp_path: Path, path: Path) -> None:
+    """
+    Move a completely written temporary file over a file.
+
+    The rename is atomic, readers see either the old or the new content. When fsync is
+    enabled the directory entry is flushed as well, where the platform allows it.
+
+    This is a blocking call, run it in a thread from async code.
+
+    Args:
+        temp_path (Path): The temporary file, closed and already flushed if fsync is enabled.
+        path (Path): The file to replace.
+
+    Raises:
+        PermissionError: If the file stays open elsewhere and cannot be replaced.
+    """
+    for attempt in range(REPLACE_ATTEMPTS):
+        try:
+            os.replace(temp_path, path)
+            break
+        except PermissionError:
+            if os.name != 'nt' or attempt == REPLACE_ATTEMPTS - 1:
+                raise
+            time.sleep(REPLACE_DELAY * 2 ** attempt)
+
+    if Config().fsync and os.name != 'nt':
+        # Windows cannot open a directory for flushing, NTFS journals the rename instead.
+        fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def write_file(path: Path, data: bytes) -> str:
+    """
+    Write a file through a temporary file that then replaces it.
+
+    The permissions of an existing file are kept.
+
+    This is a blocking call, run it in a thread from async code.
+
+    Args:
+        path (Path): The file to write.
+        data (bytes): The new content.
+
+    Returns:
+        str: The ETag of the new content.
+    """
+    temp_path = temp_path_for(path)
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            if Config().fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        if path.exists():
+            shutil.copymode(path, temp_path)
+        replace_file(temp_path, path)
+    finally:
+        if temp_path.exists():
+            os.remove(temp_path)
+    return content_etag(data)
+
+
+@dataclass
+class WriteResult:
+    """
+    The outcome of a write.
+
+    Attributes:
+        etag (str): The ETag of the file after the write.
+        superseded (bool): Whether a later write to the file replaced this content before it reached disk.
+    """
+    etag: str
+    superseded: bool
+
+
+@dataclass
+class PendingWrite:
+    """
+    The content waiting to be written to a file, and the callers waiting for it.
+
+    Attributes:
+        data (bytes): The content of the latest write.
+        waiters (list[asyncio.Future]): One future per write, in arrival order.
+    """
+    data: bytes
+    waiters: list[asyncio.Future] = field(default_factory=list)
+
+
+class AtomicWriter:
+    """
+    Singleton that serializes and coalesces the writes of the server.
+
+    A write is queued until the write lock of the file in `PathLocks` is free, so it waits
+    for reads in progress and never races another change of the file; writes to the same file
+    arriving in the meantime replace the queued content, so a burst of writes only puts
+    the last one on disk and every caller gets the resulting ETag. The file is written
+    to a temporary file in the same directory and renamed into place, so a reader or an
+    interrupted write never sees a truncated file, and the caches of the path are
+    invalidated afterwards.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Create a new instance of the AtomicWriter class if it does not already exist.
+
+        Returns:
+            AtomicWriter: The singleton instance of the AtomicWriter class.
+        """
+        if not cls._instance:
+            cls._instance = super(AtomicWriter, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initialize the AtomicWriter instance.
+        """
+        if not hasattr(self, '_initialized'):
+            self._pending: dict[str, PendingWrite] = {}
+            self._flushes: set[asyncio.Task] = set()
+            self.writes = 0
+            self.coalesced = 0
+            self._initialized = True
+
+    async def write(self, path: Path, data: bytes) -> WriteResult:
+        """
+        Write a file atomically, coalescing with other writes to it.
+
+        The write still completes if the caller is cancelled, since other callers may
+        wait for the same write.
+
+        Args:
+            path (Path): The resolved path of the file.
+            data (bytes): The new content.
+
+        Returns:
+            WriteResult: The ETag of the file and whether this content was superseded.
+
+        Raises:
+            OSError: If the file cannot be written.
+        """
+        key = PathLocks.make_key(path)
+        waiter = asyncio.get_running_loop().create_future()
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending.data = data
+            pending.waiters.append(waiter)
+            self.coalesced += 1
+        else:
+            self._pending[key] = PendingWrite(data, [waiter])
+            flush = asyncio.get_running_loop().create_task(self._flush(key, path), context=detached_context())
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+        return await asyncio.shield(waiter)
+
+    async def _flush(self, key: str, path: Path) -> None:
+        """
+        Write the latest queued content of a file once its lock is free.
+
+        Args:
+            key (str): The key of the file.
+            path (Path): The resolved path of the file.
+        """
+        async with PathLocks().write(path):
+            pending = self._pending.pop(key)
+            try:
+                etag = await asyncio.to_thread(write_file, path, pending.data)
+            except Exception as e:
+                for waiter in pending.waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+                return
+            finally:
+                invalidate_path(path)
+
+        self.writes += 1
+        if len(pending.waiters) > 1:
+            logger.debug(f"Wrote {path}, superseding {len(pending.waiters) - 1} earlier writes")
+        for waiter in pending.waiters:
+            if not waiter.done():
+                waiter.set_result(WriteResult(etag, waiter is not pending.waiters[-1]))
@@ -0,0 +1,29 @@
+import logging
+from pathlib import Path
+
+from file_system_windows_python.util.directory_listing import DirectoryListing
+from file_system_windows_python.util.file_type_cache import FileTypeCache
+from file_system_windows_python.util.trigram_index import SearchIndex
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+def invalidate_path(path: Path) -> None:
+    """
+    Drop everything the server caches about a file it changed.
+
+    The caches keyed by file identity and modification stamp (line indexes, PDF indexes,
+    rendered pages and transformed images) miss on their own once the file is replaced,
+    so only the caches keyed by path are touched: the file type verdict, the listing of
+    the parent directory and the search index.
+
+    Must be called from the event loop.
+
+    Args:
+        path (Path): The resolved path of the file that was written, replaced or removed.
+    """
+    FileTypeCache().invalidate(path)
+    DirectoryListing().invalidate(path.parent)
+    SearchIndex().notify_write(path)
+    logger.debug(f"Invalidated cached state of {path}")
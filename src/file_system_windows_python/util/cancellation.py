@@ -0,0 +1,121 @@
+import contextvars
+import threading
+import time
+
+_current_token: contextvars.ContextVar['CancelToken | None'] = contextvars.ContextVar('cancel_token', default=None)
+_process_deadline: float | None = None  # The deadline of the call a worker process is running a function for
+
+
+class OperationCancelled(Exception):
+    """Raised inside blocking work when its tool call was cancelled or ran out of time."""
+    pass
+
+
+class CancelToken:
+    """
+    Cancellation state of one tool call, shared with the threads and processes working for it.
+
+    Threads started with `asyncio.to_thread` inherit the token of the call through its
+    context and see `cancel` right away. Worker processes only receive the deadline, which
+    is a wall clock time so it means the same in every process.
+    """
+
+    def __init__(self, timeout: float):
+        """
+        Create the token of a call.
+
+        Args:
+            timeout (float): Seconds until the call runs out of time.
+        """
+        self.deadline = time.time() + timeout
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Cancel the call, the blocking work for it stops at its next check."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the call was cancelled or ran out of time."""
+        return self._cancelled.is_set() or time.time() > self.deadline
+
+
+def bind(token: CancelToken | None) -> contextvars.Token:
+    """
+    Make a token the one of the current context, and of the tasks and threads started from it.
+
+    Args:
+        token (CancelToken | None): The token, None to detach from any call.
+
+    Returns:
+        contextvars.Token: The token to pass to `unbind`.
+    """
+    return _current_token.set(token)
+
+
+def unbind(reset: contextvars.Token) -> None:
+    """
+    Restore the token that was current before `bind`.
+
+    Args:
+        reset (contextvars.Token): The token returned by `bind`.
+    """
+    _current_token.reset(reset)
+
+
+def current_token() -> CancelToken | None:
+    """Return the token of the call the current context works for, None outside of calls."""
+    return _current_token.get()
+
+
+def detached_context() -> contextvars.Context:
+    """
+    Return a copy of the current context that belongs to no call.
+
+    Work shared by several calls, e.g. a cache entry others wait for, runs in it so the
+    first caller running out of time does not abort it for the rest.
+
+    Returns:
+        contextvars.Context: The context, pass it to `create_task`.
+    """
+    context = contextvars.copy_context()
+    context.run(_current_token.set, None)
+    return context
+
+
+def check_cancelled() -> None:
+    """
+    Stop blocking work whose tool call was cancelled or ran out of time.
+
+    Cheap enough to call once per chunk, page or file in the loops of blocking work, in
+    threads as well as in worker processes. Does nothing outside of tool calls.
+
+    Raises:
+        OperationCancelled: If the call the work is done for is over.
+    """
+    token = _current_token.get()
+    if token is not None:
+        if token.cancelled:
+            raise OperationCancelled("The tool call was cancelled or ran out of time")
+    elif _process_deadline is not None and time.time() > _process_deadline:
+        raise OperationCancelled("The tool call ran out of time")
+
+
+def run_with_deadline(deadline: float, func, *args):
+    """
+    Run a function in a worker process on behalf of a call with a deadline.
+
+    Args:
+        deadline (float): The wall clock time the call runs out of time at.
+        func: A module-level function.
+        *args: The arguments of the function.
+
+    Returns:
+        The return value of the function.
+    """
+    global _process_deadline
+    _process_deadline = deadline
+    try:
+        return func(*args)
+    finally:
+        _process_deadline = None
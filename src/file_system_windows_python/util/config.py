@@ -1,8 +1,13 @@
+import json
+import os
+
+
 class Config:
     """
     Singleton configuration class.
 
-    This class is used to store and manage configuration settings for allowed and denied directories.
+    This class is used to store and manage configuration settings for allowed and denied directories
+    the optional search index directory, the optional render cache and whether writes are fsynced.
     """
     _instance = None
 
@@ -30,4 +35,38 @@ class Config:
         if not hasattr(self, '_initialized'):
             self.allow = []
             self.deny = []
+            self.config_file = None
+            self.index_dir = None
+            self.cache_dir = None
+            self.cache_max_size = 512 * 2**20
+            self.fsync = True
             self._initialized = True
+
+    def load_file(self) -> None:
+        """
+        Merge the allowed and denied directories from `config_file` into the command line ones.
+
+        The file is a JSON object with optional "allow" and "deny" lists. The command line
+        directories are remembered on the first load, so reloading a changed file replaces
+        the previously loaded entries instead of accumulating them.
+
+        Raises:
+            ValueError: If the file is malformed or lists a path that is not an existing directory.
+        """
+        if not hasattr(self, '_command_line_allow'):
+            self._command_line_allow = list(self.allow)
+            self._command_line_deny = list(self.deny)
+
+        with open(self.config_file, encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"Config file {self.config_file} must contain a JSON object")
+
+        file_allow = data.get('allow', [])
+        file_deny = data.get('deny', [])
+        for path in file_allow + file_deny:
+            if not isinstance(path, str) or not os.path.isdir(path):
+                raise ValueError(f"Path is not an existing directory: {path}")
+
+        self.allow = self._command_line_allow + [p for p in file_allow if p not in self._command_line_allow]
+        self.deny = self._command_line_deny + [p for p in file_deny if p not in self._command_line_deny]
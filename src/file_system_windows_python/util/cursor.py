@@ -0,0 +1,39 @@
+import base64
+import json
+
+
+def encode_cursor(state: dict) -> str:
+    """
+    Encode pagination state into an opaque cursor string.
+
+    Args:
+        state (dict): JSON-serializable state needed to resume.
+
+    Returns:
+        str: The URL-safe cursor.
+    """
+    raw = json.dumps(state, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The cursor string.
+
+    Returns:
+        dict: The pagination state.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
+    if not isinstance(state, dict):
+        raise ValueError("Invalid cursor")
+    return state
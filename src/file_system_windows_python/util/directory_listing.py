@@ -0,0 +1,323 @@
+import fnmatch
+import heapq
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DirectoryEntry:
+    """
+    A single entry of a directory listing.
+
+    Attributes:
+        name (str): The name of the entry.
+        is_dir (bool): Whether the entry is a directory.
+        size (int | None): The size in bytes, None for directories and when not collected.
+        mtime_ns (int | None): The modification time, None when not collected.
+    """
+    name: str
+    is_dir: bool
+    size: int | None = None
+    mtime_ns: int | None = None
+
+    @property
+    def sort_key(self) -> tuple:
+        """Directories first, then case-insensitive by name."""
+        return not self.is_dir, self.name.lower(), self.name
+
+
+@dataclass(frozen=True)
+class ListingQuery:
+    """
+    Sort order and filters applied to a directory listing.
+
+    Attributes:
+        sort_by (str): One of 'name', 'size' or 'mtime'.
+        descending (bool): Whether to reverse the sort order.
+        extensions (tuple[str, ...]): Lower-case file extensions without the dot to keep, empty for all.
+        glob (str | None): A case-insensitive glob the entry names must match.
+        min_size (int | None): The minimum file size in bytes.
+        max_size (int | None): The maximum file size in bytes.
+    """
+    sort_by: str = 'name'
+    descending: bool = False
+    extensions: tuple[str, ...] = ()
+    glob: str | None = None
+    min_size: int | None = None
+    max_size: int | None = None
+
+    @property
+    def needs_stat(self) -> bool:
+        """Whether sizes and modification times are needed to answer the query."""
+        return self.sort_by != 'name' or self.min_size is not None or self.max_size is not None
+
+    @property
+    def is_default(self) -> bool:
+        """Whether the query is plain name order without filters."""
+        return self == ListingQuery()
+
+    def matches(self, entry: DirectoryEntry) -> bool:
+        """
+        Check whether an entry passes the filters.
+
+        Extension and size filters only ever match files.
+
+        Args:
+            entry (DirectoryEntry): The entry to check.
+
+        Returns:
+            bool: True if the entry passes all filters.
+        """
+        if self.extensions:
+            if entry.is_dir or entry.name.rpartition('.')[2].lower() not in self.extensions:
+                return False
+        if self.glob and not fnmatch.fnmatchcase(entry.name.lower(), self.glob.lower()):
+            return False
+        if self.min_size is not None or self.max_size is not None:
+            if entry.size is None:
+                return False
+            if self.min_size is not None and entry.size < self.min_size:
+                return False
+            if self.max_size is not None and entry.size > self.max_size:
+                return False
+        return True
+
+    def sort_key(self, entry: DirectoryEntry) -> tuple:
+        """
+        Return the ascending sort key of an entry under this query.
+
+        Args:
+            entry (DirectoryEntry): The entry.
+
+        Returns:
+            tuple: The sort key.
+        """
+        if self.sort_by == 'size':
+            return entry.size or 0, entry.sort_key
+        if self.sort_by == 'mtime':
+            return entry.mtime_ns or 0, entry.sort_key
+        return entry.sort_key
+
+    def fingerprint(self) -> list:
+        """
+        Return a JSON-serializable form of the query, used to tie cursors to it.
+
+        Returns:
+            list: The query fields.
+        """
+        return [self.sort_by, self.descending, list(self.extensions), self.glob, self.min_size, self.max_size]
+
+
+@dataclass
+class DirectorySnapshot:
+    """
+    Sorted listing of a directory, valid for as long as the directory mtime is unchanged.
+
+    Snapshots that carry sizes and modification times additionally expire after
+    `DirectoryListing.STAT_TTL` seconds, since changing a file in place does not touch the
+    mtime of its directory.
+
+    Attributes:
+        path (Path): The resolved path of the directory.
+        mtime_ns (int): The directory mtime the snapshot was taken at.
+        entries (list[DirectoryEntry]): The entries, sorted by `DirectoryEntry.sort_key`.
+        with_stat (bool): Whether the entries carry sizes and modification times.
+        taken_at (float): The monotonic time the snapshot was taken at.
+    """
+    path: Path
+    mtime_ns: int
+    entries: list[DirectoryEntry]
+    with_stat: bool = False
+    taken_at: float = field(default_factory=time.monotonic)
+    _views: dict[ListingQuery, list[DirectoryEntry]] = field(default_factory=dict, repr=False)
+
+    def view(self, query: ListingQuery) -> list[DirectoryEntry]:
+        """
+        Return the entries filtered and sorted by a query, computing each view once.
+
+        Args:
+            query (ListingQuery): The sort order and filters.
+
+        Returns:
+            list[DirectoryEntry]: The matching entries in order.
+        """
+        if query.is_default:
+            return self.entries
+        entries = self._views.get(query)
+        if entries is None:
+            entries = [entry for entry in self.entries if query.matches(entry)]
+            if query.sort_by != 'name':
+                entries.sort(key=query.sort_key)
+            if query.descending:
+                entries.reverse()
+            if len(self._views) >= 8:
+                self._views.clear()
+            self._views[query] = entries
+        return entries
+
+
+class DirectoryListing:
+    """
+    Singleton scandir-based directory lister with a small LRU of sorted snapshots.
+
+    Entry types come from the `DirEntry` objects, so listing a directory does not stat
+    its entries. Snapshots are keyed by path and invalidated by a change of the directory
+    mtime, so paging through a large directory sorts it once. The snapshots are shared by
+    worker threads and the event loop and only accessed under a lock.
+    """
+    _instance = None
+    MAX_SNAPSHOTS = 8
+    STAT_TTL = 5.0
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Create a new instance of the DirectoryListing class if it does not already exist.
+
+        Returns:
+            DirectoryListing: The singleton instance of the DirectoryListing class.
+        """
+        if not cls._instance:
+            cls._instance = super(DirectoryListing, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initialize the DirectoryListing instance.
+        """
+        if not hasattr(self, '_initialized'):
+            self._snapshots: OrderedDict[str, DirectorySnapshot] = OrderedDict()
+            self._lock = threading.Lock()
+            self._initialized = True
+
+    @staticmethod
+    def scan(path: Path, with_stat: bool = False):
+        """
+        Iterate over the entries of a directory.
+
+        Args:
+            path (Path): The directory to scan.
+            with_stat (bool): Whether to collect sizes and modification times in the same pass.
+
+        Yields:
+            DirectoryEntry: The entries, in file system order.
+        """
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not with_stat:
+                    yield DirectoryEntry(entry.name, is_dir)
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    yield DirectoryEntry(entry.name, is_dir)
+                    continue
+                yield DirectoryEntry(entry.name, is_dir, None if is_dir else stat.st_size, stat.st_mtime_ns)
+
+    def get_cached_snapshot(self, path: Path, mtime_ns: int, with_stat: bool = False) -> DirectorySnapshot | None:
+        """
+        Look up a snapshot without scanning.
+
+        Args:
+            path (Path): The resolved path of the directory.
+            mtime_ns (int): The current mtime of the directory.
+            with_stat (bool): Whether the snapshot must carry sizes and modification times.
+
+        Returns:
+            DirectorySnapshot | None: The snapshot, or None if there is no fresh one.
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(str(path))
+            if snapshot is None or snapshot.mtime_ns != mtime_ns:
+                return None
+            if with_stat and not snapshot.with_stat:
+                return None
+            if snapshot.with_stat and time.monotonic() - snapshot.taken_at > self.STAT_TTL:
+                return None
+            self._snapshots.move_to_end(str(path))
+            return snapshot
+
+    def get_snapshot(self, path: Path, mtime_ns: int, with_stat: bool = False) -> DirectorySnapshot:
+        """
+        Return a fresh sorted snapshot of a directory, scanning it if needed.
+
+        This is a blocking call, run it in a thread from async code.
+
+        Args:
+            path (Path): The resolved path of the directory.
+            mtime_ns (int): The current mtime of the directory.
+            with_stat (bool): Whether the snapshot must carry sizes and modification times.
+
+        Returns:
+            DirectorySnapshot: The snapshot.
+        """
+        snapshot = self.get_cached_snapshot(path, mtime_ns, with_stat)
+        if snapshot is not None:
+            return snapshot
+
+        entries = sorted(self.scan(path, with_stat), key=lambda entry: entry.sort_key)
+        snapshot = DirectorySnapshot(path, mtime_ns, entries, with_stat)
+        logger.debug(f"Took snapshot of {path} with {len(entries)} entries")
+
+        with self._lock:
+            self._snapshots[str(path)] = snapshot
+            self._snapshots.move_to_end(str(path))
+            while len(self._snapshots) > self.MAX_SNAPSHOTS:
+                self._snapshots.popitem(last=False)
+        return snapshot
+
+    def first_entries(
+            self,
+            path: Path,
+            count: int,
+            query: ListingQuery,
+            with_stat: bool = False) -> tuple[list[DirectoryEntry], int]:
+        """
+        Return the first entries of a directory in query order without sorting all of it.
+
+        Only `count` entries are kept in memory while scanning.
+
+        This is a blocking call, run it in a thread from async code.
+
+        Args:
+            path (Path): The resolved path of the directory.
+            count (int): The number of entries to return.
+            query (ListingQuery): The sort order and filters.
+            with_stat (bool): Whether to collect sizes and modification times.
+
+        Returns:
+            tuple[list[DirectoryEntry], int]: The first entries and the number of matching entries.
+        """
+        total = 0
+
+        def matching():
+            nonlocal total
+            for entry in self.scan(path, with_stat or query.needs_stat):
+                if query.matches(entry):
+                    total += 1
+                    yield entry
+
+        select = heapq.nlargest if query.descending else heapq.nsmallest
+        entries = select(count, matching(), key=query.sort_key)
+        return entries, total
+
+    def invalidate(self, path: Path) -> None:
+        """
+        Drop the snapshot of a directory.
+
+        Args:
+            path (Path): The resolved path of the directory.
+        """
+        with self._lock:
+            self._snapshots.pop(str(path), None)
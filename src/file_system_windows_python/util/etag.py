@@ -0,0 +1,43 @@
+import hashlib
+from pathlib import Path
+
+
+def new_hasher():
+    """
+    Create the hash object ETags are computed with.
+
+    Returns:
+        The hash object, a 128-bit BLAKE2b.
+    """
+    return hashlib.blake2b(digest_size=16)
+
+
+def content_etag(data) -> str:
+    """
+    Compute the ETag of file content.
+
+    Args:
+        data: The content, e.g. bytes or an mmap.
+
+    Returns:
+        str: The ETag, a hex digest of the content.
+    """
+    hasher = new_hasher()
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+def file_etag(path: Path) -> str:
+    """
+    Compute the ETag of a file without loading it into memory.
+
+    This is a blocking call, run it in a thread from async code.
+
+    Args:
+        path (Path): The file.
+
+    Returns:
+        str: The ETag, a hex digest of the content.
+    """
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, new_hasher).hexdigest()
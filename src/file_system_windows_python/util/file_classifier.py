@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from magika import Magika
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ClassifierStats:
+    """
+    Load time and latency figures of the shared classifier.
+
+    Attributes:
+        load_time (float | None): Seconds it took to load the model, None if it is not loaded yet.
+        calls (int): Number of classification requests served.
+        batches (int): Number of worker thread calls made to serve those requests.
+        total_latency (float): Sum of the per-request latencies in seconds.
+        last_latency (float | None): Latency of the most recent request in seconds.
+    """
+    load_time: float | None = None
+    calls: int = 0
+    batches: int = 0
+    total_latency: float = 0.0
+    last_latency: float | None = None
+
+    @property
+    def average_latency(self) -> float | None:
+        """Average per-request latency in seconds, None if nothing was classified yet."""
+        if not self.calls:
+            return None
+        return self.total_latency / self.calls
+
+
+class FileClassifier:
+    """
+    Singleton service around one shared Magika model.
+
+    The model is loaded once, either in the background through `start` or on first use.
+    Inference runs in a worker thread. Requests that arrive while a batch is being
+    classified are queued and served together by the next thread call.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Create a new instance of the FileClassifier class if it does not already exist.
+
+        Returns:
+            FileClassifier: The singleton instance of the FileClassifier class.
+        """
+        if not cls._instance:
+            cls._instance = super(FileClassifier, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initialize the FileClassifier instance.
+
+        The model itself is not loaded here, see `start` and `identify_bytes`.
+        """
+        if not hasattr(self, '_initialized'):
+            self._magika: Magika | None = None
+            self._load_lock = threading.Lock()
+            self._load_task: asyncio.Task | None = None
+            self._pending: list[tuple[bytes, asyncio.Future]] = []
+            self._batch_task: asyncio.Task | None = None
+            self.stats = ClassifierStats()
+            self._initialized = True
+
+    def start(self) -> None:
+        """
+        Start loading the model in the background.
+
+        Must be called from within a running event loop. Calling it more than once has no effect.
+        """
+        if self._load_task is None and self._magika is None:
+            self._load_task = asyncio.get_running_loop().create_task(asyncio.to_thread(self._load))
+
+    async def identify_bytes(self, content: bytes) -> str:
+        """
+        Determine the MIME type of the given content.
+
+        Args:
+            content (bytes): The content to classify.
+
+        Returns:
+            str: The MIME type reported by the model.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        start = time.perf_counter()
+        self._pending.append((content, future))
+        if self._batch_task is None or self._batch_task.done():
+            self._batch_task = loop.create_task(self._run_batches())
+
+        mime_type = await future
+
+        latency = time.perf_counter() - start
+        self.stats.calls += 1
+        self.stats.total_latency += latency
+        self.stats.last_latency = latency
+        logger.debug(f"Classified {len(content)} bytes as {mime_type} in {latency * 1000:.1f} ms")
+        return mime_type
+
+    async def _run_batches(self) -> None:
+        """
+        Drain the pending queue, classifying everything queued so far in a single model call.
+        """
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                mime_types = await asyncio.to_thread(self._identify_batch, [content for content, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.stats.batches += 1
+            for (_, future), mime_type in zip(batch, mime_types):
+                if not future.done():
+                    future.set_result(mime_type)
+
+    def _load(self) -> Magika:
+        """
+        Load the model if it is not loaded yet.
+
+        Returns:
+            Magika: The shared model instance.
+        """
+        with self._load_lock:
+            if self._magika is None:
+                start = time.perf_counter()
+                self._magika = Magika()
+                self.stats.load_time = time.perf_counter() - start
+                logger.info(f"Loaded Magika model in {self.stats.load_time * 1000:.1f} ms")
+        return self._magika
+
+    def _identify_batch(self, contents: list[bytes]) -> list[str]:
+        """
+        Classify several contents in one worker thread call.
+
+        Only the public API of Magika is used, which classifies one content per call.
+
+        Args:
+            contents (list[bytes]): The contents to classify.
+
+        Returns:
+            list[str]: The MIME types, in the same order as the contents.
+        """
+        magika = self._load()
+        return [magika.identify_bytes(content).output.mime_type for content in contents]
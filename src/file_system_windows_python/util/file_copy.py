@@ -0,0 +1,120 @@
+import errno
+import logging
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import BinaryIO
+
+from file_system_windows_python.util.atomic_writer import replace_file, temp_path_for
+from file_system_windows_python.util.cancellation import check_cancelled
+from file_system_windows_python.util.config import Config
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+KERNEL_CHUNK_SIZE = 2 ** 26  # Bytes requested per copy_file_range or sendfile call
+CHUNK_SIZE = 2 ** 20  # Bytes copied at a time when the kernel cannot copy
+# Errors meaning the kernel cannot copy between these two files, not that the copy failed.
+FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSOCK, errno.EPERM}
+
+
+def _copy_file_range(source_fd: int, target_fd: int, offset: int) -> int:
+    """Copy from an offset to the end of the source with copy_file_range, return the end offset."""
+    while copied := os.copy_file_range(source_fd, target_fd, KERNEL_CHUNK_SIZE, offset, offset):
+        offset += copied
+        check_cancelled()
+    return offset
+
+
+def _sendfile(source_fd: int, target_fd: int, offset: int) -> int:
+    """Copy from an offset to the end of the source with sendfile, return the end offset."""
+    os.lseek(target_fd, offset, os.SEEK_SET)
+    while copied := os.sendfile(target_fd, source_fd, offset, KERNEL_CHUNK_SIZE):
+        offset += copied
+        check_cancelled()
+    return offset
+
+
+def kernel_copy_methods() -> list:
+    """
+    Return the in-kernel copy functions this platform offers, best first.
+
+    copy_file_range can share extents on copy-on-write filesystems and copies server-side
+    on network filesystems; sendfile copies between any two files on Linux only.
+
+    Returns:
+        list: The copy functions, empty on Windows.
+    """
+    methods = []
+    if hasattr(os, 'copy_file_range'):
+        methods.append(_copy_file_range)
+    if hasattr(os, 'sendfile') and sys.platform.startswith('linux'):
+        methods.append(_sendfile)
+    return methods
+
+
+def copy_data(source: BinaryIO, target: BinaryIO) -> int:
+    """
+    Copy the content of one open file to another without passing it through Python.
+
+    The kernel copies where it can. A method that is not supported for these files is
+    skipped, continuing where the previous one stopped, and plain chunked reads and writes
+    are the last resort. The copy stops between chunks once its tool call is cancelled.
+
+    Args:
+        source (BinaryIO): The source, opened for reading at its start.
+        target (BinaryIO): The empty target, opened for writing.
+
+    Returns:
+        int: The number of bytes copied.
+    """
+    offset = 0
+    for method in kernel_copy_methods():
+        try:
+            return method(source.fileno(), target.fileno(), offset)
+        except OSError as e:
+            if e.errno not in FALLBACK_ERRNOS:
+                raise
+            logger.debug(f"{method.__name__} cannot copy {source.name}: {str(e)}")
+
+    source.seek(offset)
+    target.seek(offset)
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    while read := source.readinto(buffer):
+        target.write(view[:read])
+        offset += read
+        check_cancelled()
+    return offset
+
+
+def copy_file(source: Path, target: Path) -> int:
+    """
+    Copy a file with its permissions and modification time.
+
+    The copy is written to a temporary file next to the target that then replaces it, so
+    an interrupted copy never leaves a partial target behind.
+
+    This is a blocking call, run it in a thread from async code.
+
+    Args:
+        source (Path): The file to copy.
+        target (Path): The file to create or replace.
+
+    Returns:
+        int: The number of bytes copied.
+    """
+    temp_path = temp_path_for(target)
+    try:
+        with open(source, 'rb') as source_file, open(temp_path, 'wb') as target_file:
+            size = copy_data(source_file, target_file)
+            if Config().fsync:
+                target_file.flush()
+                os.fsync(target_file.fileno())
+        shutil.copystat(source, temp_path)
+        replace_file(temp_path, target)
+        return size
+    finally:
+        if temp_path.exists():
+            os.remove(temp_path)
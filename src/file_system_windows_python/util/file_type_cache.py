@@ -0,0 +1,127 @@
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class FileTypeCache:
+    """
+    Singleton LRU cache of file type verdicts.
+
+    Verdicts are keyed by file identity and modification stamp (device, inode, size, mtime),
+    so a changed file misses the cache on its own. `invalidate` drops the entry of a path
+    explicitly, which the server does after its own writes.
+    """
+    _instance = None
+    MAX_ENTRIES = 1024
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Create a new instance of the FileTypeCache class if it does not already exist.
+
+        Returns:
+            FileTypeCache: The singleton instance of the FileTypeCache class.
+        """
+        if not cls._instance:
+            cls._instance = super(FileTypeCache, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initialize the FileTypeCache instance.
+        """
+        if not hasattr(self, '_initialized'):
+            self._entries: OrderedDict[tuple, str] = OrderedDict()
+            self._keys_by_path: dict[str, tuple] = {}
+            self._paths_by_key: dict[tuple, str] = {}
+            self.hits = 0
+            self.misses = 0
+            self._initialized = True
+
+    @staticmethod
+    def make_key(stat: os.stat_result) -> tuple:
+        """
+        Build the cache key of a file from its stat result.
+
+        Args:
+            stat (os.stat_result): The stat result of the file.
+
+        Returns:
+            tuple: The (device, inode, size, mtime) key.
+        """
+        return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def get(self, stat: os.stat_result) -> str | None:
+        """
+        Look up the verdict of a file.
+
+        Args:
+            stat (os.stat_result): The stat result of the file.
+
+        Returns:
+            str | None: The cached MIME type, or None on a miss.
+        """
+        key = self.make_key(stat)
+        mime_type = self._entries.get(key)
+        if mime_type is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return mime_type
+
+    def put(self, path: Path, stat: os.stat_result, mime_type: str) -> None:
+        """
+        Store the verdict of a file, evicting the least recently used entry when full.
+
+        Args:
+            path (Path): The resolved path of the file.
+            stat (os.stat_result): The stat result the verdict was computed for.
+            mime_type (str): The MIME type of the file.
+        """
+        key = self.make_key(stat)
+        old_key = self._keys_by_path.get(str(path))
+        if old_key is not None and old_key != key:
+            self._entries.pop(old_key, None)
+            self._paths_by_key.pop(old_key, None)
+        old_path = self._paths_by_key.get(key)
+        if old_path is not None and old_path != str(path):
+            # Another link to the same file, only the latest path is tracked.
+            self._keys_by_path.pop(old_path, None)
+
+        self._entries[key] = mime_type
+        self._entries.move_to_end(key)
+        self._keys_by_path[str(path)] = key
+        self._paths_by_key[key] = str(path)
+
+        while len(self._entries) > self.MAX_ENTRIES:
+            evicted_key, _ = self._entries.popitem(last=False)
+            evicted_path = self._paths_by_key.pop(evicted_key, None)
+            if evicted_path is not None:
+                self._keys_by_path.pop(evicted_path, None)
+
+    def invalidate(self, path: Path) -> None:
+        """
+        Drop the verdict of a path.
+
+        Args:
+            path (Path): The resolved path of the file.
+        """
+        key = self._keys_by_path.pop(str(path), None)
+        if key is not None:
+            self._entries.pop(key, None)
+            self._paths_by_key.pop(key, None)
+            logger.debug(f"Invalidated file type of {path}")
+
+    def clear(self) -> None:
+        """
+        Drop all verdicts and reset the counters.
+        """
+        self._entries.clear()
+        self._keys_by_path.clear()
+        self._paths_by_key.clear()
+        self.hits = 0
+        self.misses = 0
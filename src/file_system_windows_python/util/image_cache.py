@@ -0,0 +1,117 @@
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TransformedImage:
+    """
+    An image prepared for a response.
+
+    Attributes:
+        data (bytes): The encoded image.
+        mime_type (str): The MIME type of the encoded image.
+        original_size (tuple[int, int]): The width and height of the source image.
+        size (tuple[int, int]): The width and height of the encoded image.
+    """
+    data: bytes
+    mime_type: str
+    original_size: tuple[int, int]
+    size: tuple[int, int]
+
+
+class ImageCache:
+    """
+    Singleton LRU cache of downscaled and cropped images.
+
+    Images are keyed by file identity and modification stamp (device, inode, size, mtime)
+    together with the crop region and the size limits, so a changed file or another region
+    never hits a stale image. The least recently used images are evicted beyond `MAX_SIZE` bytes.
+    """
+    _instance = None
+    MAX_SIZE = 64 * 2 ** 20
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Create a new instance of the ImageCache class if it does not already exist.
+
+        Returns:
+            ImageCache: The singleton instance of the ImageCache class.
+        """
+        if not cls._instance:
+            cls._instance = super(ImageCache, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initialize the ImageCache instance.
+        """
+        if not hasattr(self, '_initialized'):
+            self._entries: OrderedDict[tuple, TransformedImage] = OrderedDict()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+            self._initialized = True
+
+    @staticmethod
+    def make_key(
+            stat: os.stat_result,
+            max_dimension: int,
+            max_bytes: int,
+            crop: tuple[int, int, int, int] | None) -> tuple:
+        """
+        Build the cache key of a transformed image.
+
+        Args:
+            stat (os.stat_result): The stat result of the image file.
+            max_dimension (int): The longest side of the output in pixels.
+            max_bytes (int): The maximum size of the encoded output.
+            crop (tuple[int, int, int, int] | None): The crop region, if any.
+
+        Returns:
+            tuple: The key.
+        """
+        return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, max_dimension, max_bytes, crop
+
+    def get(self, key: tuple) -> TransformedImage | None:
+        """
+        Look up a transformed image.
+
+        Args:
+            key (tuple): The key built by `make_key`.
+
+        Returns:
+            TransformedImage | None: The image, or None on a miss.
+        """
+        image = self._entries.get(key)
+        if image is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return image
+
+    def put(self, key: tuple, image: TransformedImage) -> None:
+        """
+        Store a transformed image, evicting the least recently used images beyond the size limit.
+
+        Args:
+            key (tuple): The key built by `make_key`.
+            image (TransformedImage): The image.
+        """
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous.data)
+        self._entries[key] = image
+        self.size += len(image.data)
+        while self.size > self.MAX_SIZE and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted.data)
+
+    def __len__(self) -> int:
+        """The number of cached images."""
+        return len(self._entries)
@@ -0,0 +1,227 @@
+import io
+import os
+
+from PIL import ExifTags, Image, ImageDraw, ImageFont, ImageOps
+
+from file_system_windows_python.util.cancellation import check_cancelled
+from file_system_windows_python.util.pdf_worker import FileStamp, file_stamp
+
+PASSTHROUGH_TYPES = {'JPEG': 'image/jpeg', 'PNG': 'image/png', 'WEBP': 'image/webp', 'GIF': 'image/gif'}
+QUALITY_STEPS = (85, 75, 60, 45)  # Qualities tried before the image is scaled down further
+SCALE_STEP = 0.75  # Factor the longest side shrinks by when no quality fits the byte budget
+MIN_DIMENSION = 64
+SHEET_PADDING = 8  # Pixels between the cells of a contact sheet
+LABEL_HEIGHT = 14  # Pixels below each thumbnail for its label
+
+
+def _open_checked(path: str, stamp: FileStamp):
+    """
+    Open a file for reading and make sure it is the very file that was validated.
+
+    Args:
+        path (str): The path of the file.
+        stamp (FileStamp): The stamp of the file at validation.
+
+    Returns:
+        The open binary file.
+
+    Raises:
+        ValueError: If the path no longer refers to the validated file.
+    """
+    f = open(path, 'rb')
+    if file_stamp(os.fstat(f.fileno())) != stamp:
+        f.close()
+        raise ValueError(f"File {path} changed since it was validated")
+    return f
+
+
+def transform_image(
+        path: str,
+        stamp: FileStamp,
+        max_dimension: int,
+        max_bytes: int,
+        crop: tuple[int, int, int, int] | None = None) -> tuple[bytes, str, tuple[int, int], tuple[int, int]]:
+    """
+    Load an image, optionally crop it, and fit it into a maximum dimension and byte size.
+
+    Files that already fit are returned unchanged. Otherwise JPEGs are decoded at a reduced
+    scale with `draft`, other formats are shrunk with `reduce` while resizing, and the result
+    is encoded as JPEG for JPEG sources and as WebP for everything else. The quality and then
+    the size are lowered step by step until the output fits `max_bytes`.
+
+    Runs inside a WorkerPool process. The file is only decoded if it is still the one that
+    was validated.
+
+    Args:
+        path (str): The path of the image file.
+        stamp (FileStamp): The stamp of the file at validation, see `file_stamp`.
+        max_dimension (int): The longest side of the output in pixels.
+        max_bytes (int): The maximum size of the encoded output.
+        crop (tuple[int, int, int, int] | None): A region (left, top, width, height) in pixels of the original image.
+
+    Returns:
+        tuple[bytes, str, tuple[int, int], tuple[int, int]]: The encoded image, its MIME type, the size of the
+            original image and the size of the output.
+
+    Raises:
+        ValueError: If the file changed since it was validated, the crop region lies outside
+            the image or no output fits the byte budget.
+    """
+    with _open_checked(path, stamp) as f, Image.open(f) as img:
+        source_format = img.format
+        orientation = img.getexif().get(ExifTags.Base.Orientation, 1)
+        original_size = (img.height, img.width) if orientation in (5, 6, 7, 8) else img.size
+        fits = max(original_size) <= max_dimension and stamp[2] <= max_bytes
+        if crop is None and fits and source_format in PASSTHROUGH_TYPES and orientation == 1:
+            f.seek(0)
+            return f.read(), PASSTHROUGH_TYPES[source_format], original_size, original_size
+
+        left, top, width, height = crop or (0, 0, *original_size)
+        inside = 0 <= left and 0 <= top and left + width <= original_size[0] and top + height <= original_size[1]
+        if width <= 0 or height <= 0 or not inside:
+            raise ValueError(f"Crop region {crop} lies outside the image of {original_size[0]}x{original_size[1]} pixels")
+
+        scale = min(max_dimension / max(width, height), 1.0)
+        if source_format == 'JPEG':
+            img.draft('RGB', (int(img.width * scale) + 1, int(img.height * scale) + 1))
+        img = ImageOps.exif_transpose(img)
+        ratio = img.width / original_size[0]
+        region = img.crop((round(left * ratio), round(top * ratio),
+                           round((left + width) * ratio), round((top + height) * ratio)))
+        region = _normalize_mode(region, jpeg=source_format == 'JPEG')
+
+        dimension = min(max_dimension, max(width, height))
+        while True:
+            check_cancelled()
+            output = _fit(region, dimension)
+            for quality in QUALITY_STEPS:
+                data = _encode(output, source_format == 'JPEG', quality)
+                if len(data) <= max_bytes:
+                    mime_type = 'image/jpeg' if source_format == 'JPEG' else 'image/webp'
+                    return data, mime_type, original_size, output.size
+            if dimension <= MIN_DIMENSION:
+                raise ValueError(f"Image does not fit into {max_bytes} bytes")
+            dimension = max(int(dimension * SCALE_STEP), MIN_DIMENSION)
+
+
+def _normalize_mode(img: Image.Image, jpeg: bool) -> Image.Image:
+    """Convert an image to RGB, or to RGBA if it has transparency and is not encoded as JPEG."""
+    has_alpha = img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+    mode = 'RGBA' if has_alpha and not jpeg else 'RGB'
+    return img if img.mode == mode else img.convert(mode)
+
+
+def _fit(img: Image.Image, dimension: int) -> Image.Image:
+    """Scale an image down so its longest side is at most the given dimension."""
+    scale = dimension / max(img.size)
+    if scale >= 1:
+        return img
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    return img.resize(size, Image.LANCZOS, reducing_gap=3.0)
+
+
+def _encode(img: Image.Image, jpeg: bool, quality: int) -> bytes:
+    """Encode an image as JPEG or WebP."""
+    output_buffer = io.BytesIO()
+    if jpeg:
+        img.save(output_buffer, format="JPEG", quality=quality, optimize=True)
+    else:
+        img.save(output_buffer, format="WEBP", quality=quality, method=4)
+    return output_buffer.getvalue()
+
+
+def make_thumbnail(path: str, stamp: FileStamp, size: int) -> tuple[bytes, tuple[int, int], tuple[int, int]]:
+    """
+    Decode an image as a thumbnail for a contact sheet.
+
+    JPEGs are decoded at a reduced scale with `draft`, transparency is flattened onto white.
+
+    Runs inside a WorkerPool process. The file is only decoded if it is still the one that
+    was validated.
+
+    Args:
+        path (str): The path of the image file.
+        stamp (FileStamp): The stamp of the file at validation, see `file_stamp`.
+        size (int): The longest side of the thumbnail in pixels.
+
+    Returns:
+        tuple[bytes, tuple[int, int], tuple[int, int]]: The raw RGB pixels and the size of the
+            thumbnail, and the size of the original image.
+
+    Raises:
+        ValueError: If the file changed since it was validated.
+    """
+    with _open_checked(path, stamp) as f, Image.open(f) as img:
+        orientation = img.getexif().get(ExifTags.Base.Orientation, 1)
+        original_size = (img.height, img.width) if orientation in (5, 6, 7, 8) else img.size
+        img.draft('RGB', (size, size))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((size, size), Image.LANCZOS, reducing_gap=3.0)
+        img = _normalize_mode(img, jpeg=False)
+        if img.mode == 'RGBA':
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel('A'))
+            img = background
+        return img.tobytes(), img.size, original_size
+
+
+def compose_sheet(
+        thumbnails: list[tuple[bytes, tuple[int, int]] | None],
+        labels: list[str],
+        columns: int,
+        cell: int,
+        max_bytes: int) -> tuple[bytes, tuple[int, int]]:
+    """
+    Arrange thumbnails in a labelled grid and encode it as WebP.
+
+    The quality is lowered step by step until the sheet fits `max_bytes`; the last attempt is
+    returned even if it does not fit.
+
+    Runs inside a WorkerPool process.
+
+    Args:
+        thumbnails (list[tuple[bytes, tuple[int, int]] | None]): The raw RGB pixels and size of each
+            thumbnail, None for images that could not be read.
+        labels (list[str]): The label of each cell.
+        columns (int): The number of cells per row.
+        cell (int): The side of a cell in pixels.
+        max_bytes (int): The maximum size of the encoded sheet.
+
+    Returns:
+        tuple[bytes, tuple[int, int]]: The WebP sheet and its size.
+    """
+    rows = -(-len(thumbnails) // columns)
+    columns = min(columns, len(thumbnails))
+    width = SHEET_PADDING + columns * (cell + SHEET_PADDING)
+    height = SHEET_PADDING + rows * (cell + LABEL_HEIGHT + SHEET_PADDING)
+    sheet = Image.new('RGB', (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(sheet)
+    font = ImageFont.load_default()
+
+    for position, (thumbnail, label) in enumerate(zip(thumbnails, labels)):
+        x = SHEET_PADDING + (position % columns) * (cell + SHEET_PADDING)
+        y = SHEET_PADDING + (position // columns) * (cell + LABEL_HEIGHT + SHEET_PADDING)
+        if thumbnail is None:
+            draw.rectangle((x, y, x + cell - 1, y + cell - 1), fill=(224, 224, 224))
+            draw.text((x + 4, y + cell // 2), "unreadable", fill=(96, 96, 96), font=font)
+        else:
+            data, size = thumbnail
+            sheet.paste(Image.frombytes('RGB', size, data), (x + (cell - size[0]) // 2, y + cell - size[1]))
+        draw.text((x, y + cell + 2), _fit_label(draw, label, font, cell), fill=(0, 0, 0), font=font)
+
+    data = b''
+    for quality in QUALITY_STEPS:
+        data = _encode(sheet, False, quality)
+        if len(data) <= max_bytes:
+            break
+    return data, sheet.size
+
+
+def _fit_label(draw: ImageDraw.ImageDraw, label: str, font, width: int) -> str:
+    """Shorten a label from the middle until it fits the given width."""
+    if draw.textlength(label, font=font) <= width:
+        return label
+    head, tail = label[:len(label) // 2], label[len(label) // 2:]
+    while head and draw.textlength(f"{head}...{tail}", font=font) > width:
+        head, tail = head[:-1], tail[1:]
+    return f"{head}...{tail}"
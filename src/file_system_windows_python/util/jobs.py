@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from mcp.types import TextContent, ImageContent, EmbeddedResource
+
+from file_system_windows_python.util.cancellation import CancelToken, OperationCancelled
+from file_system_windows_python.util.progress import Progress
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    """
+    A tool call that outlived its response deadline and keeps running in the background.
+
+    Attributes:
+        id (str): The ID clients poll and cancel the job with.
+        tool (str): The name of the tool.
+        task (asyncio.Task): The task running the handler.
+        token (CancelToken): The cancellation token of the call.
+        progress (Progress): The progress and partial results of the call.
+        started (float): The wall clock time the call started at.
+        finished (float | None): The wall clock time the job ended at, None while it runs.
+    """
+    id: str
+    tool: str
+    task: asyncio.Task
+    token: CancelToken
+    progress: Progress
+    started: float
+    finished: float | None = None
+
+    @property
+    def status(self) -> str:
+        """One of 'running', 'done', 'failed' or 'cancelled'."""
+        if not self.task.done():
+            return 'running'
+        if self.task.cancelled():
+            return 'cancelled'
+        if isinstance(self.task.exception(), OperationCancelled):
+            return 'cancelled' if self.token.cancelled and time.time() <= self.token.deadline else 'failed'
+        return 'failed' if self.task.exception() is not None else 'done'
+
+    @property
+    def result(self) -> list[TextContent | ImageContent | EmbeddedResource]:
+        """The result of the handler, or a description of why there is none."""
+        status = self.status
+        if status == 'done':
+            return self.task.result()
+        if status == 'cancelled':
+            return [TextContent(type="text", text=f"Job {self.id} was cancelled")]
+        if status == 'failed':
+            error = self.task.exception()
+            if isinstance(error, OperationCancelled):
+                return [TextContent(type="text", text=f"Job {self.id} ran out of time")]
+            return [TextContent(type="text", text=f"Job {self.id} failed: {str(error)}")]
+        raise ValueError(f"Job {self.id} is still running")
+
+    def describe(self) -> str:
+        """A one-line summary of the job and its progress."""
+        elapsed = (self.finished or time.time()) - self.started
+        text = f"Job {self.id} ({self.tool}): {self.status} after {elapsed:.1f}s"
+        if self.progress.total:
+            text += f", {self.progress.done:g} of {self.progress.total:g}"
+        elif self.progress.done:
+            text += f", {self.progress.done:g} done"
+        if self.progress.message:
+            text += f", {self.progress.message}"
+        return text
+
+
+class JobManager:
+    """
+    Singleton registry of the background jobs.
+
+    A tool that allows it continues as a job when its call runs past the response deadline,
+    see `Dispatcher`. Jobs run for at most `JOB_TIMEOUT` seconds. Finished jobs are kept for
+    polling until `MAX_FINISHED_JOBS` newer ones finished.
+    """
+    _instance = None
+    JOB_TIMEOUT = 3600
+    MAX_FINISHED_JOBS = 32
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Create a new instance of the JobManager class if it does not already exist.
+
+        Returns:
+            JobManager: The singleton instance of the JobManager class.
+        """
+        if not cls._instance:
+            cls._instance = super(JobManager, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initialize the JobManager instance.
+        """
+        if not hasattr(self, '_initialized'):
+            self._jobs: OrderedDict[str, Job] = OrderedDict()
+            self._finished: OrderedDict[str, None] = OrderedDict()
+            self._initialized = True
+
+    def adopt(self, tool: str, task: asyncio.Task, token: CancelToken, progress: Progress, started: float) -> Job:
+        """
+        Turn a running tool call into a job.
+
+        Args:
+            tool (str): The name of the tool.
+            task (asyncio.Task): The task running the handler.
+            token (CancelToken): The cancellation token of the call.
+            progress (Progress): The progress of the call.
+            started (float): The wall clock time the call started at.
+
+        Returns:
+            Job: The new job.
+        """
+        job = Job(secrets.token_hex(6), tool, task, token, progress, started)
+        self._jobs[job.id] = job
+        task.add_done_callback(lambda _: self._finish(job))
+        logger.debug(f"Continuing {tool} as job {job.id}")
+        return job
+
+    def get(self, job_id: str) -> Job:
+        """
+        Look up a job.
+
+        Args:
+            job_id (str): The ID of the job.
+
+        Returns:
+            Job: The job.
+
+        Raises:
+            ValueError: If there is no such job, or it finished too long ago.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise ValueError(f"Unknown job: {job_id}")
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        """
+        Cancel a job, stopping its blocking work at the next check.
+
+        Args:
+            job_id (str): The ID of the job.
+
+        Returns:
+            Job: The job.
+
+        Raises:
+            ValueError: If there is no such job.
+        """
+        job = self.get(job_id)
+        job.token.cancel()
+        job.task.cancel()
+        return job
+
+    @property
+    def jobs(self) -> list[Job]:
+        """The known jobs, oldest first."""
+        return list(self._jobs.values())
+
+    def _finish(self, job: Job) -> None:
+        """Record the end of a job and forget the oldest finished jobs beyond the limit."""
+        job.finished = time.time()
+        job.token.cancel()
+        if not job.task.cancelled():
+            job.task.exception()  # Retrieved here so an unpolled failure is not logged as lost
+        self._finished[job.id] = None
+        while len(self._finished) > self.MAX_FINISHED_JOBS:
+            old_id, _ = self._finished.popitem(last=False)
+            self._jobs.pop(old_id, None)
+        logger.debug(f"Job {job.id} ended: {job.status}")
@@ -0,0 +1,152 @@
+import logging
+import os
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LineIndex:
+    """
+    Sparse index of the line breaks of a file.
+
+    Instead of one offset per line, the index stores the number of line breaks before the
+    end of every block of `BLOCK_SIZE` bytes. Finding the start of a line is a binary
+    search over the blocks followed by a scan of a single block.
+
+    Attributes:
+        size (int): The size of the indexed file in bytes.
+        newlines (array): The cumulative number of line breaks at the end of each block.
+    """
+    BLOCK_SIZE = 2**16
+
+    size: int
+    newlines: array
+
+    @classmethod
+    def build(cls, data) -> 'LineIndex':
+        """
+        Count the line breaks of a buffer block by block.
+
+        Args:
+            data: A bytes-like object, e.g. an mmap of the file.
+
+        Returns:
+            LineIndex: The index of the buffer.
+        """
+        newlines = array('Q')
+        total = 0
+        for start in range(0, len(data), cls.BLOCK_SIZE):
+            total += bytes(data[start:start + cls.BLOCK_SIZE]).count(b'\n')
+            newlines.append(total)
+        return cls(len(data), newlines)
+
+    @property
+    def line_count(self) -> int:
+        """The number of line breaks in the buffer."""
+        return self.newlines[-1] if self.newlines else 0
+
+    def total_lines(self, data) -> int:
+        """
+        Count the lines of the indexed buffer, including a last line without a line break.
+
+        Args:
+            data: The indexed buffer.
+
+        Returns:
+            int: The number of lines.
+        """
+        if self.size == 0:
+            return 0
+        return self.line_count + (0 if data[self.size - 1:self.size] == b'\n' else 1)
+
+    def line_offset(self, data, line: int) -> int:
+        """
+        Find the byte offset where a line starts.
+
+        Args:
+            data: The indexed buffer.
+            line (int): The 1-based line number.
+
+        Returns:
+            int: The offset of the first byte of the line, the size of the buffer past the last line.
+        """
+        breaks_before = line - 1
+        if breaks_before <= 0:
+            return 0
+        if breaks_before > self.line_count:
+            # Past the last line break, only a last line without one can follow
+            return self.size
+
+        block = bisect_left(self.newlines, breaks_before)
+        position = block * self.BLOCK_SIZE - 1
+        remaining = breaks_before - (self.newlines[block - 1] if block else 0)
+        for _ in range(remaining):
+            position = data.find(b'\n', position + 1)
+        return position + 1
+
+
+class LineIndexCache:
+    """
+    Singleton LRU cache of line indexes.
+
+    Indexes are keyed by file identity and modification stamp (device, inode, size, mtime),
+    so a file that changed gets a new index instead of a wrong one.
+    """
+    _instance = None
+    MAX_ENTRIES = 16
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Create a new instance of the LineIndexCache class if it does not already exist.
+
+        Returns:
+            LineIndexCache: The singleton instance of the LineIndexCache class.
+        """
+        if not cls._instance:
+            cls._instance = super(LineIndexCache, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initialize the LineIndexCache instance.
+        """
+        if not hasattr(self, '_initialized'):
+            self._entries: OrderedDict[tuple, LineIndex] = OrderedDict()
+            self.hits = 0
+            self.misses = 0
+            self._initialized = True
+
+    def get_or_build(self, path: Path, stat: os.stat_result, data) -> LineIndex:
+        """
+        Return the line index of a file, building it on a miss.
+
+        This is a blocking call, run it in a thread from async code.
+
+        Args:
+            path (Path): The path of the file, used for logging.
+            stat (os.stat_result): The stat result of the file.
+            data: The content of the file, e.g. an mmap.
+
+        Returns:
+            LineIndex: The line index of the file.
+        """
+        key = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        index = self._entries.get(key)
+        if index is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return index
+
+        self.misses += 1
+        index = LineIndex.build(data)
+        self._entries[key] = index
+        if len(self._entries) > self.MAX_ENTRIES:
+            self._entries.popitem(last=False)
+        logger.debug(f"Built line index of {path} with {index.line_count} line breaks")
+        return index
@@ -0,0 +1,303 @@
+import re
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from file_system_windows_python.util.cancellation import check_cancelled
+from file_system_windows_python.util.line_index import LineIndex
+
+CHUNK_SIZE = 2 ** 20  # Bytes copied at a time while splicing
+HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+
+@dataclass
+class Hunk:
+    """
+    A hunk of a unified diff.
+
+    Attributes:
+        old_start (int): The 1-based line the hunk starts at in the current file.
+        old_lines (list[str]): The context and removed lines, without line breaks.
+        new_lines (list[str]): The context and added lines, without line breaks.
+        old_ends_file (bool): Whether the old lines end a file without a final line break.
+        new_ends_file (bool): Whether the new lines end a file without a final line break.
+    """
+    old_start: int
+    old_lines: list[str]
+    new_lines: list[str]
+    old_ends_file: bool = False
+    new_ends_file: bool = False
+
+
+@dataclass
+class Replacement:
+    """
+    A byte range of a file and the bytes replacing it.
+
+    Attributes:
+        start (int): The first byte of the range.
+        end (int): The byte after the range.
+        data (bytes): The replacement.
+    """
+    start: int
+    end: int
+    data: bytes
+
+
+def parse_unified_diff(diff: str) -> list[Hunk]:
+    """
+    Parse the hunks of a unified diff of a single file.
+
+    File headers before the first hunk are ignored. A "\\ No newline at end of file" marker
+    applies to the line before it, which then has no line break in the old or new content.
+    Empty lines inside a hunk count as empty context lines.
+
+    Args:
+        diff (str): The diff.
+
+    Returns:
+        list[Hunk]: The hunks, in order.
+
+    Raises:
+        ValueError: If a hunk header or line is malformed, or the diff has no hunks.
+    """
+    hunks = []
+    current = None
+    previous = None
+    for line in diff.splitlines():
+        if line.startswith('@@'):
+            match = HUNK_HEADER.match(line)
+            if match is None:
+                raise ValueError(f"Invalid hunk header: {line}")
+            current = Hunk(int(match.group(1)), [], [])
+            hunks.append(current)
+            previous = None
+        elif current is None:
+            continue
+        elif line.startswith('\\'):
+            if previous is None:
+                raise ValueError(f"Misplaced line in hunk: {line}")
+            current.old_ends_file = current.old_ends_file or previous in ' -'
+            current.new_ends_file = current.new_ends_file or previous in ' +'
+        elif line == '' or line.startswith(' '):
+            current.old_lines.append(line[1:])
+            current.new_lines.append(line[1:])
+            previous = ' '
+        elif line.startswith('-'):
+            current.old_lines.append(line[1:])
+            previous = '-'
+        elif line.startswith('+'):
+            current.new_lines.append(line[1:])
+            previous = '+'
+        else:
+            raise ValueError(f"Invalid line in hunk: {line}")
+    if not hunks:
+        raise ValueError("The diff contains no hunks")
+    return hunks
+
+
+def detect_newline(data) -> bytes:
+    """
+    Detect the line break style of a file from its first line break.
+
+    Args:
+        data: The content of the file, e.g. an mmap.
+
+    Returns:
+        bytes: b'\\r\\n' or b'\\n'.
+    """
+    position = data.find(b'\n')
+    return b'\r\n' if position > 0 and data[position - 1:position] == b'\r' else b'\n'
+
+
+def to_bytes(text: str, newline: bytes) -> bytes:
+    """
+    Encode text as UTF-8 with the line breaks of the file.
+
+    Args:
+        text (str): The text, with any line break style.
+        newline (bytes): The line break of the file.
+
+    Returns:
+        bytes: The encoded text.
+    """
+    return text.encode('utf-8').replace(b'\r\n', b'\n').replace(b'\n', newline)
+
+
+def find_unique(data, needle: bytes, what: str) -> int:
+    """
+    Find the only occurrence of a byte string.
+
+    Args:
+        data: The content of the file, e.g. an mmap.
+        needle (bytes): The bytes to find.
+        what (str): A description of the needle for error messages.
+
+    Returns:
+        int: The offset of the occurrence.
+
+    Raises:
+        ValueError: If the needle does not occur or occurs more than once.
+    """
+    first = data.find(needle)
+    if first == -1:
+        raise ValueError(f"{what} was not found in the file")
+    if data.find(needle, first + 1) != -1:
+        raise ValueError(f"{what} occurs more than once, add surrounding lines to make it unique")
+    return first
+
+
+def find_nearest(data, needle: bytes, hint: int) -> int:
+    """
+    Find the occurrence of a byte string closest to an expected offset.
+
+    Args:
+        data: The content of the file, e.g. an mmap.
+        needle (bytes): The bytes to find.
+        hint (int): The expected offset.
+
+    Returns:
+        int: The offset of the closest occurrence, -1 if there is none.
+    """
+    after = data.find(needle, hint)
+    before = data.rfind(needle, 0, hint + len(needle) - 1)
+    if after == -1 or (before != -1 and hint - before < after - hint):
+        return before
+    return after
+
+
+def locate_blocks(data, blocks: list[tuple[str, str]], newline: bytes) -> list[Replacement]:
+    """
+    Turn search/replace blocks into replacements of the current content.
+
+    Args:
+        data: The content of the file, e.g. an mmap.
+        blocks (list[tuple[str, str]]): The search and replace text of each block.
+        newline (bytes): The line break of the file.
+
+    Returns:
+        list[Replacement]: The replacements, ordered by position.
+
+    Raises:
+        ValueError: If a search text does not occur exactly once or two blocks overlap.
+    """
+    replacements = []
+    for number, (search, replace) in enumerate(blocks, start=1):
+        needle = to_bytes(search, newline)
+        start = find_unique(data, needle, f"Search text of edit {number}")
+        replacements.append(Replacement(start, start + len(needle), to_bytes(replace, newline)))
+    return ordered(replacements)
+
+
+def locate_hunks(data, hunks: list[Hunk], newline: bytes, index: LineIndex) -> list[Replacement]:
+    """
+    Turn unified diff hunks into replacements of the current content.
+
+    A hunk is applied where its old lines are found closest to the line its header names,
+    so hunks still apply when earlier parts of the file moved. Old lines marked as ending
+    the file without a line break only match at the end of the file.
+
+    Args:
+        data: The content of the file, e.g. an mmap.
+        hunks (list[Hunk]): The hunks.
+        newline (bytes): The line break of the file.
+        index (LineIndex): The line index of the file.
+
+    Returns:
+        list[Replacement]: The replacements, ordered by position.
+
+    Raises:
+        ValueError: If the old lines of a hunk are not found or two hunks overlap.
+    """
+    replacements = []
+    for number, hunk in enumerate(hunks, start=1):
+        old = b''.join(to_bytes(line, newline) + newline for line in hunk.old_lines)
+        new = b''.join(to_bytes(line, newline) + newline for line in hunk.new_lines)
+        if hunk.old_ends_file:
+            old = old[:-len(newline)]
+        if hunk.new_ends_file:
+            new = new[:-len(newline)]
+        if not hunk.old_lines:
+            # A pure insertion goes after the line the header names.
+            position = index.line_offset(data, hunk.old_start + 1)
+            if len(data) and position == len(data) and data[-len(newline):] != newline:
+                # The last line of the file has no line break, which it needs before the new lines.
+                new = newline + new
+            replacements.append(Replacement(position, position, new))
+            continue
+
+        # Hunks match whole lines, so only occurrences at the start of a line count.
+        if hunk.old_ends_file:
+            start = len(data) - len(old)
+            if start < 0 or data[start:] != old or not at_line_start(data, start):
+                start = -1
+        else:
+            hint = index.line_offset(data, max(hunk.old_start, 1))
+            start = find_nearest(data, b'\n' + old, max(hint - 1, 0))
+            start = start + 1 if start != -1 else -1
+            if data[:len(old)] == old and (start == -1 or hint <= abs(start - hint)):
+                start = 0
+            end = len(data) - len(old) + len(newline)
+            if start == -1 and end >= 0 and data[end:] == old[:-len(newline)] and at_line_start(data, end):
+                # The last line of the file has no line break although the hunk does not say so.
+                start, old = end, old[:-len(newline)]
+                new = new[:-len(newline)] if new.endswith(newline) else new
+        if start == -1:
+            raise ValueError(f"Lines of hunk {number} (line {hunk.old_start}) were not found in the file")
+        replacements.append(Replacement(start, start + len(old), new))
+    return ordered(replacements)
+
+
+def at_line_start(data, position: int) -> bool:
+    """Return whether a position is at the start of the buffer or right after a line break."""
+    return position == 0 or data[position - 1:position] == b'\n'
+
+
+def ordered(replacements: list[Replacement]) -> list[Replacement]:
+    """
+    Sort replacements by position and reject overlapping ones.
+
+    Args:
+        replacements (list[Replacement]): The replacements.
+
+    Returns:
+        list[Replacement]: The replacements, ordered by position.
+
+    Raises:
+        ValueError: If two replacements overlap.
+    """
+    replacements = sorted(replacements, key=lambda replacement: (replacement.start, replacement.end))
+    for previous, current in zip(replacements, replacements[1:]):
+        if current.start < previous.end:
+            raise ValueError(f"Edits at bytes {previous.start} and {current.start} overlap")
+    return replacements
+
+
+def splice(data, replacements: list[Replacement], out: BinaryIO, hasher) -> int:
+    """
+    Write the content with the replacements applied, copying the unchanged parts in chunks.
+
+    Args:
+        data: The current content, e.g. an mmap.
+        replacements (list[Replacement]): The replacements, ordered by position.
+        out (BinaryIO): The file to write to.
+        hasher: A hash object updated with everything written.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    written = 0
+
+    def write(chunk) -> None:
+        nonlocal written
+        out.write(chunk)
+        hasher.update(chunk)
+        written += len(chunk)
+
+    position = 0
+    for replacement in [*replacements, Replacement(len(data), len(data), b'')]:
+        for chunk_start in range(position, replacement.start, CHUNK_SIZE):
+            check_cancelled()
+            write(data[chunk_start:min(chunk_start + CHUNK_SIZE, replacement.start)])
+        write(replacement.data)
+        position = replacement.end
+    return written
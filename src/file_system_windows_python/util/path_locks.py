@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import os
+from collections import deque
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class ReadWriteLock:
+    """
+    An asyncio lock held by any number of readers or by one writer.
+
+    Waiters are served in arrival order, so a waiting writer holds back later readers
+    instead of starving behind a stream of them, and readers arriving together share the lock.
+    """
+
+    def __init__(self):
+        """
+        Initialize an unheld lock.
+        """
+        self._readers = 0
+        self._writer = False
+        self._waiters: deque[tuple[bool, asyncio.Future]] = deque()
+
+    @property
+    def idle(self) -> bool:
+        """Whether no one holds or waits for the lock."""
+        return not self._readers and not self._writer and not self._waiters
+
+    async def acquire(self, write: bool) -> None:
+        """
+        Acquire the lock.
+
+        Args:
+            write (bool): Whether to acquire it for writing instead of reading.
+        """
+        if not self._waiters and not self._writer and not (write and self._readers):
+            self._grant(write)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (write, waiter)
+        self._waiters.append(entry)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just before the cancellation arrived.
+                self.release(write)
+            else:
+                self._waiters.remove(entry)
+                self._wake()
+            raise
+
+    def release(self, write: bool) -> None:
+        """
+        Release the lock.
+
+        Args:
+            write (bool): Whether it was acquired for writing.
+        """
+        if write:
+            self._writer = False
+        else:
+            self._readers -= 1
+        self._wake()
+
+    def _grant(self, write: bool) -> None:
+        """Record a new holder."""
+        if write:
+            self._writer = True
+        else:
+            self._readers += 1
+
+    def _wake(self) -> None:
+        """Hand the lock to the waiters at the front of the queue that can hold it together."""
+        while self._waiters and not self._writer:
+            write, waiter = self._waiters[0]
+            if waiter.done():
+                self._waiters.popleft()
+                continue
+            if write and self._readers:
+                return
+            self._waiters.popleft()
+            self._grant(write)
+            waiter.set_result(None)
+            if write:
+                return
+
+
+class PathLocks:
+    """
+    Singleton of per-path reader/writer locks.
+
+    Tools reading a file hold its read lock, so reads of the same file run in parallel,
+    and tools changing a file hold its write lock, so a change waits for the reads in
+    progress and reads wait for the change. Locks exist only while held or waited for.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Create a new instance of the PathLocks class if it does not already exist.
+
+        Returns:
+            PathLocks: The singleton instance of the PathLocks class.
+        """
+        if not cls._instance:
+            cls._instance = super(PathLocks, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initialize the PathLocks instance.
+        """
+        if not hasattr(self, '_initialized'):
+            self._locks: dict[str, ReadWriteLock] = {}
+            self._initialized = True
+
+    @staticmethod
+    def make_key(path: Path) -> str:
+        """Return the key of a path, case-insensitive where the platform is."""
+        return os.path.normcase(str(path))
+
+    @asynccontextmanager
+    async def hold(self, reads: tuple[Path, ...] = (), writes: tuple[Path, ...] = ()):
+        """
+        Hold the locks of several paths, taken in a fixed order so callers cannot deadlock.
+
+        A path given for both reading and writing is locked for writing.
+
+        Args:
+            reads (tuple[Path, ...]): The resolved paths to lock for reading.
+            writes (tuple[Path, ...]): The resolved paths to lock for writing.
+        """
+        modes = {PathLocks.make_key(path): False for path in reads}
+        modes.update({PathLocks.make_key(path): True for path in writes})
+        held = []
+        try:
+            for key in sorted(modes):
+                lock = self._locks.setdefault(key, ReadWriteLock())
+                try:
+                    await lock.acquire(modes[key])
+                except BaseException:
+                    self._discard_idle(key)
+                    raise
+                held.append(key)
+            yield
+        finally:
+            for key in reversed(held):
+                self._locks[key].release(modes[key])
+                self._discard_idle(key)
+
+    def read(self, path: Path):
+        """
+        Hold the read lock of a path.
+
+        Args:
+            path (Path): The resolved path.
+        """
+        return self.hold(reads=(path,))
+
+    def write(self, path: Path):
+        """
+        Hold the write lock of a path.
+
+        Args:
+            path (Path): The resolved path.
+        """
+        return self.hold(writes=(path,))
+
+    def _discard_idle(self, key: str) -> None:
+        """Drop the lock of a key once no one holds or waits for it."""
+        lock = self._locks.get(key)
+        if lock is not None and lock.idle:
+            del self._locks[key]
+
+    def __len__(self) -> int:
+        """The number of paths locked or waited for."""
+        return len(self._locks)
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from file_system_windows_python.util.config import Config
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PolicyMatch:
+    """
+    Result of checking a path against the allow/deny policy.
+
+    Attributes:
+        allowed_root (Path | None): The allowed root containing the path, None if there is none.
+        denied_root (Path | None): The denied root containing the path, None if there is none.
+    """
+    allowed_root: Path | None = None
+    denied_root: Path | None = None
+
+    @property
+    def is_allowed(self) -> bool:
+        """True if the path is within an allowed root and not within a denied one."""
+        return self.allowed_root is not None and self.denied_root is None
+
+
+@dataclass
+class _PolicyNode:
+    """A single path component in the policy trie."""
+    children: dict[str, '_PolicyNode'] = field(default_factory=dict)
+    allowed_root: Path | None = None
+    denied_root: Path | None = None
+
+
+class PolicyIndex:
+    """
+    Allow/deny policy compiled into a component-wise prefix trie of canonical paths.
+
+    Roots are resolved once when the index is built. Checking a path then costs one walk
+    down the trie, proportional to the depth of the path.
+    """
+
+    def __init__(self, allow: list[str], deny: list[str]):
+        """
+        Compile the policy.
+
+        Args:
+            allow (list[str]): The allowed root directories.
+            deny (list[str]): The denied root directories.
+        """
+        self._root = _PolicyNode()
+        for path in allow:
+            self._insert(path).allowed_root = self._canonical_root(path)
+        for path in deny:
+            self._insert(path).denied_root = self._canonical_root(path)
+
+    @staticmethod
+    def _canonical_root(path_str: str) -> Path:
+        """
+        Resolve a configured root to its canonical form.
+
+        Roots that cannot be resolved right now (e.g. an unreachable network share) are kept
+        in their absolute form, so a deny entry is never dropped.
+
+        Args:
+            path_str (str): The configured root.
+
+        Returns:
+            Path: The canonical root.
+        """
+        try:
+            return Path(str(path_str)).resolve(strict=True)
+        except OSError as e:
+            logger.warning(f"Could not resolve policy root {path_str}: {str(e)}")
+            return Path(str(path_str)).absolute()
+
+    @staticmethod
+    def components(path: Path) -> tuple[str, ...]:
+        """
+        Split a path into the components used as trie keys.
+
+        Components are case-normalized, so matching is case-insensitive on Windows.
+
+        Args:
+            path (Path): An absolute, resolved path.
+
+        Returns:
+            tuple[str, ...]: The normalized components.
+        """
+        return tuple(os.path.normcase(part) for part in path.parts)
+
+    def _insert(self, path_str: str) -> _PolicyNode:
+        """
+        Add the node for a root, creating intermediate nodes as needed.
+
+        Args:
+            path_str (str): The configured root.
+
+        Returns:
+            _PolicyNode: The node of the root.
+        """
+        node = self._root
+        for part in self.components(self._canonical_root(path_str)):
+            node = node.children.setdefault(part, _PolicyNode())
+        return node
+
+    def check(self, path: Path) -> PolicyMatch:
+        """
+        Find the allowed and denied roots containing a path.
+
+        Args:
+            path (Path): An absolute, resolved path.
+
+        Returns:
+            PolicyMatch: The roots that contain the path.
+        """
+        match = PolicyMatch()
+        node = self._root
+        for part in self.components(path):
+            node = node.children.get(part)
+            if node is None:
+                break
+            if node.allowed_root is not None and match.allowed_root is None:
+                match.allowed_root = node.allowed_root
+            if node.denied_root is not None:
+                match.denied_root = node.denied_root
+                break
+        return match
+
+    def denied_below(self, path: Path) -> list[Path]:
+        """
+        Find the denied roots strictly inside a directory.
+
+        Args:
+            path (Path): An absolute, resolved directory.
+
+        Returns:
+            list[Path]: The denied roots below the directory, empty if there are none.
+        """
+        node = self._root
+        for part in self.components(path):
+            node = node.children.get(part)
+            if node is None:
+                return []
+
+        denied = []
+        stack = list(node.children.values())
+        while stack:
+            node = stack.pop()
+            if node.denied_root is not None:
+                denied.append(node.denied_root)
+            stack.extend(node.children.values())
+        return denied
+
+
+class PathPolicy:
+    """
+    Singleton holder of the compiled allow/deny policy.
+
+    The policy is compiled from the Config on first use. When a config file is configured,
+    `watch` recompiles it whenever the file changes and swaps it in atomically, so checks
+    that are already running keep using the index they started with.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Create a new instance of the PathPolicy class if it does not already exist.
+
+        Returns:
+            PathPolicy: The singleton instance of the PathPolicy class.
+        """
+        if not cls._instance:
+            cls._instance = super(PathPolicy, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initialize the PathPolicy instance.
+        """
+        if not hasattr(self, '_initialized'):
+            self._index: PolicyIndex | None = None
+            self._initialized = True
+
+    @property
+    def index(self) -> PolicyIndex:
+        """The current compiled policy, compiled from the Config on first access."""
+        if self._index is None:
+            self.compile()
+        return self._index
+
+    def compile(self) -> None:
+        """
+        Compile the policy from the current Config and swap it in.
+        """
+        config = Config()
+        self._index = PolicyIndex(config.allow, config.deny or [])
+        logger.debug(f"Compiled path policy with {len(config.allow)} allowed and "
+                     f"{len(config.deny or [])} denied roots")
+
+    def check(self, path: Path) -> PolicyMatch:
+        """
+        Check a path against the current policy.
+
+        Args:
+            path (Path): An absolute, resolved path.
+
+        Returns:
+            PolicyMatch: The roots that contain the path.
+        """
+        return self.index.check(path)
+
+    async def watch(self, interval: float = 2.0) -> None:
+        """
+        Reload the config file and recompile the policy whenever the file changes.
+
+        Runs until cancelled. A config file that fails to load is logged and the previous
+        policy stays in place.
+
+        Args:
+            interval (float): Seconds between checks of the config file.
+        """
+        config_file = Config().config_file
+        last_mtime = os.stat(config_file).st_mtime_ns
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                mtime = os.stat(config_file).st_mtime_ns
+                if mtime == last_mtime:
+                    continue
+                last_mtime = mtime
+                Config().load_file()
+                self.compile()
+                logger.info(f"Reloaded path policy from {config_file}")
+            except Exception as e:
+                logger.error(f"Failed to reload config file {config_file}: {str(e)}")
@@ -1,12 +1,17 @@
 import asyncio
+import codecs
 import logging
+import os
+import stat
 from pathlib import Path
 
-import aiofiles
-from magika import Magika
 from pathvalidate import validate_filepath, sanitize_filepath
 
-from file_system_windows_python.util.config import Config
+from file_system_windows_python.util.file_classifier import FileClassifier
+from file_system_windows_python.util.file_type_cache import FileTypeCache
+from file_system_windows_python.util.path_policy import PathPolicy
+from file_system_windows_python.util.tree_walker import IO_REPARSE_TAG_MOUNT_POINT
+from file_system_windows_python.util.validated_path import ValidatedPath
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -30,25 +35,27 @@ class PathValidator:
     Raises:
         PathValidationError: If the path fails any validation check
     """
+    SAMPLE_SIZE = 2 ** 16  # Bytes read from each end of a file to classify it
 
     @staticmethod
-    async def validate_file_path(path_str: str) -> None:
+    async def validate_file_path(path_str: str, open_file: bool = False) -> ValidatedPath:
         """
         Validate a file path.
 
         Args:
             path_str (str): The path to validate.
+            open_file (bool): Whether to keep a read-only descriptor of the file open in the result.
 
         Returns:
-            None
+            ValidatedPath: The validated file, close it when a descriptor was requested.
 
         Raises:
             PathValidationError: If the path fails any validation check.
         """
-        await PathValidator._validate_path(path_str, is_file=True)
+        return await PathValidator._validate_path(path_str, is_file=True, open_file=open_file)
 
     @staticmethod
-    async def validate_directory_path(path_str: str) -> None:
+    async def validate_directory_path(path_str: str) -> ValidatedPath:
         """
         Validate a directory path.
 
@@ -56,82 +63,223 @@ class PathValidator:
             path_str (str): The path to validate.
 
         Returns:
-            None
+            ValidatedPath: The validated directory.
 
         Raises:
             PathValidationError: If the path fails any validation check.
         """
-        await PathValidator._validate_path(path_str, is_file=False)
+        return await PathValidator._validate_path(path_str, is_file=False, open_file=False)
 
     @staticmethod
-    async def _validate_path(path_str: str, is_file: bool) -> None:
+    async def validate_source_path(path_str: str, allow_link: bool = False) -> ValidatedPath:
+        """
+        Validate an existing file or directory whose content is copied or moved, not read.
+
+        Only the allow/deny policy applies, the file type is not checked. The path is not
+        followed if it is a symbolic link or a junction: only its parent is resolved, so the
+        result names the link itself, with the stat of the link. Both the link and the path
+        it points to must be allowed.
+
+        Args:
+            path_str (str): The path to validate.
+            allow_link (bool): Whether the path may be a link, which is refused otherwise.
+
+        Returns:
+            ValidatedPath: The validated file, directory or link.
+
+        Raises:
+            PathValidationError: If the path does not exist, is neither a file nor a directory
+                nor an allowed link, or is not allowed.
+        """
+        name = Path(path_str).name
+        if name in ('', '.', '..'):
+            abs_path = await PathValidator.resolve_absolute_path(path_str)
+        else:
+            abs_path = (await PathValidator.resolve_absolute_path(str(Path(path_str).parent))) / name
+        try:
+            validated = ValidatedPath(abs_path, os.lstat(abs_path))
+        except OSError as e:
+            raise PathValidationError(f"Path validation failed: {str(e)}")
+
+        if PathValidator.is_link(validated.stat):
+            PathValidator.check_policy(abs_path)
+            try:
+                link_target = abs_path.resolve(strict=True)
+            except (OSError, RuntimeError) as e:
+                raise PathValidationError(f"Link {abs_path} does not point to an existing path: {str(e)}")
+            PathValidator.check_policy(link_target)
+            if not allow_link:
+                raise PathValidationError(f"Path {abs_path} is a link to {link_target}, pass that path instead!")
+            return validated
+
+        if not stat.S_ISREG(validated.stat.st_mode) and not stat.S_ISDIR(validated.stat.st_mode):
+            raise PathValidationError(f"Path {abs_path} is neither a file nor a directory!")
+        PathValidator.check_policy(abs_path)
+        return validated
+
+    @staticmethod
+    def is_link(path_stat: os.stat_result) -> bool:
+        """
+        Check whether the stat of a path, taken without following it, is that of a symbolic link or a junction.
+
+        Args:
+            path_stat (os.stat_result): The result of `os.lstat`.
+
+        Returns:
+            bool: True for symbolic links and NTFS junctions.
+        """
+        return (stat.S_ISLNK(path_stat.st_mode)
+                or getattr(path_stat, 'st_reparse_tag', 0) == IO_REPARSE_TAG_MOUNT_POINT)
+
+    @staticmethod
+    async def validate_target_path(path_str: str) -> Path:
+        """
+        Validate a path that is about to be created or replaced.
+
+        The path itself may not exist, but its parent must be an existing directory.
+
+        Args:
+            path_str (str): The path to validate.
+
+        Returns:
+            Path: The resolved path.
+
+        Raises:
+            PathValidationError: If the parent is not an existing directory or the path is not allowed.
+        """
+        abs_path = await PathValidator.resolve_absolute_path(path_str, strict=False)
+        if not abs_path.parent.is_dir():
+            raise PathValidationError(f"Parent of {abs_path} is not an existing directory!")
+        PathValidator.check_policy(abs_path)
+        return abs_path
+
+    @staticmethod
+    def check_policy(abs_path: Path) -> None:
+        """
+        Check a resolved path against the allowed and denied paths.
+
+        Args:
+            abs_path (Path): The resolved path.
+
+        Raises:
+            PathValidationError: If the path is not within an allowed path or is within a denied one.
+        """
+        match = PathPolicy().check(abs_path)
+        if match.allowed_root is None:
+            raise PathValidationError(f"Path {abs_path} is not within allowed paths!")
+
+        if match.denied_root is not None:
+            raise PathValidationError(f"Path {abs_path} is within denied path {match.denied_root}!")
+
+    @staticmethod
+    async def _validate_path(path_str: str, is_file: bool, open_file: bool) -> ValidatedPath:
         """
         Validate a path against security checks and allowed/denied paths.
 
+        The path is resolved and stat'ed exactly once. When `open_file` is set, the file is
+        opened only after its type and the policy were checked, and the descriptor must
+        refer to the same file that was stat'ed.
+
         Args:
             path_str (str): The path to validate.
             is_file (bool): Whether the path is a file.
+            open_file (bool): Whether to keep a read-only descriptor of the file open in the result.
 
         Returns:
-            None
+            ValidatedPath: The validated path.
 
         Raises:
             PathValidationError: If the path fails any validation check.
         """
+        validated = None
         try:
             logger.debug("Starting path validation")
-            logger.debug("Resolving allowed paths")
-            allowed_paths = [Path(str(p)).resolve(strict=True) for p in Config().allow]
-            logger.debug("Resolving denied paths")
-            denied_paths = [Path(str(p)).resolve(strict=True) for p in (Config().deny or [])]
-
             logger.debug("Resolving absolute path")
             abs_path = await PathValidator.resolve_absolute_path(path_str)
+            validated = ValidatedPath(abs_path, os.stat(abs_path))
 
-            if not abs_path.exists():
-                raise PathValidationError(f"Path {abs_path} does not exist!")
-
-            if is_file and not abs_path.is_file():
+            if is_file and not stat.S_ISREG(validated.stat.st_mode):
                 raise PathValidationError(f"Path {abs_path} is not a file!")
-            elif not is_file and not abs_path.is_dir():
+            elif not is_file and not stat.S_ISDIR(validated.stat.st_mode):
                 raise PathValidationError(f"Path {abs_path} is not a directory!")
 
-            if not any(PathValidator._is_subpath(abs_path, allowed) for allowed in allowed_paths):
-                raise PathValidationError(f"Path {abs_path} is not within allowed paths!")
+            PathValidator.check_policy(abs_path)
 
-            if denied_paths:
-                for denied in denied_paths:
-                    if PathValidator._is_subpath(abs_path, denied):
-                        raise PathValidationError(f"Path {abs_path} is within denied path {denied}!")
+            if open_file:
+                await PathValidator.open_validated(validated)
 
             if is_file:
                 logger.debug("Checking file type")
-                file_type = await PathValidator.get_file_type(abs_path)
+                file_type = await PathValidator.get_file_type(validated)
                 logger.debug(f"Pure file type: {file_type}")
                 allowed_file_types = (file_type.startswith(('text/', 'image/'))
                                       or file_type == 'application/pdf')
                 if not allowed_file_types:
                     raise PathValidationError(f"File type {file_type} is not allowed!")
+                validated.file_type = file_type
 
             logger.debug("Path validation successful!")
+            return validated
         except Exception as e:
+            if validated is not None:
+                validated.close()
             if isinstance(e, PathValidationError):
                 raise
             raise PathValidationError(f"Path validation failed: {str(e)}")
 
     @staticmethod
-    async def resolve_absolute_path(path_str: str) -> Path:
+    async def open_validated(validated: ValidatedPath) -> None:
+        """
+        Open a read-only descriptor of a file validated without one, kept in the result.
+
+        Args:
+            validated (ValidatedPath): The validated file, close it when done.
+
+        Raises:
+            PathValidationError: If the path was replaced by another file since it was validated.
+            OSError: If the file cannot be opened.
+        """
+        validated.fd = await asyncio.to_thread(PathValidator._open_same_file, validated)
+
+    @staticmethod
+    def _open_same_file(validated: ValidatedPath) -> int:
+        """
+        Open a validated file read-only, making sure it is still the file that was stat'ed.
+
+        The file is opened without blocking, so a path swapped for a FIFO in the meantime
+        cannot hang the thread. This is a blocking call, run it in a thread from async code.
+
+        Args:
+            validated (ValidatedPath): The validated file.
+
+        Returns:
+            int: The open descriptor.
+
+        Raises:
+            PathValidationError: If the path was replaced by another file since it was stat'ed.
+        """
+        flags = os.O_RDONLY | getattr(os, 'O_BINARY', 0) | getattr(os, 'O_NONBLOCK', 0)
+        fd = os.open(validated.path, flags)
+        opened = os.fstat(fd)
+        if (opened.st_dev, opened.st_ino) != (validated.stat.st_dev, validated.stat.st_ino):
+            os.close(fd)
+            raise PathValidationError(f"Path {validated.path} changed during validation!")
+        return fd
+
+    @staticmethod
+    async def resolve_absolute_path(path_str: str, strict: bool = True) -> Path:
         """
         Resolve and create an absolute path, including symlinks.
 
         Args:
             path_str: The path to resolve
+            strict: Whether the path must exist
 
         Returns:
             Path: The resolved absolute path
 
         Raises:
-            PathValidationError: If the path does not exist
+            PathValidationError: If the path does not exist and `strict` is set
         """
         try:
             logger.debug("Sanitizing path")
@@ -139,76 +287,110 @@ class PathValidator:
             validate_filepath(sanitized, platform='Windows')
 
             logger.debug("Resolving absolute path")
-            abs_path = Path(sanitized).resolve(strict=False)
-
-            if abs_path.is_symlink():
-                abs_path = abs_path.readlink().resolve(strict=True)
-            else:
-                abs_path = abs_path.resolve(strict=True)
-
-            if not abs_path.exists():
-                raise PathValidationError(f"Path {abs_path} does not exist!")
-
-            return abs_path
+            return Path(sanitized).resolve(strict=strict)
         except Exception as e:
             raise PathValidationError(f"Failed to resolve absolute path: {str(e)}")
 
     @staticmethod
-    def _is_subpath(path: Path, parent: Path) -> bool:
+    async def get_file_type(path: ValidatedPath) -> str:
         """
-        Check if a path is a subpath of another path.
+        Determine the MIME type of the file.
 
         Args:
-            path: The path to check
-            parent: The potential parent path
+            path (ValidatedPath): The file, as resolved and stat'ed during validation.
 
         Returns:
-            bool: True if path is a subpath of parent
+            str: The MIME type of the file.
+
+        Raises:
+            PathValidationError: If the file contains null bytes or if there is an error during path validation.
         """
-        try:
-            if path.is_symlink():
-                path = path.readlink()
-            if parent.is_symlink():
-                parent = parent.readlink()
+        if path.file_type is not None:
+            return path.file_type
 
-            path = Path(str(path)).resolve(strict=True)
-            parent = Path(str(parent)).resolve(strict=True)
+        mime_type = FileTypeCache().get(path.stat)
+        if mime_type is not None:
+            logger.debug(f"File type cache hit for {path.path}")
+            return mime_type
 
-            return str(path).startswith(str(parent))
-        except (ValueError, RuntimeError) as e:
-            raise PathValidationError(f"Failed to resolve path during comparison: {str(e)}")
+        mime_type = await PathValidator._detect_file_type(path)
+        FileTypeCache().put(path.path, path.stat, mime_type)
+        return mime_type
 
     @staticmethod
-    async def get_file_type(path: Path) -> str:
+    async def _detect_file_type(path: ValidatedPath) -> str:
         """
-        Determine the MIME type of the file.
+        Classify the file content, bypassing the file type cache.
+
+        Only a bounded head/tail sample of the file is read, see `_read_sample`.
 
         Args:
-            path (Path): The path to the file.
+            path (ValidatedPath): The file to classify.
 
         Returns:
             str: The MIME type of the file.
 
         Raises:
-            PathValidationError: If the file contains null bytes or if there is an error during path validation.
+            PathValidationError: If the file contains null bytes.
         """
-        magika = Magika()
         async with asyncio.timeout(10):
-            async with aiofiles.open(str(path), 'rb') as f:
-                content = await f.read()
-                result = magika.identify_bytes(content)
-                mime_type = result.output.mime_type
+            head, tail = await asyncio.to_thread(PathValidator._read_sample, path)
+            mime_type = await FileClassifier().identify_bytes(head + tail)
 
         if mime_type != 'application/pdf' and not mime_type.startswith('image/'):
-            try:
-                async with asyncio.timeout(10):
-                    async with aiofiles.open(str(path), 'r', encoding='utf-8') as f:
-                        content = await f.read()
-                        if '\x00' in content:
-                            raise PathValidationError(
-                                "File contains null bytes! Null bytes aren't currently supported.")
-                        return 'text/plain'
-            except UnicodeDecodeError:
-                pass
+            if PathValidator._is_utf8_sample(head, tail):
+                return 'text/plain'
 
         return mime_type
+
+    @staticmethod
+    def _read_sample(path: ValidatedPath) -> tuple[bytes, bytes]:
+        """
+        Read the head and the tail of a file.
+
+        Files up to twice `SAMPLE_SIZE` are read whole and returned as the head.
+
+        Args:
+            path (ValidatedPath): The file to sample.
+
+        Returns:
+            tuple[bytes, bytes]: The head and the tail of the file.
+        """
+        if path.size <= 2 * PathValidator.SAMPLE_SIZE:
+            return path.read(), b''
+        head = path.read(0, PathValidator.SAMPLE_SIZE)
+        tail = path.read(path.size - PathValidator.SAMPLE_SIZE, PathValidator.SAMPLE_SIZE)
+        return head, tail
+
+    @staticmethod
+    def _is_utf8_sample(head: bytes, tail: bytes) -> bool:
+        """
+        Check whether a head/tail sample decodes as UTF-8.
+
+        A character cut in half at the end of the head or at the start of the tail is tolerated.
+
+        Args:
+            head (bytes): The head of the file.
+            tail (bytes): The tail of the file, empty if the head holds the whole file.
+
+        Returns:
+            bool: True if the sample is UTF-8 text.
+
+        Raises:
+            PathValidationError: If the sample decodes but contains null bytes.
+        """
+        try:
+            if tail:
+                codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+                skip = 0
+                while skip < 3 and skip < len(tail) and tail[skip] & 0xC0 == 0x80:
+                    skip += 1
+                tail[skip:].decode('utf-8')
+            else:
+                head.decode('utf-8')
+        except UnicodeDecodeError:
+            return False
+
+        if b'\x00' in head or b'\x00' in tail:
+            raise PathValidationError("File contains null bytes! Null bytes aren't currently supported.")
+        return True
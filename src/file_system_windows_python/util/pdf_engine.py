@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import os
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator
+
+from file_system_windows_python.util import pdf_worker
+from file_system_windows_python.util.pdf_worker import RenderSettings
+from file_system_windows_python.util.render_cache import RenderCache
+from file_system_windows_python.util.worker_pool import WorkerPool
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RenderedPage:
+    """
+    A rendered PDF page.
+
+    Attributes:
+        number (int): The 0-based page number.
+        image (bytes | None): The page as WebP image, None when only text was requested.
+        text (str): The text of the page.
+    """
+    number: int
+    image: bytes | None
+    text: str
+
+
+class PdfEngine:
+    """
+    Singleton PDF renderer running on the shared process pool.
+
+    Each worker process opens the documents it renders itself, so pages are rendered in
+    parallel without sharing a document or blocking the event loop. At most
+    `MAX_CONCURRENT_PAGES` pages of a request are in flight at a time, and pages are
+    returned in the requested order as soon as they and all pages before them are done.
+    Pages found in the RenderCache are not rendered again.
+    """
+    _instance = None
+    MAX_CONCURRENT_PAGES = WorkerPool.MAX_WORKERS
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Create a new instance of the PdfEngine class if it does not already exist.
+
+        Returns:
+            PdfEngine: The singleton instance of the PdfEngine class.
+        """
+        if not cls._instance:
+            cls._instance = super(PdfEngine, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    async def page_count(self, path: Path, stat: os.stat_result) -> int:
+        """
+        Count the pages of a PDF file.
+
+        Args:
+            path (Path): The validated PDF file.
+            stat (os.stat_result): The stat result of the file at validation.
+
+        Returns:
+            int: The number of pages.
+        """
+        return await WorkerPool().submit(pdf_worker.page_count, str(path), pdf_worker.file_stamp(stat))
+
+    async def render(
+            self,
+            path: Path,
+            stat: os.stat_result,
+            pages: list[int],
+            text_only: bool = False,
+            settings: RenderSettings = RenderSettings()) -> AsyncIterator[RenderedPage]:
+        """
+        Render pages of a PDF file in parallel and yield them in order.
+
+        Pages that were submitted but not consumed are cancelled when the caller stops early.
+
+        Args:
+            path (Path): The validated PDF file.
+            stat (os.stat_result): The stat result of the file at validation.
+            pages (list[int]): The 0-based page numbers, in output order.
+            text_only (bool): Whether to skip rendering and only extract the text.
+            settings (RenderSettings): The render and encoder settings.
+
+        Yields:
+            RenderedPage: The rendered pages, in the order given.
+        """
+        remaining = iter(pages)
+        pending: deque[asyncio.Task] = deque()
+
+        def submit_next() -> None:
+            page_number = next(remaining, None)
+            if page_number is not None:
+                pending.append(asyncio.ensure_future(
+                    self._render_page(path, stat, page_number, text_only, settings)))
+
+        try:
+            for _ in range(self.MAX_CONCURRENT_PAGES):
+                submit_next()
+            while pending:
+                rendered = await pending.popleft()
+                submit_next()
+                yield rendered
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    async def _render_page(
+            path: Path,
+            stat: os.stat_result,
+            page_number: int,
+            text_only: bool,
+            settings: RenderSettings) -> RenderedPage:
+        """
+        Render one page on the process pool, going through the render cache if it is enabled.
+
+        Args:
+            path (Path): The validated PDF file.
+            stat (os.stat_result): The stat result of the file at validation.
+            page_number (int): The 0-based page number.
+            text_only (bool): Whether to skip rendering and only extract the text.
+            settings (RenderSettings): The render and encoder settings.
+
+        Returns:
+            RenderedPage: The rendered page.
+        """
+        cache = RenderCache()
+        key = None
+        if cache.enabled:
+            key = cache.make_key(stat, page_number, None if text_only else settings)
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                return RenderedPage(page_number, *cached)
+
+        image, text = await WorkerPool().submit(
+            pdf_worker.render_page, str(path), pdf_worker.file_stamp(stat), page_number, text_only, settings)
+        if key is not None:
+            await asyncio.to_thread(cache.put, key, image, text)
+        return RenderedPage(page_number, image, text)
@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import os
+import re
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from file_system_windows_python.util import pdf_worker
+from file_system_windows_python.util.cancellation import detached_context
+from file_system_windows_python.util.pdf_worker import WORD_PATTERN
+from file_system_windows_python.util.worker_pool import WorkerPool
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OutlineEntry:
+    """
+    An entry of the outline of a PDF.
+
+    Attributes:
+        level (int): The nesting level, 1 for top-level entries.
+        title (str): The title of the entry.
+        page (int): The 1-based page the entry points to, -1 if it has no target.
+    """
+    level: int
+    title: str
+    page: int
+
+
+@dataclass
+class PhraseMatch:
+    """
+    An occurrence of a phrase in a PDF.
+
+    Attributes:
+        page (int): The 1-based page of the occurrence.
+        snippet (str): The text around the occurrence on one line.
+    """
+    page: int
+    snippet: str
+
+
+class PdfIndex:
+    """
+    The outline, the text and a word index of one PDF document.
+
+    The text of all pages is kept as one string with the offset of each page, and the
+    word index maps each lowercase word to the ascending 0-based pages it occurs on.
+    """
+    SNIPPET_CONTEXT = 60  # Characters shown before and after a phrase match
+
+    def __init__(self, outline: list[OutlineEntry], texts: list[str], words: dict[str, array]):
+        """
+        Create the index of a document.
+
+        Args:
+            outline (list[OutlineEntry]): The outline of the document.
+            texts (list[str]): The text of each page.
+            words (dict[str, array]): The ascending pages of each lowercase word.
+        """
+        self.outline = outline
+        self.text = ''.join(texts)
+        self.page_offsets = array('Q', [0])
+        for text in texts:
+            self.page_offsets.append(self.page_offsets[-1] + len(text))
+        self.words = words
+
+    @property
+    def page_count(self) -> int:
+        """The number of pages of the document."""
+        return len(self.page_offsets) - 1
+
+    def page_text(self, page_number: int) -> str:
+        """
+        Return the text of a page.
+
+        Args:
+            page_number (int): The 0-based page number.
+
+        Returns:
+            str: The text of the page.
+        """
+        return self.text[self.page_offsets[page_number]:self.page_offsets[page_number + 1]]
+
+    def search(self, phrase: str) -> list[PhraseMatch]:
+        """
+        Find the occurrences of a phrase, ignoring case, punctuation and line breaks between its words.
+
+        Candidate pages come from the word index and are then checked for the whole phrase.
+        Phrases spanning a page break are not found.
+
+        Args:
+            phrase (str): The phrase to search for.
+
+        Returns:
+            list[PhraseMatch]: The occurrences in page order.
+
+        Raises:
+            ValueError: If the phrase contains no words.
+        """
+        words = WORD_PATTERN.findall(phrase.lower())
+        if not words:
+            raise ValueError("The query contains no words")
+
+        postings = sorted((self.words.get(word, array('I')) for word in set(words)), key=len)
+        candidates = set(postings[0])
+        for pages in postings[1:]:
+            candidates.intersection_update(pages)
+
+        pattern = re.compile(r'\W+'.join(re.escape(word) for word in words), re.IGNORECASE)
+        matches = []
+        for page_number in sorted(candidates):
+            text = self.page_text(page_number)
+            for match in pattern.finditer(text):
+                start = max(match.start() - self.SNIPPET_CONTEXT, 0)
+                snippet = ' '.join(text[start:match.end() + self.SNIPPET_CONTEXT].split())
+                matches.append(PhraseMatch(page_number + 1, snippet))
+        return matches
+
+
+class PdfIndexCache:
+    """
+    Singleton LRU cache of PDF indexes.
+
+    Indexes are keyed by file identity and modification stamp (device, inode, size, mtime),
+    so a changed document is indexed again. Pages are indexed in chunks in parallel on the
+    process pool, and concurrent requests for the same document share one build.
+    """
+    _instance = None
+    MAX_ENTRIES = 8
+    CHUNK_PAGES = 64
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Create a new instance of the PdfIndexCache class if it does not already exist.
+
+        Returns:
+            PdfIndexCache: The singleton instance of the PdfIndexCache class.
+        """
+        if not cls._instance:
+            cls._instance = super(PdfIndexCache, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initialize the PdfIndexCache instance.
+        """
+        if not hasattr(self, '_initialized'):
+            self._entries: OrderedDict[tuple, PdfIndex] = OrderedDict()
+            self._building: dict[tuple, asyncio.Future] = {}
+            self.hits = 0
+            self.misses = 0
+            self._initialized = True
+
+    async def get_or_build(self, path: Path, stat: os.stat_result) -> PdfIndex:
+        """
+        Return the index of a PDF file, building it on a miss.
+
+        Args:
+            path (Path): The validated PDF file.
+            stat (os.stat_result): The stat result of the file at validation.
+
+        Returns:
+            PdfIndex: The index of the document.
+        """
+        key = pdf_worker.file_stamp(stat)
+        index = self._entries.get(key)
+        if index is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return index
+        if key in self._building:
+            self.hits += 1
+            return await asyncio.shield(self._building[key])
+
+        self.misses += 1
+        # The build runs to completion and stores its index even if every caller runs out of time,
+        # so a retry finds the index instead of starting over.
+        build = asyncio.get_running_loop().create_task(self._build(path, key), context=detached_context())
+        self._building[key] = build
+        build.add_done_callback(lambda _: self._store(key, build))
+        return await asyncio.shield(build)
+
+    def _store(self, key: tuple, build: asyncio.Task) -> None:
+        """
+        Store the index of a finished build, evicting the least recently used one when full.
+
+        Args:
+            key (tuple): The key of the document.
+            build (asyncio.Task): The finished build.
+        """
+        self._building.pop(key, None)
+        if build.cancelled() or build.exception() is not None:
+            return
+        self._entries[key] = build.result()
+        if len(self._entries) > self.MAX_ENTRIES:
+            self._entries.popitem(last=False)
+
+    async def _build(self, path: Path, stamp: pdf_worker.FileStamp) -> PdfIndex:
+        """
+        Index a PDF file on the process pool.
+
+        Args:
+            path (Path): The validated PDF file.
+            stamp (pdf_worker.FileStamp): The stamp of the file at validation.
+
+        Returns:
+            PdfIndex: The index of the document.
+        """
+        pool = WorkerPool()
+        page_count = await pool.submit(pdf_worker.page_count, str(path), stamp)
+        outline = pool.submit(pdf_worker.document_outline, str(path), stamp)
+        chunks = [
+            pool.submit(pdf_worker.index_pages, str(path), stamp, start, min(start + self.CHUNK_PAGES, page_count))
+            for start in range(0, page_count, self.CHUNK_PAGES)
+        ]
+        results = await asyncio.gather(outline, *chunks)
+
+        def merge() -> PdfIndex:
+            texts = []
+            words: dict[str, array] = {}
+            for chunk_texts, chunk_words in results[1:]:
+                texts.extend(chunk_texts)
+                for word, pages in chunk_words.items():
+                    words.setdefault(word, array('I')).extend(pages)
+            return PdfIndex([OutlineEntry(*entry) for entry in results[0]], texts, words)
+
+        index = await asyncio.to_thread(merge)
+        logger.debug(f"Indexed {index.page_count} pages and {len(index.words)} words of {path}")
+        return index
@@ -0,0 +1,237 @@
+import io
+import os
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import fitz
+from PIL import Image
+
+from file_system_windows_python.util.cancellation import check_cancelled
+
+MAX_OPEN_DOCUMENTS = 4  # Documents each worker process keeps open
+ZOOM_LIMIT = 2 ** 10 + 2 ** 7  # Longest side of a rendered page in pixels
+WORD_PATTERN = re.compile(r'\w+')  # Words of the PDF index
+
+
+@dataclass(frozen=True)
+class RenderSettings:
+    """
+    The settings a page is rendered and encoded with.
+
+    Attributes:
+        zoom_limit (int): The longest side of a rendered page in pixels.
+        quality (int): The WebP quality.
+        method (int): The WebP encoder effort, 0 (fast) to 6 (small).
+    """
+    zoom_limit: int = ZOOM_LIMIT
+    quality: int = 80
+    method: int = 6
+
+    def cache_key(self) -> str:
+        """A string identifying the settings in cache keys."""
+        return f"webp-{self.zoom_limit}-{self.quality}-{self.method}"
+
+
+FileStamp = tuple[int, int, int, int]  # Device, inode, size and modification time of a file
+
+_documents: OrderedDict[tuple[str, FileStamp], fitz.Document] = OrderedDict()
+
+
+def file_stamp(stat: os.stat_result) -> FileStamp:
+    """
+    Return the identity and version of a file, which the workers check before they open it.
+
+    Args:
+        stat (os.stat_result): The stat result of the file at validation.
+
+    Returns:
+        FileStamp: The device, inode, size and modification time.
+    """
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _open_document(path: str, stamp: FileStamp) -> fitz.Document:
+    """
+    Return the open document of a file, opening it on first use in this process.
+
+    Documents are keyed by path and stamp, so a changed file is opened again. The file is
+    read into memory and checked against the stamp through the open handle, so it must be
+    the very file that was validated. No handle stays open, which on Windows would keep
+    other programs and the server itself from replacing, moving or deleting the file.
+
+    Args:
+        path (str): The path of the PDF file.
+        stamp (FileStamp): The stamp of the file at validation.
+
+    Returns:
+        fitz.Document: The open document.
+
+    Raises:
+        ValueError: If the path no longer refers to the validated file.
+    """
+    key = (path, stamp)
+    document = _documents.get(key)
+    if document is not None:
+        _documents.move_to_end(key)
+        return document
+
+    with open(path, 'rb') as f:
+        if file_stamp(os.fstat(f.fileno())) != stamp:
+            raise ValueError(f"File {path} changed since it was validated")
+        data = f.read()
+    document = fitz.open(stream=data, filetype='pdf')
+    _documents[key] = document
+    if len(_documents) > MAX_OPEN_DOCUMENTS:
+        _, evicted = _documents.popitem(last=False)
+        evicted.close()
+    return document
+
+
+def page_count(path: str, stamp: FileStamp) -> int:
+    """
+    Count the pages of a PDF file.
+
+    Args:
+        path (str): The path of the PDF file.
+        stamp (FileStamp): The stamp of the file at validation.
+
+    Returns:
+        int: The number of pages.
+    """
+    return len(_open_document(path, stamp))
+
+
+def calculate_zoom(width: float, height: float, limit: int = ZOOM_LIMIT) -> float:
+    """
+    Calculate the zoom level that renders the longest side of a page at the given size.
+
+    Args:
+        width (float): The width of the page in points.
+        height (float): The height of the page in points.
+        limit (int): The longest side of the rendered page in pixels.
+
+    Returns:
+        float: The zoom level.
+    """
+    return limit / max(width, height, 1)
+
+
+def _rasterize(page: fitz.Page, zoom: float) -> Image.Image:
+    """Render a page to a PIL image at the given zoom."""
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+    mode = "RGBA" if pix.alpha else "RGB"
+    return Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+
+
+def _encode(img: Image.Image, settings: RenderSettings) -> bytes:
+    """Encode an image as WebP with the given settings."""
+    output_buffer = io.BytesIO()
+    img.save(output_buffer, format="WEBP", quality=settings.quality, method=settings.method)
+    return output_buffer.getvalue()
+
+
+def render_page(
+        path: str,
+        stamp: FileStamp,
+        page_number: int,
+        text_only: bool,
+        settings: RenderSettings = RenderSettings()) -> tuple[bytes | None, str]:
+    """
+    Render one page of a PDF file to WebP and extract its text.
+
+    Runs inside a WorkerPool process, which keeps the document open for the next pages.
+
+    Args:
+        path (str): The path of the PDF file.
+        stamp (FileStamp): The stamp of the file at validation.
+        page_number (int): The 0-based page number.
+        text_only (bool): Whether to skip rendering and only extract the text.
+        settings (RenderSettings): The render and encoder settings.
+
+    Returns:
+        tuple[bytes | None, str]: The WebP image, None if text_only is set, and the text of the page.
+    """
+    page = _open_document(path, stamp)[page_number]
+    text = page.get_text()
+    if text_only:
+        return None, text
+
+    zoom = calculate_zoom(page.rect.width, page.rect.height, settings.zoom_limit)
+    return _encode(_rasterize(page, zoom), settings), text
+
+
+def sample_sizes(
+        path: str,
+        stamp: FileStamp,
+        page_number: int,
+        profiles: list[RenderSettings]) -> tuple[list[int], int]:
+    """
+    Measure the encoded size of a page under several render profiles.
+
+    The page is rasterized once for the largest profile and scaled down for the others,
+    which approximates rendering at their zoom closely enough for an estimate.
+
+    Args:
+        path (str): The path of the PDF file.
+        stamp (FileStamp): The stamp of the file at validation.
+        page_number (int): The 0-based page number of the sample page.
+        profiles (list[RenderSettings]): The profiles to measure.
+
+    Returns:
+        tuple[list[int], int]: The WebP size of the page for each profile and the UTF-8 size of its text.
+    """
+    page = _open_document(path, stamp)[page_number]
+    text_size = len(page.get_text().encode('utf-8'))
+    largest = max(profile.zoom_limit for profile in profiles)
+    img = _rasterize(page, calculate_zoom(page.rect.width, page.rect.height, largest))
+
+    sizes = []
+    for profile in profiles:
+        check_cancelled()
+        scale = profile.zoom_limit / largest
+        scaled = img
+        if scale < 1:
+            scaled = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))), Image.LANCZOS)
+        sizes.append(len(_encode(scaled, profile)))
+    return sizes, text_size
+
+
+def document_outline(path: str, stamp: FileStamp) -> list[tuple[int, str, int]]:
+    """
+    Read the outline (table of contents) of a PDF file.
+
+    Args:
+        path (str): The path of the PDF file.
+        stamp (FileStamp): The stamp of the file at validation.
+
+    Returns:
+        list[tuple[int, str, int]]: The level, title and 1-based page of each entry, page -1 if it has no target.
+    """
+    return [(level, title, page) for level, title, page in _open_document(path, stamp).get_toc(simple=True)]
+
+
+def index_pages(path: str, stamp: FileStamp, start: int, end: int) -> tuple[list[str], dict[str, list[int]]]:
+    """
+    Extract the text and the words of a range of pages.
+
+    Args:
+        path (str): The path of the PDF file.
+        stamp (FileStamp): The stamp of the file at validation.
+        start (int): The first 0-based page number.
+        end (int): The page number after the last page.
+
+    Returns:
+        tuple[list[str], dict[str, list[int]]]: The text of each page, and the pages each
+            lowercase word occurs on, in ascending order.
+    """
+    document = _open_document(path, stamp)
+    texts = []
+    words: dict[str, list[int]] = {}
+    for page_number in range(start, end):
+        check_cancelled()
+        text = document[page_number].get_text()
+        texts.append(text)
+        for word in set(WORD_PATTERN.findall(text.lower())):
+            words.setdefault(word, []).append(page_number)
+    return texts, words
@@ -0,0 +1,142 @@
+import asyncio
+import contextvars
+import logging
+import threading
+from typing import Awaitable, Callable
+
+from mcp.types import TextContent, ImageContent, EmbeddedResource
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+Notify = Callable[[float, float | None, str | None], Awaitable[None]]
+
+_current_progress: contextvars.ContextVar['Progress | None'] = contextvars.ContextVar('progress', default=None)
+
+
+class Progress:
+    """
+    Progress and partial results of one tool call.
+
+    Handlers report through `report_progress` and `report_partial`, from the event loop
+    or from threads. While the client waits for the call, each update is sent as an MCP
+    progress notification if the client asked for them; updates arriving while one is
+    being sent are merged into the next. Once the call continues as a job, notifications
+    stop and the state is read by polling instead.
+    """
+
+    def __init__(self, notify: Notify | None = None):
+        """
+        Create the progress of a call.
+
+        Args:
+            notify (Notify | None): Sends a progress notification to the client, None if it asked for none.
+        """
+        self.done = 0.0
+        self.total: float | None = None
+        self.message: str | None = None
+        self.partial: list[TextContent | ImageContent | EmbeddedResource] = []
+        self._notify = notify
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._sending: asyncio.Task | None = None
+        self._dirty = False
+
+    def update(self, done: float, total: float | None = None, message: str | None = None) -> None:
+        """
+        Record how far the call got.
+
+        Args:
+            done (float): The units of work done so far.
+            total (float | None): The units of work in total, None if unknown.
+            message (str | None): A short description of the current state.
+        """
+        if threading.get_ident() != self._loop_thread:
+            self._loop.call_soon_threadsafe(self.update, done, total, message)
+            return
+        self.done, self.total, self.message = done, total, message
+        if self._notify is None:
+            return
+        if self._sending is not None and not self._sending.done():
+            self._dirty = True
+        else:
+            self._sending = self._loop.create_task(self._send())
+
+    def add_partial(self, contents: list[TextContent | ImageContent | EmbeddedResource]) -> None:
+        """
+        Record results that are already final, before the call completes.
+
+        Args:
+            contents (list): The content objects.
+        """
+        if threading.get_ident() != self._loop_thread:
+            self._loop.call_soon_threadsafe(self.add_partial, contents)
+            return
+        self.partial.extend(contents)
+
+    def detach(self) -> None:
+        """Stop sending notifications, the request they belong to has been answered."""
+        self._notify = None
+
+    async def _send(self) -> None:
+        """Send the current state, and again as long as it changed while sending."""
+        while self._notify is not None:
+            self._dirty = False
+            try:
+                await self._notify(self.done, self.total, self.message)
+            except Exception as e:
+                logger.debug(f"Could not send progress notification: {str(e)}")
+                return
+            if not self._dirty:
+                return
+
+
+def bind(progress: Progress | None) -> contextvars.Token:
+    """
+    Make a progress the one of the current context, and of the tasks and threads started from it.
+
+    Args:
+        progress (Progress | None): The progress of the call.
+
+    Returns:
+        contextvars.Token: The token to pass to `unbind`.
+    """
+    return _current_progress.set(progress)
+
+
+def unbind(reset: contextvars.Token) -> None:
+    """
+    Restore the progress that was current before `bind`.
+
+    Args:
+        reset (contextvars.Token): The token returned by `bind`.
+    """
+    _current_progress.reset(reset)
+
+
+def report_progress(done: float, total: float | None = None, message: str | None = None) -> None:
+    """
+    Report how far the current tool call got, does nothing outside of tool calls.
+
+    Args:
+        done (float): The units of work done so far, e.g. pages or files.
+        total (float | None): The units of work in total, None if unknown.
+        message (str | None): A short description of the current state.
+    """
+    progress = _current_progress.get()
+    if progress is not None:
+        progress.update(done, total, message)
+
+
+def report_partial(contents: list[TextContent | ImageContent | EmbeddedResource]) -> None:
+    """
+    Report results of the current tool call that are final before it completes.
+
+    Jobs return them to polling clients, does nothing outside of tool calls.
+
+    Args:
+        contents (list): The content objects.
+    """
+    progress = _current_progress.get()
+    if progress is not None:
+        progress.add_partial(contents)
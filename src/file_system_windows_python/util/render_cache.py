@@ -0,0 +1,213 @@
+import hashlib
+import logging
+import os
+import struct
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from file_system_windows_python.util.config import Config
+from file_system_windows_python.util.pdf_worker import RenderSettings
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+_NO_IMAGE = 0xFFFFFFFF  # Image length stored for text-only entries
+
+
+@dataclass
+class RenderCacheStats:
+    """
+    Counters of the render cache.
+
+    Attributes:
+        entries (int): The number of cached pages.
+        size (int): The total size of the cached pages in bytes.
+        max_size (int): The size limit in bytes.
+        hits (int): The lookups served from the cache.
+        misses (int): The lookups that had to render.
+        evictions (int): The pages dropped to stay within the size limit.
+    """
+    entries: int
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class RenderCache:
+    """
+    Singleton disk cache of rendered PDF pages and their text.
+
+    The cache is optional and only enabled when `Config().cache_dir` is set. Each entry is
+    one file named after a hash of the file identity and modification stamp (device, inode,
+    size, mtime), the page number and the render settings, so a changed file or different
+    settings never hit a stale page. The least recently used entries are evicted when the
+    cache grows beyond `Config().cache_max_size`; recency survives restarts through the
+    modification times of the entry files.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Create a new instance of the RenderCache class if it does not already exist.
+
+        Returns:
+            RenderCache: The singleton instance of the RenderCache class.
+        """
+        if not cls._instance:
+            cls._instance = super(RenderCache, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initialize the RenderCache instance.
+
+        The cache directory is scanned on first use, see `_load`.
+        """
+        if not hasattr(self, '_initialized'):
+            self._entries: OrderedDict[str, int] = OrderedDict()
+            self._size = 0
+            self._loaded = False
+            self._lock = threading.Lock()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self._initialized = True
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a cache directory is configured."""
+        return Config().cache_dir is not None
+
+    @staticmethod
+    def make_key(stat: os.stat_result, page_number: int, settings: RenderSettings | None) -> str:
+        """
+        Build the cache key of a page.
+
+        Args:
+            stat (os.stat_result): The stat result of the PDF file.
+            page_number (int): The 0-based page number.
+            settings (RenderSettings | None): The render settings, None for text-only entries.
+
+        Returns:
+            str: The hex digest naming the entry.
+        """
+        variant = settings.cache_key() if settings is not None else 'text'
+        identity = f"{stat.st_dev}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}:{page_number}:{variant}"
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> tuple[bytes | None, str] | None:
+        """
+        Look up a cached page.
+
+        This is a blocking call, run it in a thread from async code.
+
+        Args:
+            key (str): The key built by `make_key`.
+
+        Returns:
+            tuple[bytes | None, str] | None: The image and text of the page, or None on a miss.
+        """
+        self._load()
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._size -= self._entries.pop(key, 0)
+                self.misses += 1
+            return None
+
+        (image_length,) = struct.unpack_from('>I', data)
+        if image_length == _NO_IMAGE:
+            image, text_start = None, 4
+        else:
+            image, text_start = data[4:4 + image_length], 4 + image_length
+        with self._lock:
+            self.hits += 1
+        return image, data[text_start:].decode('utf-8')
+
+    def put(self, key: str, image: bytes | None, text: str) -> None:
+        """
+        Store a rendered page, evicting the least recently used pages beyond the size limit.
+
+        This is a blocking call, run it in a thread from async code.
+
+        Args:
+            key (str): The key built by `make_key`.
+            image (bytes | None): The WebP image, None for text-only entries.
+            text (str): The text of the page.
+        """
+        self._load()
+        header = struct.pack('>I', _NO_IMAGE if image is None else len(image))
+        data = header + (image or b'') + text.encode('utf-8')
+        path = self._entry_path(key)
+        temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.error(f"Could not write render cache entry {path}: {str(e)}")
+            return
+
+        with self._lock:
+            self._size += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            evicted = []
+            while self._size > Config().cache_max_size and len(self._entries) > 1:
+                evicted_key, evicted_size = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self.evictions += 1
+                evicted.append(evicted_key)
+        for evicted_key in evicted:
+            try:
+                os.remove(self._entry_path(evicted_key))
+            except OSError:
+                pass
+
+    def stats(self) -> RenderCacheStats:
+        """
+        Return the counters of the cache.
+
+        Returns:
+            RenderCacheStats: The size and hit, miss and eviction counts.
+        """
+        self._load()
+        with self._lock:
+            return RenderCacheStats(
+                len(self._entries), self._size, Config().cache_max_size, self.hits, self.misses, self.evictions)
+
+    def _entry_path(self, key: str) -> Path:
+        """Return the file of an entry."""
+        return Path(Config().cache_dir) / f"{key}.page"
+
+    def _load(self) -> None:
+        """Create the cache directory and index its entries by recency, once."""
+        with self._lock:
+            if self._loaded:
+                return
+            cache_dir = Path(Config().cache_dir)
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            found = []
+            with os.scandir(cache_dir) as it:
+                for dir_entry in it:
+                    if dir_entry.name.endswith('.page'):
+                        stat = dir_entry.stat()
+                        found.append((stat.st_mtime_ns, dir_entry.name[:-len('.page')], stat.st_size))
+            for _, key, size in sorted(found):
+                self._entries[key] = size
+                self._size += size
+            self._loaded = True
+            logger.debug(f"Loaded render cache with {len(self._entries)} pages from {cache_dir}")
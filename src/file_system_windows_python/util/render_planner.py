@@ -0,0 +1,131 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from file_system_windows_python.util import pdf_worker
+from file_system_windows_python.util.pdf_worker import RenderSettings
+from file_system_windows_python.util.worker_pool import WorkerPool
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class RenderPlanner:
+    """
+    Singleton planner choosing the render settings of a PDF read from the response budget.
+
+    The profiles go from the sharpest to the smallest output. The fastest profile comes first
+    since a lower encoder effort only costs bytes, which matters only when the budget is tight.
+    A read renders one sample page under every profile, estimates the size of all selected
+    pages from it and picks the first profile whose estimate fits the remaining budget. When
+    none fits, the smallest profile is used and the read continues with a cursor.
+
+    Sample sizes are kept in memory per file and page, so continuing a read with a cursor
+    does not sample again.
+    """
+    _instance = None
+    PROFILES = [
+        RenderSettings(method=4),
+        RenderSettings(),
+        RenderSettings(zoom_limit=1024, quality=75),
+        RenderSettings(zoom_limit=896, quality=70),
+        RenderSettings(zoom_limit=768, quality=60),
+        RenderSettings(zoom_limit=640, quality=50),
+    ]
+    BASE64_RATIO = 4 / 3  # Images are measured by their base64 length
+    HEADROOM = 1.25  # Margin for pages denser than the sample
+    PAGE_OVERHEAD = 64  # Bytes of markup around the text of a page
+    MAX_SAMPLES = 64
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Create a new instance of the RenderPlanner class if it does not already exist.
+
+        Returns:
+            RenderPlanner: The singleton instance of the RenderPlanner class.
+        """
+        if not cls._instance:
+            cls._instance = super(RenderPlanner, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initialize the RenderPlanner instance.
+        """
+        if not hasattr(self, '_initialized'):
+            self._samples: OrderedDict[tuple, tuple[list[int], int]] = OrderedDict()
+            self._lock = threading.Lock()
+            self._initialized = True
+
+    async def plan(self, path: Path, stat: os.stat_result, pages: list[int], budget: int) -> RenderSettings:
+        """
+        Choose the render settings for the pages of a read.
+
+        A single page is rendered with the default settings without sampling, it either fits
+        or falls back to text.
+
+        Args:
+            path (Path): The validated PDF file.
+            stat (os.stat_result): The stat result of the file at validation.
+            pages (list[int]): The 0-based page numbers still to be returned.
+            budget (int): The remaining bytes of the response budget.
+
+        Returns:
+            RenderSettings: The settings to render the pages with.
+        """
+        if len(pages) <= 1:
+            return RenderSettings()
+
+        sample = pages[len(pages) // 2]
+        sizes, text_size = await self._sample(path, stat, sample)
+        settings = self.choose(sizes, text_size, len(pages), budget)
+        logger.debug(f"Planned {settings.cache_key()} for {len(pages)} pages of {path} from page {sample + 1}")
+        return settings
+
+    @staticmethod
+    def choose(sizes: list[int], text_size: int, page_count: int, budget: int) -> RenderSettings:
+        """
+        Pick the first profile whose estimated output for all pages fits the budget.
+
+        Args:
+            sizes (list[int]): The encoded size of the sample page for each profile.
+            text_size (int): The size of the text of the sample page.
+            page_count (int): The number of pages to render.
+            budget (int): The remaining bytes of the response budget.
+
+        Returns:
+            RenderSettings: The chosen profile, the smallest one if none fits.
+        """
+        for profile, size in zip(RenderPlanner.PROFILES, sizes):
+            per_page = size * RenderPlanner.BASE64_RATIO + text_size + RenderPlanner.PAGE_OVERHEAD
+            if per_page * RenderPlanner.HEADROOM * page_count <= budget:
+                return profile
+        return RenderPlanner.PROFILES[-1]
+
+    async def _sample(self, path: Path, stat: os.stat_result, page_number: int) -> tuple[list[int], int]:
+        """
+        Return the profile sizes of a sample page, measuring them on the process pool on a miss.
+
+        Args:
+            path (Path): The validated PDF file.
+            stat (os.stat_result): The stat result of the file at validation.
+            page_number (int): The 0-based page number of the sample page.
+
+        Returns:
+            tuple[list[int], int]: The encoded size for each profile and the size of the page text.
+        """
+        key = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, page_number)
+        with self._lock:
+            if key in self._samples:
+                self._samples.move_to_end(key)
+                return self._samples[key]
+
+        sample = await WorkerPool().submit(
+            pdf_worker.sample_sizes, str(path), pdf_worker.file_stamp(stat), page_number, self.PROFILES)
+        with self._lock:
+            self._samples[key] = sample
+            if len(self._samples) > self.MAX_SAMPLES:
+                self._samples.popitem(last=False)
+        return sample
@@ -0,0 +1,60 @@
+from mcp.types import TextContent, ImageContent
+
+from file_system_windows_python.util.result_guard import ResultGuard
+
+
+class ResponseBudget:
+    """
+    Byte budget of a single tool response.
+
+    The server creates one budget per call and passes it to the handler, which spends it
+    while producing output and stops before the response would exceed `ResultGuard.MAX_SIZE_BYTES`.
+    Sizes are measured the same way as by `ResultGuard`, so output that fits the budget
+    also passes the guard.
+    """
+
+    def __init__(self, limit: int = ResultGuard.MAX_SIZE_BYTES):
+        """
+        Create a budget.
+
+        Args:
+            limit (int): The maximum size of the response in bytes.
+        """
+        self.limit = limit
+        self.used = 0
+        self.exhausted = False
+
+    @property
+    def remaining(self) -> int:
+        """The number of bytes that can still be spent."""
+        return max(self.limit - self.used, 0)
+
+    def take(self, size: int) -> bool:
+        """
+        Spend bytes if they fit into the budget.
+
+        A request that does not fit marks the budget as exhausted.
+
+        Args:
+            size (int): The number of bytes.
+
+        Returns:
+            bool: True if the bytes were spent, False if they do not fit.
+        """
+        if self.used + size > self.limit:
+            self.exhausted = True
+            return False
+        self.used += size
+        return True
+
+    def add(self, content: TextContent | ImageContent) -> bool:
+        """
+        Spend the size of a content object if it fits into the budget.
+
+        Args:
+            content (TextContent | ImageContent): The content to add to the response.
+
+        Returns:
+            bool: True if the content fits and was accounted for.
+        """
+        return self.take(ResultGuard.measure_size([content]))
@@ -1,4 +1,3 @@
-import base64
 from typing import List
 
 from mcp.types import *
@@ -10,7 +9,10 @@ class ResultGuard:
     @staticmethod
     def measure_size(contents: List[TextContent | ImageContent]) -> int:
         """
-        Measure the total size of the given contents.
+        Measure the total size of the given contents as they are transmitted.
+
+        Images are counted by the length of their base64 data, which is ASCII, so no
+        image has to be decoded to be measured.
 
         Args:
             contents (List[TextContent | ImageContent]): List of text or image content.
@@ -23,7 +25,7 @@ class ResultGuard:
             if isinstance(content, TextContent):
                 content_bytes += len(content.text.encode('utf-8'))
             elif isinstance(content, ImageContent):
-                content_bytes += len(base64.b64decode(content.data))
+                content_bytes += len(content.data)
         return content_bytes
 
     def validate_result(
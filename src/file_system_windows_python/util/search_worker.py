@@ -0,0 +1,264 @@
+import mmap
+import os
+import re
+from array import array
+from dataclasses import dataclass, field
+
+from file_system_windows_python.util.cancellation import check_cancelled
+
+SNIFF_SIZE = 8192  # Bytes checked for null bytes to skip binary files
+MAX_LINE_LENGTH = 500  # Characters of a line included in a result
+TRIGRAM_CHUNK_SIZE = 2**20  # Bytes lowered and split into trigrams at a time
+
+
+@dataclass
+class LineMatch:
+    """
+    A matching line and its context.
+
+    Attributes:
+        line_number (int): The 1-based number of the matching line.
+        before (list[str]): The context lines before the match.
+        line (str): The matching line.
+        after (list[str]): The context lines after the match.
+    """
+    line_number: int
+    before: list[str]
+    line: str
+    after: list[str]
+
+
+@dataclass
+class FileMatches:
+    """
+    The matches found in one file.
+
+    Attributes:
+        path (str): The path of the file.
+        matches (list[LineMatch]): The matching lines, in file order.
+        truncated (bool): Whether the file has more matches than were collected.
+    """
+    path: str
+    matches: list[LineMatch] = field(default_factory=list)
+    truncated: bool = False
+
+
+def compile_pattern(pattern: str, literal: bool, ignore_case: bool) -> re.Pattern:
+    """
+    Compile a search pattern for matching against raw file bytes.
+
+    Args:
+        pattern (str): The regex or literal text.
+        literal (bool): Whether the pattern is literal text.
+        ignore_case (bool): Whether to match case-insensitively.
+
+    Returns:
+        re.Pattern: The compiled bytes pattern.
+
+    Raises:
+        re.error: If the regex is invalid.
+    """
+    source = re.escape(pattern) if literal else pattern
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    return re.compile(source.encode('utf-8'), flags)
+
+
+def is_binary(data) -> bool:
+    """
+    Cheap binary check on the start of a file.
+
+    Args:
+        data: A bytes-like object holding the file content.
+
+    Returns:
+        bool: True if a null byte occurs in the first `SNIFF_SIZE` bytes.
+    """
+    return b'\x00' in data[:SNIFF_SIZE]
+
+
+def _decode_line(data, start: int, end: int) -> str:
+    """Decode one line of a buffer, dropping the line break and capping its length."""
+    line = bytes(data[start:end]).rstrip(b'\r').decode('utf-8', errors='replace')
+    if len(line) > MAX_LINE_LENGTH:
+        line = line[:MAX_LINE_LENGTH] + '...'
+    return line
+
+
+def search_buffer(data, pattern: re.Pattern, context: int, max_matches: int) -> tuple[list[LineMatch], bool]:
+    """
+    Find the lines of a buffer that match a pattern.
+
+    Each line is reported at most once, however often it matches.
+
+    Args:
+        data: A bytes-like object, e.g. an mmap of the file.
+        pattern (re.Pattern): A pattern compiled by `compile_pattern`.
+        context (int): The number of context lines before and after each match.
+        max_matches (int): The maximum number of matching lines to collect.
+
+    Returns:
+        tuple[list[LineMatch], bool]: The matches and whether the buffer has more of them.
+    """
+    matches = []
+    position = 0
+    line_number = 1
+    counted_to = 0
+    size = len(data)
+    while position <= size:
+        match = pattern.search(data, position)
+        if match is None:
+            break
+        if len(matches) >= max_matches:
+            return matches, True
+
+        line_start = data.rfind(b'\n', 0, match.start()) + 1
+        line_end = data.find(b'\n', match.start())
+        if line_end == -1:
+            line_end = size
+        line_number += data[counted_to:line_start].count(b'\n')
+        counted_to = line_start
+
+        before = []
+        start = line_start
+        for _ in range(context):
+            if start == 0:
+                break
+            previous_start = data.rfind(b'\n', 0, start - 1) + 1
+            before.insert(0, _decode_line(data, previous_start, start - 1))
+            start = previous_start
+
+        after = []
+        end = line_end
+        for _ in range(context):
+            if end >= size:
+                break
+            next_end = data.find(b'\n', end + 1)
+            if next_end == -1:
+                next_end = size
+            after.append(_decode_line(data, end + 1, next_end))
+            end = next_end
+
+        matches.append(LineMatch(line_number, before, _decode_line(data, line_start, line_end), after))
+        position = line_end + 1
+    return matches, False
+
+
+def search_files(
+        paths: list[str],
+        pattern: str,
+        literal: bool,
+        ignore_case: bool,
+        context: int,
+        max_matches: int) -> list[FileMatches]:
+    """
+    Search several files, skipping binary and unreadable ones.
+
+    Runs inside a WorkerPool process, so this module only depends on the standard library.
+    Files are mapped into memory instead of being read. Files replaced by a symbolic link
+    since they were listed are skipped, links can point outside the allowed directories.
+
+    Args:
+        paths (list[str]): The files to search.
+        pattern (str): The regex or literal text.
+        literal (bool): Whether the pattern is literal text.
+        ignore_case (bool): Whether to match case-insensitively.
+        context (int): The number of context lines before and after each match.
+        max_matches (int): The maximum number of matching lines to collect per file.
+
+    Returns:
+        list[FileMatches]: The files with at least one match, in the order given.
+    """
+    compiled = compile_pattern(pattern, literal, ignore_case)
+    results = []
+    for path in paths:
+        check_cancelled()
+        try:
+            if os.path.islink(path):
+                continue
+            with open(path, 'rb') as f:
+                if is_binary(f.read(SNIFF_SIZE)):
+                    continue
+                f.seek(0)
+                try:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    continue  # Empty file
+                with data:
+                    matches, truncated = search_buffer(data, compiled, context, max_matches)
+        except OSError:
+            continue
+        if matches:
+            results.append(FileMatches(path, matches, truncated))
+    return results
+
+
+def encode_trigram(a: int, b: int, c: int) -> int:
+    """
+    Pack three lowered bytes into one trigram number.
+
+    Args:
+        a (int): The first byte.
+        b (int): The second byte.
+        c (int): The third byte.
+
+    Returns:
+        int: The trigram as a 24-bit number.
+    """
+    return a << 16 | b << 8 | c
+
+
+def file_trigrams(data) -> bytes:
+    """
+    Collect the distinct trigrams of a buffer, ignoring ASCII case.
+
+    Args:
+        data: A bytes-like object, e.g. an mmap of the file.
+
+    Returns:
+        bytes: The sorted trigrams as a packed unsigned int array.
+    """
+    trigrams = set()
+    for start in range(0, len(data), TRIGRAM_CHUNK_SIZE):
+        chunk = bytes(data[start:start + TRIGRAM_CHUNK_SIZE + 2]).lower()
+        trigrams.update(zip(chunk, chunk[1:], chunk[2:]))
+    return array('I', sorted(encode_trigram(*trigram) for trigram in trigrams)).tobytes()
+
+
+def index_files(paths: list[str], max_size: int) -> list[tuple[str, int, int, str, bytes | None]]:
+    """
+    Extract the trigrams of several files for the search index.
+
+    Runs inside a WorkerPool process. Files that cannot be read are left out, so they
+    drop out of the index, and so are symbolic links, which can point outside the
+    allowed directories.
+
+    Args:
+        paths (list[str]): The files to index.
+        max_size (int): The size above which a file is not split into trigrams.
+
+    Returns:
+        list[tuple[str, int, int, str, bytes | None]]: For each readable file its path, size,
+            modification time, kind ('text', 'binary' or 'large') and trigrams, None unless 'text'.
+    """
+    results = []
+    for path in paths:
+        try:
+            if os.path.islink(path):
+                continue
+            with open(path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                kind = 'text'
+                trigrams = None
+                if stat.st_size > max_size:
+                    kind = 'large'
+                elif is_binary(f.read(SNIFF_SIZE)):
+                    kind = 'binary'
+                elif stat.st_size == 0:
+                    trigrams = b''
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        trigrams = file_trigrams(data)
+        except (OSError, ValueError):
+            continue
+        results.append((path, stat.st_size, stat.st_mtime_ns, kind, trigrams))
+    return results
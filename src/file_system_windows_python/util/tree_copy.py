@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import os
+import stat
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from file_system_windows_python.util.cache_invalidation import invalidate_path
+from file_system_windows_python.util.file_copy import copy_file
+from file_system_windows_python.util.path_locks import PathLocks
+from file_system_windows_python.util.path_policy import PathPolicy
+from file_system_windows_python.util.progress import report_progress
+from file_system_windows_python.util.tree_walker import TreeWalker
+from file_system_windows_python.util.validated_path import ValidatedPath
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_COPIES = 8
+
+
+@dataclass
+class CopyReport:
+    """
+    The outcome of copying a directory tree.
+
+    Attributes:
+        files (int): The number of files copied.
+        directories (int): The number of directories created or merged into, including the top one.
+        size (int): The number of bytes copied.
+        pruned (int): The number of denied subdirectories of the source that were left out.
+        skipped (list[str]): Relative paths left out on purpose, with the reason.
+        failed (list[str]): Relative paths that could not be copied, with the error.
+    """
+    files: int = 0
+    directories: int = 0
+    size: int = 0
+    pruned: int = 0
+    skipped: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        """Whether everything below the source was copied."""
+        return not (self.pruned or self.skipped or self.failed)
+
+    def summary(self) -> str:
+        """Describe the outcome, listing what was skipped or failed."""
+        lines = [f"{self.files} files and {self.directories} directories, {self.size / 2**20:.1f} MiB"]
+        if self.pruned:
+            lines.append(f"Left out {self.pruned} denied directories")
+        if self.skipped:
+            lines.append("Skipped:\n" + "\n".join(self.skipped))
+        if self.failed:
+            lines.append("Failed:\n" + "\n".join(self.failed))
+        return "\n".join(lines)
+
+
+def check_destination(source: ValidatedPath, target: Path, overwrite: bool) -> None:
+    """
+    Check that a source can be copied or moved to a target.
+
+    Args:
+        source (ValidatedPath): The validated source file or directory.
+        target (Path): The validated target path.
+        overwrite (bool): Whether an existing target of the same kind may be replaced or merged into.
+
+    Raises:
+        ValueError: If the target is the source or below it, exists without `overwrite`,
+            or is of a different kind than the source.
+    """
+    source_is_dir = stat.S_ISDIR(source.stat.st_mode)
+    if os.path.normcase(str(target)) == os.path.normcase(str(source.path)):
+        raise ValueError(f"Source and destination are both {source.path}")
+    if source_is_dir and target.is_relative_to(source.path):
+        raise ValueError(f"Cannot copy or move {source.path} into itself")
+    if not os.path.lexists(target):
+        return
+    if not overwrite:
+        raise ValueError(f"Destination {target} exists, pass overwrite to replace it")
+    if source_is_dir != target.is_dir():
+        kind = 'a directory' if target.is_dir() else 'a file'
+        raise ValueError(f"Destination {target} exists and is {kind}, unlike the source")
+
+
+def _copy_entry(source: Path, target: Path) -> int | None:
+    """
+    Copy a file found in a tree, leaving out symbolic links.
+
+    Links are already left out by the walk, this catches files replaced by one since.
+    This is a blocking call, run it in a thread from async code.
+
+    Args:
+        source (Path): The file below the source directory.
+        target (Path): The file to create or replace.
+
+    Returns:
+        int | None: The number of bytes copied, None for a symbolic link.
+    """
+    if os.path.islink(source):
+        return None
+    return copy_file(source, target)
+
+
+async def copy_tree(source: Path, target: Path) -> CopyReport:
+    """
+    Copy a directory tree, with at most `MAX_CONCURRENT_COPIES` files copied at a time.
+
+    The tree is walked in pre-order, so each directory is created before the files in it
+    are scheduled. Denied subdirectories of the source are left out, as are symbolic
+    links and junctions, which could point outside the allowed directories, and entries
+    whose target would be denied. Existing files in the target are replaced.
+
+    Args:
+        source (Path): The validated source directory.
+        target (Path): The validated target directory, created if it does not exist.
+
+    Returns:
+        CopyReport: What was copied, skipped and failed.
+    """
+    report = CopyReport()
+    locks = PathLocks()
+    policy = PathPolicy()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_COPIES)
+    copies: set[asyncio.Task] = set()
+
+    async def copy_one(entry_source: Path, entry_target: Path, relative_path: str) -> None:
+        try:
+            async with locks.hold(reads=(entry_source,), writes=(entry_target,)):
+                size = await asyncio.to_thread(_copy_entry, entry_source, entry_target)
+                invalidate_path(entry_target)
+            if size is None:
+                report.skipped.append(f"{relative_path}: symbolic link")
+            else:
+                report.files += 1
+                report.size += size
+                report_progress(report.files, message=f"{report.size / 2**20:.1f} MiB copied")
+        except OSError as e:
+            report.failed.append(f"{relative_path}: {str(e)}")
+        finally:
+            semaphore.release()
+
+    await asyncio.to_thread(os.makedirs, target, exist_ok=True)
+    invalidate_path(target)
+    report.directories += 1
+    walker = TreeWalker(source)
+    try:
+        async for entry in walker.walk():
+            entry_target = target.joinpath(*entry.parts)
+            if not policy.check(entry_target).is_allowed:
+                report.skipped.append(f"{entry.relative_path}: destination is denied")
+            elif entry.is_link:
+                report.skipped.append(f"{entry.relative_path}: symbolic link")
+            elif entry.is_dir:
+                try:
+                    await asyncio.to_thread(os.makedirs, entry_target, exist_ok=True)
+                    report.directories += 1
+                except OSError as e:
+                    report.failed.append(f"{entry.relative_path}: {str(e)}")
+            else:
+                await semaphore.acquire()
+                copy = asyncio.ensure_future(copy_one(entry.path, entry_target, entry.relative_path))
+                copies.add(copy)
+                copy.add_done_callback(copies.discard)
+        await asyncio.gather(*copies)
+    finally:
+        for copy in copies:
+            copy.cancel()
+
+    report.pruned = walker.directories_pruned
+    logger.debug(f"Copied {report.files} files from {source} to {target}")
+    return report
@@ -0,0 +1,277 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator
+
+from file_system_windows_python.util.path_policy import PathPolicy
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+IO_REPARSE_TAG_MOUNT_POINT = 0xA0000003  # The reparse tag of NTFS junctions
+
+
+@dataclass(frozen=True)
+class WalkEntry:
+    """
+    A single entry found while walking a tree.
+
+    Attributes:
+        path (Path): The absolute path of the entry.
+        parts (tuple[str, ...]): The path components relative to the walk root.
+        is_dir (bool): Whether the entry is a directory, False for links to directories.
+        size (int | None): The size in bytes, None for directories and when not collected.
+        mtime_ns (int | None): The modification time, None when not collected.
+        is_link (bool): Whether the entry is a symbolic link or an NTFS junction.
+    """
+    path: Path
+    parts: tuple[str, ...]
+    is_dir: bool
+    size: int | None = None
+    mtime_ns: int | None = None
+    is_link: bool = False
+
+    @property
+    def depth(self) -> int:
+        """The depth of the entry below the walk root, 1 for direct children."""
+        return len(self.parts)
+
+    @property
+    def relative_path(self) -> str:
+        """The path relative to the walk root, with forward slashes."""
+        return '/'.join(self.parts)
+
+
+@dataclass
+class _Frame:
+    """A directory on the walk stack and how far it has been consumed."""
+    entries: list[WalkEntry]
+    index: int = 0
+    prefetch_index: int = 0
+    subdirs: list[tuple[int, WalkEntry]] = field(default_factory=list)
+
+
+def component_key(name: str) -> tuple[str, str]:
+    """
+    Return the sort key of a path component, case-insensitive with a stable tie-break.
+
+    Args:
+        name (str): The path component.
+
+    Returns:
+        tuple[str, str]: The sort key.
+    """
+    return name.lower(), name
+
+
+def is_link(dir_entry: os.DirEntry) -> bool:
+    """
+    Check whether a directory entry points elsewhere, as a symbolic link or an NTFS junction.
+
+    Junctions are not symbolic links to `DirEntry.is_symlink`. Before Python 3.12, which
+    added `DirEntry.is_junction`, their reparse tag is checked, which `scandir` already
+    fetched on Windows.
+
+    Args:
+        dir_entry (os.DirEntry): The entry.
+
+    Returns:
+        bool: True for links and junctions, and for entries that cannot be checked.
+    """
+    try:
+        if dir_entry.is_symlink():
+            return True
+        if os.name != 'nt':
+            return False
+        if hasattr(dir_entry, 'is_junction'):
+            return dir_entry.is_junction()
+        return dir_entry.stat(follow_symlinks=False).st_reparse_tag == IO_REPARSE_TAG_MOUNT_POINT
+    except OSError:
+        return True
+
+
+class TreeWalker:
+    """
+    Walk a directory tree with a bounded pool of concurrent scandir workers.
+
+    Entries are yielded in a deterministic pre-order (children sorted by name), which lets
+    a walk be resumed after any entry. Directories ahead of the walk are scanned in
+    parallel, with at most `workers` scans running and `prefetch` listings buffered.
+    Directories inside a denied root are pruned as a whole and never scanned. Symbolic
+    links and junctions are yielded as links and never followed, since they can point
+    outside the allowed directories or into denied ones.
+    """
+
+    def __init__(
+            self,
+            root: Path,
+            max_depth: int | None = None,
+            with_stat: bool = False,
+            start_after: tuple[str, ...] | None = None,
+            workers: int = 8,
+            prefetch: int = 64):
+        """
+        Set up a walk.
+
+        Args:
+            root (Path): The resolved directory to walk.
+            max_depth (int | None): The deepest level to yield, 1 for direct children only. None for no limit.
+            with_stat (bool): Whether to collect sizes and modification times.
+            start_after (tuple[str, ...] | None): Relative parts of the entry to resume after.
+            workers (int): The maximum number of directories scanned at the same time.
+            prefetch (int): The maximum number of directory listings scanned ahead of the walk.
+        """
+        self.root = root
+        self.max_depth = max_depth
+        self.with_stat = with_stat
+        self.start_after = start_after
+        self.prefetch = prefetch
+        self._semaphore = asyncio.Semaphore(workers)
+        self._policy = PathPolicy().index
+        self._scans: dict[tuple[str, ...], asyncio.Task] = {}
+        self.directories_scanned = 0
+        self.directories_pruned = 0
+
+    async def walk(self) -> AsyncIterator[WalkEntry]:
+        """
+        Yield the entries below the root in pre-order.
+
+        Yields:
+            WalkEntry: The entries, each directory directly followed by its subtree.
+        """
+        stack = [_Frame(*self._frame_entries(await self._scan(self.root, ())))]
+        skip_key = tuple(component_key(part) for part in self.start_after) if self.start_after else None
+        try:
+            while stack:
+                frame = stack[-1]
+                if frame.index >= len(frame.entries):
+                    stack.pop()
+                    continue
+                entry = frame.entries[frame.index]
+                frame.index += 1
+
+                if skip_key is not None:
+                    entry_key = tuple(component_key(part) for part in entry.parts)
+                    if entry_key == skip_key[:len(entry_key)]:
+                        # The resume entry or one of its ancestors, yielded before but its subtree may not be.
+                        if len(entry_key) == len(skip_key):
+                            skip_key = None
+                    elif entry_key < skip_key:
+                        continue
+                    else:
+                        skip_key = None
+                        yield entry
+                else:
+                    yield entry
+
+                if entry.is_dir and self._should_descend(entry):
+                    task = self._scans.pop(entry.parts, None)
+                    listing = await (task if task is not None else self._scan(entry.path, entry.parts))
+                    stack.append(_Frame(*self._frame_entries(listing)))
+                self._schedule_prefetch(stack)
+        finally:
+            for task in self._scans.values():
+                task.cancel()
+            self._scans.clear()
+
+    def _should_descend(self, entry: WalkEntry) -> bool:
+        """
+        Check whether the children of a directory entry are part of the walk.
+
+        Args:
+            entry (WalkEntry): A directory entry.
+
+        Returns:
+            bool: True if the directory is above the depth limit.
+        """
+        return self.max_depth is None or entry.depth < self.max_depth
+
+    @staticmethod
+    def _frame_entries(listing: list[WalkEntry]) -> tuple[list[WalkEntry], int, int, list[tuple[int, WalkEntry]]]:
+        """
+        Build the fields of a stack frame from a sorted listing.
+
+        Args:
+            listing (list[WalkEntry]): The sorted entries of a directory.
+
+        Returns:
+            tuple: The arguments of `_Frame`.
+        """
+        return listing, 0, 0, [(index, entry) for index, entry in enumerate(listing) if entry.is_dir]
+
+    def _schedule_prefetch(self, stack: list[_Frame]) -> None:
+        """
+        Start scans for the directories the walk will reach next, deepest frame first.
+
+        Directories the walk already moved past, e.g. while skipping to a resume point, are not scanned.
+
+        Args:
+            stack (list[_Frame]): The current walk stack.
+        """
+        for frame in reversed(stack):
+            while frame.prefetch_index < len(frame.subdirs):
+                if len(self._scans) >= self.prefetch:
+                    return
+                index, entry = frame.subdirs[frame.prefetch_index]
+                frame.prefetch_index += 1
+                if index < frame.index:
+                    continue
+                if self._should_descend(entry) and entry.parts not in self._scans:
+                    self._scans[entry.parts] = asyncio.ensure_future(self._scan(entry.path, entry.parts))
+
+    async def _scan(self, path: Path, parts: tuple[str, ...]) -> list[WalkEntry]:
+        """
+        Scan one directory in a worker thread.
+
+        Args:
+            path (Path): The directory to scan.
+            parts (tuple[str, ...]): Its components relative to the walk root.
+
+        Returns:
+            list[WalkEntry]: The allowed entries of the directory, sorted by name.
+        """
+        async with self._semaphore:
+            return await asyncio.to_thread(self._scan_sync, path, parts)
+
+    def _scan_sync(self, path: Path, parts: tuple[str, ...]) -> list[WalkEntry]:
+        """
+        Scan one directory, dropping subdirectories that fall inside a denied root.
+
+        Args:
+            path (Path): The directory to scan.
+            parts (tuple[str, ...]): Its components relative to the walk root.
+
+        Returns:
+            list[WalkEntry]: The allowed entries of the directory, sorted by name.
+        """
+        entries = []
+        try:
+            with os.scandir(path) as it:
+                for dir_entry in it:
+                    link = is_link(dir_entry)
+                    try:
+                        is_dir = not link and dir_entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    entry_path = path / dir_entry.name
+                    if is_dir and not self._policy.check(entry_path).is_allowed:
+                        self.directories_pruned += 1
+                        continue
+
+                    size = mtime_ns = None
+                    if self.with_stat:
+                        try:
+                            entry_stat = dir_entry.stat(follow_symlinks=False)
+                            size = None if is_dir else entry_stat.st_size
+                            mtime_ns = entry_stat.st_mtime_ns
+                        except OSError:
+                            pass
+                    entries.append(WalkEntry(entry_path, parts + (dir_entry.name,), is_dir, size, mtime_ns, link))
+        except OSError as e:
+            logger.debug(f"Could not scan {path}: {str(e)}")
+
+        self.directories_scanned += 1
+        entries.sort(key=lambda entry: component_key(entry.parts[-1]))
+        return entries
@@ -0,0 +1,493 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+
+from file_system_windows_python.util.config import Config
+from file_system_windows_python.util.search_worker import encode_trigram, index_files
+from file_system_windows_python.util.tree_walker import TreeWalker, component_key
+from file_system_windows_python.util.worker_pool import WorkerPool
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+try:
+    # Internal modules of the re package, which can change or move between Python versions.
+    from re import _constants as sre_constants
+    from re import _parser as sre_parser
+except ImportError:
+    sre_constants = sre_parser = None
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    trigrams BLOB
+);
+CREATE TABLE IF NOT EXISTS postings (
+    trigram INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    PRIMARY KEY (trigram, file_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+
+def query_trigrams(pattern: str, literal: bool) -> set[int] | None:
+    """
+    Extract the trigrams every match of a search pattern must contain.
+
+    Only literal runs that are always part of a match are used: runs inside alternations,
+    optional repeats and character classes are ignored. The trigrams are lowered like the
+    indexed ones, so the result serves case-sensitive and case-insensitive searches alike.
+    Regexes are analyzed with the internal parser of the re package; where it is missing
+    or changed, no trigrams are extracted and every file is searched.
+
+    Args:
+        pattern (str): The regex or literal text.
+        literal (bool): Whether the pattern is literal text.
+
+    Returns:
+        set[int] | None: The required trigrams, None if the pattern has none.
+
+    Raises:
+        re.error: If the regex is invalid.
+    """
+    if literal:
+        runs = [pattern.encode('utf-8')]
+    elif sre_parser is None:
+        return None
+    else:
+        runs = []
+        try:
+            _required_runs(sre_parser.parse(pattern.encode('utf-8')), runs)
+        except re.error:
+            raise
+        except Exception as e:
+            logger.debug(f"Could not extract trigrams from {pattern!r}, searching all files: {str(e)}")
+            return None
+
+    trigrams = set()
+    for run in runs:
+        run = run.lower()
+        trigrams.update(encode_trigram(*run[i:i + 3]) for i in range(len(run) - 2))
+    return trigrams or None
+
+
+def _required_runs(items, runs: list[bytes]) -> None:
+    """Collect the literal byte runs of a parsed regex sequence that every match contains."""
+    run = bytearray()
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            run.append(av)
+            continue
+        if op is sre_constants.AT:
+            continue  # Anchors match no characters, so the run goes on
+        runs.append(bytes(run))
+        run = bytearray()
+        if op is sre_constants.SUBPATTERN:
+            _required_runs(av[-1], runs)
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] >= 1:
+            _required_runs(av[2], runs)
+    runs.append(bytes(run))
+
+
+@dataclass
+class IndexStatus:
+    """
+    A snapshot of the state of one trigram index.
+
+    Attributes:
+        root (Path): The indexed directory.
+        state (str): 'empty' before the first build, 'building' or 'ready'.
+        files (int): The number of indexed files.
+        size (int): The size of the index database in bytes.
+        build_time (float | None): The duration of the last build or refresh in seconds.
+        refreshed_at (float | None): The time the last refresh started, None before the first one.
+        pending (int): The number of written files waiting to be reindexed.
+    """
+    root: Path
+    state: str
+    files: int
+    size: int
+    build_time: float | None
+    refreshed_at: float | None
+    pending: int
+
+    @property
+    def staleness(self) -> float | None:
+        """The seconds since the last refresh started, None before the first one."""
+        return None if self.refreshed_at is None else time.time() - self.refreshed_at
+
+
+class TrigramIndex:
+    """
+    An on-disk trigram index of the text files below one allowed directory.
+
+    The index maps every lowered trigram to the files that contain it and is stored in a
+    SQLite database. `refresh` walks the directory and only reindexes files whose size or
+    modification time changed. Candidate lookups intersect the posting lists of the
+    trigrams a pattern requires; the candidates still have to be verified with the regex.
+    """
+    MAX_FILE_SIZE = 64 * 2**20  # Larger files are not split into trigrams and always searched
+    BATCH_SIZE = 64
+
+    def __init__(self, root: Path, db_path: Path):
+        """
+        Open or create the index of a directory.
+
+        Args:
+            root (Path): The resolved directory to index.
+            db_path (Path): The SQLite database file.
+        """
+        self.root = root
+        self.db_path = db_path
+        self.state = 'empty'
+        self.build_time: float | None = None
+        self.refreshed_at: float | None = None
+        self.pending: set[Path] = set()
+        self._updating: set[Path] = set()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        row = self._connection.execute("SELECT value FROM meta WHERE key = 'refreshed_at'").fetchone()
+        if row is not None:
+            # An index left by a previous run answers queries until it is refreshed.
+            self.refreshed_at = row[0]
+            self.state = 'ready'
+
+    async def refresh(self) -> None:
+        """
+        Bring the index up to date with the directory.
+
+        New and changed files are reindexed on the worker pool, files that disappeared,
+        became denied or were replaced by a link are dropped. Links are never indexed.
+        """
+        started = time.time()
+        if self.state == 'empty':
+            self.state = 'building'
+
+        walker = TreeWalker(self.root, with_stat=True)
+        current = {}
+        async for entry in walker.walk():
+            if not entry.is_dir and not entry.is_link:
+                current[entry.relative_path] = (entry.size, entry.mtime_ns)
+
+        stored = await asyncio.to_thread(self._stored_files)
+        removed = [path for path in stored if path not in current]
+        changed = [path for path, stamp in current.items() if stored.get(path) != stamp]
+        await asyncio.to_thread(self._remove, removed)
+        await self._index([self.root / path for path in changed])
+
+        self.refreshed_at = started
+        self.build_time = time.time() - started
+        await asyncio.to_thread(self._set_meta, 'refreshed_at', started)
+        self.state = 'ready'
+        logger.info(f"Refreshed search index of {self.root} in {self.build_time:.1f} s "
+                    f"({len(changed)} files indexed, {len(removed)} removed)")
+
+    async def update(self, paths: list[Path]) -> None:
+        """
+        Reindex files that the server itself has written, and drop those it moved away.
+
+        Args:
+            paths (list[Path]): Resolved files below the root.
+        """
+        self.pending.difference_update(paths)
+        self._updating.update(paths)
+        try:
+            gone = await asyncio.to_thread(lambda: [path for path in paths if path.is_symlink() or not path.exists()])
+            if gone:
+                await asyncio.to_thread(self._remove, [path.relative_to(self.root).as_posix() for path in gone])
+            await self._index(paths)
+        finally:
+            self._updating.difference_update(paths)
+
+    async def _index(self, paths: list[Path]) -> None:
+        """
+        Extract the trigrams of files on the worker pool and store them, a batch at a time.
+
+        Args:
+            paths (list[Path]): Resolved files below the root.
+        """
+        pool = WorkerPool()
+        pending: list[asyncio.Future] = []
+        try:
+            for start in range(0, len(paths), TrigramIndex.BATCH_SIZE):
+                batch = [str(path) for path in paths[start:start + TrigramIndex.BATCH_SIZE]]
+                pending.append(pool.submit(index_files, batch, TrigramIndex.MAX_FILE_SIZE))
+                if len(pending) >= pool.workers * 2:
+                    await asyncio.to_thread(self._store, await pending.pop(0))
+            while pending:
+                await asyncio.to_thread(self._store, await pending.pop(0))
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _stored_files(self) -> dict[str, tuple[int, int]]:
+        """Return the size and modification time of every indexed file by relative path."""
+        with self._lock:
+            rows = self._connection.execute("SELECT path, size, mtime_ns FROM files").fetchall()
+        return {path: (size, mtime_ns) for path, size, mtime_ns in rows}
+
+    def _store(self, results: list[tuple[str, int, int, str, bytes | None]]) -> None:
+        """
+        Write the trigrams of a batch of files, only touching the postings that changed.
+
+        Args:
+            results (list): The results of `index_files`.
+        """
+        with self._lock, self._connection:
+            for path, size, mtime_ns, kind, trigrams in results:
+                relative_path = Path(path).relative_to(self.root).as_posix()
+                row = self._connection.execute(
+                    "SELECT id, trigrams FROM files WHERE path = ?", (relative_path,)).fetchone()
+                old = set(TrigramIndex._unpack(row[1])) if row is not None else set()
+                new = set(TrigramIndex._unpack(trigrams))
+                if row is None:
+                    file_id = self._connection.execute(
+                        "INSERT INTO files (path, size, mtime_ns, kind, trigrams) VALUES (?, ?, ?, ?, ?)",
+                        (relative_path, size, mtime_ns, kind, trigrams)).lastrowid
+                else:
+                    file_id = row[0]
+                    self._connection.execute(
+                        "UPDATE files SET size = ?, mtime_ns = ?, kind = ?, trigrams = ? WHERE id = ?",
+                        (size, mtime_ns, kind, trigrams, file_id))
+                self._connection.executemany(
+                    "DELETE FROM postings WHERE trigram = ? AND file_id = ?",
+                    ((trigram, file_id) for trigram in old - new))
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO postings (trigram, file_id) VALUES (?, ?)",
+                    ((trigram, file_id) for trigram in new - old))
+
+    def _remove(self, paths: list[str]) -> None:
+        """
+        Drop files from the index, and every file below those that were directories.
+
+        Args:
+            paths (list[str]): Relative paths of indexed files or directories.
+        """
+        with self._lock, self._connection:
+            for path in paths:
+                rows = self._connection.execute(
+                    "SELECT id, trigrams FROM files WHERE path = ? OR substr(path, 1, ?) = ?",
+                    (path, len(path) + 1, f"{path}/")).fetchall()
+                for file_id, trigrams in rows:
+                    self._connection.executemany(
+                        "DELETE FROM postings WHERE trigram = ? AND file_id = ?",
+                        ((trigram, file_id) for trigram in TrigramIndex._unpack(trigrams)))
+                    self._connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _set_meta(self, key: str, value) -> None:
+        """Store a value in the meta table."""
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @staticmethod
+    def _unpack(trigrams: bytes | None) -> array:
+        """Unpack a stored trigram blob."""
+        unpacked = array('I')
+        if trigrams:
+            unpacked.frombytes(trigrams)
+        return unpacked
+
+    def candidates(self, trigrams: set[int], prefix: tuple[str, ...]) -> list[tuple[str, ...]]:
+        """
+        Find the files below a subdirectory that may contain all the given trigrams.
+
+        Files too large to be split into trigrams and files written since they were last
+        indexed are always candidates. This is a blocking call, run it in a thread from async code.
+
+        Args:
+            trigrams (set[int]): The trigrams a match requires, see `query_trigrams`.
+            prefix (tuple[str, ...]): The parts of the searched directory relative to the root.
+
+        Returns:
+            list[tuple[str, ...]]: The candidates' parts relative to the root, in walk order.
+        """
+        with self._lock:
+            file_ids = None
+            for trigram in trigrams:
+                rows = self._connection.execute(
+                    "SELECT file_id FROM postings WHERE trigram = ?", (trigram,)).fetchall()
+                ids = {row[0] for row in rows}
+                file_ids = ids if file_ids is None else file_ids & ids
+                if not file_ids:
+                    break
+            paths = [row[0] for row in self._connection.execute("SELECT path FROM files WHERE kind = 'large'")]
+            ids = list(file_ids or ())
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                paths.extend(row[0] for row in self._connection.execute(
+                    f"SELECT path FROM files WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+
+        candidates = {tuple(path.split('/')) for path in paths}
+        candidates.update(path.relative_to(self.root).parts for path in self.pending | self._updating)
+        candidates = [parts for parts in candidates if parts[:len(prefix)] == prefix]
+        candidates.sort(key=lambda parts: tuple(component_key(part) for part in parts))
+        return candidates
+
+    def status(self) -> IndexStatus:
+        """
+        Describe the current state of the index.
+
+        Returns:
+            IndexStatus: The state, size and staleness of the index.
+        """
+        with self._lock:
+            files = self._connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        size = 0
+        for suffix in ('', '-wal'):
+            try:
+                size += os.stat(f"{self.db_path}{suffix}").st_size
+            except OSError:
+                pass
+        return IndexStatus(self.root, self.state, files, size, self.build_time, self.refreshed_at, len(self.pending))
+
+
+class SearchIndex:
+    """
+    Singleton manager of the trigram indexes of all allowed directories.
+
+    The index is optional and only enabled when `Config().index_dir` is set. Each allowed
+    directory that is not inside another one gets its own database in that directory.
+    `watch` builds the indexes in the background and refreshes them periodically, and
+    files written by the server are reindexed as soon as possible.
+    """
+    _instance = None
+    REFRESH_INTERVAL = 300.0
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Create a new instance of the SearchIndex class if it does not already exist.
+
+        Returns:
+            SearchIndex: The singleton instance of the SearchIndex class.
+        """
+        if not cls._instance:
+            cls._instance = super(SearchIndex, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initialize the SearchIndex instance.
+        """
+        if not hasattr(self, '_initialized'):
+            self._indexes: dict[Path, TrigramIndex] = {}
+            self._update_task: asyncio.Task | None = None
+            self._initialized = True
+
+    @property
+    def enabled(self) -> bool:
+        """Whether an index directory is configured."""
+        return Config().index_dir is not None
+
+    @property
+    def indexes(self) -> list[TrigramIndex]:
+        """The indexes of the allowed directories."""
+        return list(self._indexes.values())
+
+    def start(self) -> None:
+        """
+        Open the indexes of the allowed directories that do not have one yet.
+        """
+        if not self.enabled:
+            return
+        index_dir = Path(Config().index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        roots = {Path(path).resolve() for path in Config().allow}
+        for root in roots:
+            if root in self._indexes or any(root != other and root.is_relative_to(other) for other in roots):
+                continue
+            name = hashlib.sha1(os.path.normcase(str(root)).encode('utf-8')).hexdigest()[:16]
+            self._indexes[root] = TrigramIndex(root, index_dir / f"{name}.sqlite3")
+            logger.debug(f"Opened search index of {root}")
+
+    async def watch(self, interval: float = REFRESH_INTERVAL) -> None:
+        """
+        Build the indexes and refresh them periodically.
+
+        Runs until cancelled. Directories allowed by a reloaded config get an index on the
+        next refresh.
+
+        Args:
+            interval (float): Seconds between refreshes.
+        """
+        while True:
+            self.start()
+            for index in self.indexes:
+                try:
+                    await index.refresh()
+                except Exception as e:
+                    logger.error(f"Failed to refresh search index of {index.root}: {str(e)}")
+            await asyncio.sleep(interval)
+
+    def index_for(self, path: Path) -> TrigramIndex | None:
+        """
+        Find a ready index covering a directory.
+
+        Args:
+            path (Path): A resolved directory.
+
+        Returns:
+            TrigramIndex | None: The index, None if there is no ready index for the directory.
+        """
+        for root, index in self._indexes.items():
+            if index.state == 'ready' and path.is_relative_to(root):
+                return index
+        return None
+
+    def notify_write(self, path: Path) -> None:
+        """
+        Schedule a file written by the server for reindexing.
+
+        Until it is reindexed, the file is a candidate for every indexed search.
+
+        Args:
+            path (Path): The resolved file that was written.
+        """
+        for root, index in self._indexes.items():
+            if path.is_relative_to(root):
+                index.pending.add(path)
+                if self._update_task is None or self._update_task.done():
+                    self._update_task = asyncio.get_running_loop().create_task(self._update_pending())
+                return
+
+    async def notify_tree(self, path: Path) -> None:
+        """
+        Schedule every file below a directory the server moved or copied for reindexing.
+
+        Args:
+            path (Path): The resolved directory that was written.
+        """
+        if not any(path.is_relative_to(root) for root in self._indexes):
+            return
+        async for entry in TreeWalker(path).walk():
+            if not entry.is_dir and not entry.is_link:
+                self.notify_write(entry.path)
+
+    async def _update_pending(self) -> None:
+        """Reindex the files written since the last update until none are left."""
+        while any(index.pending for index in self.indexes):
+            for index in self.indexes:
+                if index.pending:
+                    try:
+                        await index.update(list(index.pending))
+                    except Exception as e:
+                        logger.error(f"Failed to update search index of {index.root}: {str(e)}")
+                        index.pending.clear()
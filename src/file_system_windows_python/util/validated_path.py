@@ -0,0 +1,95 @@
+import mmap
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass
+class ValidatedPath:
+    """
+    Handle for a path that passed validation.
+
+    Carries everything the validator already looked up, so handlers do not resolve or stat
+    the path again. When the validator opened the file, reads go through the same descriptor
+    that was checked, closing the gap between validating the path and reading it.
+
+    Attributes:
+        path (Path): The canonical absolute path.
+        stat (os.stat_result): The stat result taken during validation.
+        fd (int | None): An open read-only descriptor of the file, if one was requested.
+        file_type (str | None): The MIME type of the file, None for directories.
+    """
+    path: Path
+    stat: os.stat_result
+    fd: int | None = None
+    file_type: str | None = None
+
+    @property
+    def size(self) -> int:
+        """The size of the file in bytes at validation time."""
+        return self.stat.st_size
+
+    def read(self, offset: int = 0, size: int | None = None) -> bytes:
+        """
+        Read bytes from the file.
+
+        This is a blocking call, run it in a thread from async code.
+
+        Args:
+            offset (int): The position to start reading at.
+            size (int | None): The maximum number of bytes to read, None to read to the end.
+
+        Returns:
+            bytes: The bytes read, fewer than requested at the end of the file.
+        """
+        if self.fd is None:
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                return f.read(-1 if size is None else size)
+
+        os.lseek(self.fd, offset, os.SEEK_SET)
+        chunks = []
+        remaining = self.size - offset if size is None else size
+        while remaining > 0:
+            chunk = os.read(self.fd, remaining)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        if size is None:
+            rest = os.read(self.fd, 2 ** 20)
+            while rest:
+                chunks.append(rest)
+                rest = os.read(self.fd, 2 ** 20)
+        return b''.join(chunks)
+
+    def map(self) -> mmap.mmap:
+        """
+        Map the file into memory read-only.
+
+        The map stays valid after the descriptor is closed and must be closed by the caller.
+
+        Returns:
+            mmap.mmap: The mapped file.
+
+        Raises:
+            ValueError: If the file is empty, since empty files cannot be mapped.
+        """
+        if self.fd is None:
+            with open(self.path, 'rb') as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return mmap.mmap(self.fd, 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        """
+        Close the descriptor, if one is open.
+        """
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self) -> 'ValidatedPath':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
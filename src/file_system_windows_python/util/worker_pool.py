@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from file_system_windows_python.util.cancellation import current_token, run_with_deadline
+
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """
+    Singleton process pool for CPU-bound work.
+
+    The pool is created on first use and shared by all tools. Functions submitted to it
+    must be importable at module level, since they are pickled to the worker processes.
+    """
+    _instance = None
+    MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Create a new instance of the WorkerPool class if it does not already exist.
+
+        Returns:
+            WorkerPool: The singleton instance of the WorkerPool class.
+        """
+        if not cls._instance:
+            cls._instance = super(WorkerPool, cls).__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self):
+        """
+        Initialize the WorkerPool instance.
+
+        The worker processes are not started here, see `executor`.
+        """
+        if not hasattr(self, '_initialized'):
+            self._executor: ProcessPoolExecutor | None = None
+            self._initialized = True
+
+    @property
+    def workers(self) -> int:
+        """The number of worker processes."""
+        return self.MAX_WORKERS
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """The process pool, started on first access."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.MAX_WORKERS)
+            logger.debug(f"Started process pool with {self.MAX_WORKERS} workers")
+        return self._executor
+
+    def submit(self, func, *args) -> asyncio.Future:
+        """
+        Run a function in a worker process.
+
+        Within a tool call the deadline of the call is passed along, so `check_cancelled`
+        stops the function once the call runs out of time. Cancelling the future only
+        drops the function if it has not started yet.
+
+        Args:
+            func: A module-level function.
+            *args: Picklable arguments for the function.
+
+        Returns:
+            asyncio.Future: A future resolving to the return value of the function.
+        """
+        loop = asyncio.get_running_loop()
+        token = current_token()
+        if token is not None:
+            return loop.run_in_executor(self.executor, run_with_deadline, token.deadline, func, *args)
+        return loop.run_in_executor(self.executor, func, *args)
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker processes, cancelling work that has not started yet.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,50 @@
+import hashlib
+import io
+
+import pytest
+
+from file_system_windows_python.util import patch
+from file_system_windows_python.util.line_index import LineIndex
+
+
+def apply_diff(content: bytes, diff: str) -> bytes:
+    """Apply a unified diff to content the way edit-file does."""
+    newline = patch.detect_newline(content)
+    replacements = patch.locate_hunks(content, patch.parse_unified_diff(diff), newline, LineIndex.build(content))
+    out = io.BytesIO()
+    patch.splice(content, replacements, out, hashlib.sha256())
+    return out.getvalue()
+
+
+def test_insertion_after_last_line_without_line_break():
+    assert apply_diff(b"a\nb", "@@ -2,0 +3 @@\n+c\n") == b"a\nb\nc\n"
+
+
+def test_insertion_after_last_line_with_line_break():
+    assert apply_diff(b"a\nb\n", "@@ -2,0 +3 @@\n+c\n") == b"a\nb\nc\n"
+
+
+def test_insertion_after_last_line_without_line_break_keeps_crlf():
+    assert apply_diff(b"a\r\nb", "@@ -2,0 +3 @@\n+c\n") == b"a\r\nb\r\nc\r\n"
+
+
+def test_last_line_without_line_break_only_matches_whole_line():
+    with pytest.raises(ValueError):
+        apply_diff(b"xfoo", "@@ -1 +1 @@\n-foo\n+bar\n")
+
+
+def test_last_line_without_line_break_is_replaced():
+    assert apply_diff(b"a\nfoo", "@@ -2 +2 @@\n-foo\n+bar\n") == b"a\nbar"
+
+
+def test_no_newline_marker_removes_final_line_break():
+    assert apply_diff(b"a\n", "@@ -1 +1 @@\n-a\n+b\n\\ No newline at end of file\n") == b"b"
+
+
+def test_no_newline_marker_adds_final_line_break():
+    assert apply_diff(b"a", "@@ -1 +1 @@\n-a\n\\ No newline at end of file\n+b\n") == b"b\n"
+
+
+def test_no_newline_marker_requires_end_of_file():
+    with pytest.raises(ValueError):
+        apply_diff(b"a\nb\n", "@@ -1 +1 @@\n-a\n\\ No newline at end of file\n+c\n")